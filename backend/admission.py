@@ -0,0 +1,142 @@
+import math
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Optional
+
+
+class Overloaded(Exception):
+    """超出接口容量（并发上限 + 等待队列），请求应以429拒绝"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class DrainRate:
+    """按最近一段时间内的完成数估算处理速度（个/秒）"""
+
+    def __init__(self, window: float = 60.0):
+        self.window = window
+        self._completions: Deque[float] = deque()
+        self._durations: Deque[float] = deque(maxlen=50)
+        self._lock = threading.Lock()
+
+    def record(self, duration: Optional[float] = None):
+        now = time.monotonic()
+        with self._lock:
+            self._completions.append(now)
+            if duration is not None:
+                self._durations.append(duration)
+            self._trim(now)
+
+    def _trim(self, now: float):
+        while self._completions and self._completions[0] < now - self.window:
+            self._completions.popleft()
+
+    def rate(self) -> float:
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            if not self._completions:
+                return 0.0
+            # 服务刚启动时窗口未满，按实际经过的时间计算
+            span = max(now - self._completions[0], 1.0)
+            return len(self._completions) / span
+
+    def average_duration(self) -> Optional[float]:
+        with self._lock:
+            return sum(self._durations) / len(self._durations) if self._durations else None
+
+    def retry_after(self, ahead: int, capacity: int, default: float, maximum: float = 300) -> int:
+        """排在前面的 ahead 个请求处理完所需的秒数（向上取整，至少1秒）
+
+        分别按近期完成速度、以及平均处理时长和并发数估算，取较小值（空闲一段时间后完成速度会偏低）；
+        都没有数据时使用 default。
+        """
+        estimates = []
+        rate = self.rate()
+        if rate > 0:
+            estimates.append((ahead + 1) / rate)
+        duration = self.average_duration()
+        if duration is not None:
+            estimates.append(duration * (ahead + 1) / max(capacity, 1))
+        seconds = min(estimates) if estimates else default
+        return int(min(max(math.ceil(seconds), 1), maximum))
+
+
+class AdmissionLimiter:
+    """接口准入控制：最多 max_in_flight 个请求同时处理，另有 max_queue 个请求最多等待 max_wait 秒
+
+    超出时立即抛出 Overloaded（附带按当前处理速度估算的 Retry-After），
+    避免突发流量创建大量线程、在内存中堆积上传文件并同时等待上游。
+    """
+
+    def __init__(self, name: str, max_in_flight: int, max_queue: int = 0, max_wait: float = 10.0):
+        self.name = name
+        self.max_in_flight = max(max_in_flight, 1)
+        self.max_queue = max(max_queue, 0)
+        self.max_wait = max_wait
+        self.drain = DrainRate()
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._waiting = 0
+        self._stats = {'admitted': 0, 'queued': 0, 'rejected': 0, 'timed_out': 0}
+
+    def acquire(self):
+        with self._cond:
+            # 已有请求在等待时不插队
+            if self._in_flight < self.max_in_flight and not self._waiting:
+                self._in_flight += 1
+                self._stats['admitted'] += 1
+                return
+            if self._waiting >= self.max_queue:
+                self._stats['rejected'] += 1
+                raise Overloaded(f"{self.name} 请求过多，请稍后重试", self._retry_after())
+
+            self._waiting += 1
+            self._stats['queued'] += 1
+            deadline = time.monotonic() + self.max_wait
+            try:
+                while self._in_flight >= self.max_in_flight:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['timed_out'] += 1
+                        raise Overloaded(f"{self.name} 排队超时，请稍后重试", self._retry_after())
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+            self._in_flight += 1
+            self._stats['admitted'] += 1
+
+    def release(self, duration: Optional[float] = None):
+        self.drain.record(duration)
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify()
+
+    def _retry_after(self) -> int:
+        """需持有锁"""
+        return self.drain.retry_after(self._waiting, self.max_in_flight, default=self.max_wait)
+
+    @contextmanager
+    def slot(self):
+        self.acquire()
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - start)
+
+    def stats(self) -> Dict:
+        with self._cond:
+            stats = {
+                'in_flight': self._in_flight,
+                'waiting': self._waiting,
+                'max_in_flight': self.max_in_flight,
+                'max_queue': self.max_queue,
+                **self._stats
+            }
+        stats['drain_per_minute'] = round(self.drain.rate() * 60, 2)
+        return stats
@@ -1,12 +1,35 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Request, Response, request, jsonify, stream_with_context
 from werkzeug.utils import secure_filename
 import os
+import json
 import uuid
+import zipfile
+import tempfile
+import threading
+import time
+import hashlib
+import queue
+import atexit
+import contextvars
 import logging
 import traceback
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from functools import wraps
 from datetime import datetime
-from resume_parser import ResumeParser
+from resume_parser import ResumeParser, to_wire
+from batch_upload import BatchTooLarge, collect_batch_files
 from deepseek_analyzer import DeepSeekAnalyzer
+from result_cache import ResultCache
+from job_queue import STATUS_FAILED, JobQueue, JobStore, QueueFull
+from http_pool import HttpPool
+from llm_scheduler import LLMScheduler, PRIORITY_BATCH, request_priority
+from llm_router import PROVIDER_PRESETS, Provider, ProviderRouter
+from token_budget import TokenBudget
+from near_duplicate import NearDuplicateIndex, simhash
+from log_config import setup_logging
+from admission import AdmissionLimiter, Overloaded
+from single_flight import SingleFlight
+from metrics import REGISTRY, REQUEST_SECONDS, begin_request, current_timings, end_request, record_stage, stage
 from dotenv import load_dotenv
 
 # 加载配置文件
@@ -16,26 +39,52 @@ load_dotenv(config_path)
 print(f"加载配置文件路径: {config_path}")
 print(f"配置文件是否存在: {os.path.exists(config_path)}")
 
-# 配置日志
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('resume_analyzer.log', encoding='utf-8')
-    ]
+# 配置日志（异步写入：请求线程只入队，后台线程格式化并写文件）
+setup_logging(
+    log_file=os.getenv('LOG_FILE', 'resume_analyzer.log'),
+    level=os.getenv('LOG_LEVEL', 'INFO'),
+    module_levels=os.getenv('LOG_LEVELS', ''),
+    debug_sample_every=int(os.getenv('LOG_DEBUG_SAMPLE_EVERY', '10')),
+    queue_size=int(os.getenv('LOG_QUEUE_SIZE', '10000'))
 )
 logger = logging.getLogger(__name__)
 
+# 解析进程池以forkserver/spawn方式重建时，子进程会以 __mp_main__ 名义重新执行入口脚本（python app.py）；
+# 子进程只需要解析函数，跳过预热、任务恢复等服务启动步骤
+_PARSER_WORKER = __name__ == '__mp_main__'
+
+# 上传文件在内存中缓存的上限，超过时才溢写到临时目录
+UPLOAD_SPOOL_THRESHOLD = int(os.getenv('UPLOAD_SPOOL_THRESHOLD', str(4 * 1024 * 1024)))
+
+
+class SpooledRequest(Request):
+    """上传文件先写入内存缓冲区，超过阈值才溢写到磁盘（替代werkzeug默认的500KB阈值）"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_THRESHOLD, mode='rb+', dir=TEMP_FOLDER)
+
+    @property
+    def max_content_length(self):
+        """请求体上限：只有批量接口放宽到 BATCH_MAX_CONTENT_LENGTH，其余接口使用全局的 MAX_CONTENT_LENGTH"""
+        if self.endpoint == 'batch_analysis':
+            return BATCH_MAX_CONTENT_LENGTH
+        return super().max_content_length
+
+
 app = Flask(__name__)
+app.request_class = SpooledRequest
 app.config['SECRET_KEY'] = 'resume_analyzer_secret_key'
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+MAX_FILE_SIZE = 16 * 1024 * 1024  # 16MB max file size
+app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE
+# /batch_analysis 一次上传多份简历，请求体上限单独设置（见 SpooledRequest.max_content_length）
+BATCH_MAX_CONTENT_LENGTH = int(os.getenv('BATCH_MAX_CONTENT_LENGTH', str(256 * 1024 * 1024)))
 
 logger.info("🚀 启动简历分析系统后端服务...")
 
 # 配置文件上传路径
 UPLOAD_FOLDER = '../uploads'
 TEMP_FOLDER = '../temp'
+CACHE_FOLDER = os.getenv('CACHE_DIR', '../cache')
 
 # 确保目录存在
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
@@ -58,31 +107,669 @@ if GROK_API_KEY == 'YOUR_GROK_API_KEY':
 else:
     logger.info(f"✅ 检测到有效的Grok API密钥")
 
+# 解析结果缓存（按文件内容哈希 + 解析器版本索引）
+parse_cache = None
+if os.getenv('PARSE_CACHE_ENABLED', 'true').lower() == 'true':
+    parse_cache = ResultCache(
+        'parse',
+        cache_dir=CACHE_FOLDER,
+        memory_items=int(os.getenv('PARSE_CACHE_MEMORY_ITEMS', '256')),
+        max_bytes=int(os.getenv('PARSE_CACHE_MAX_BYTES', str(256 * 1024 * 1024))),
+        ttl=int(os.getenv('PARSE_CACHE_TTL', str(7 * 24 * 3600)))
+    )
+
+# AI响应缓存（按模型、提示词版本、采样参数和归一化简历内容索引）
+llm_cache = None
+if os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true':
+    llm_cache = ResultCache(
+        'llm',
+        cache_dir=CACHE_FOLDER,
+        memory_items=int(os.getenv('LLM_CACHE_MEMORY_ITEMS', '256')),
+        max_bytes=int(os.getenv('LLM_CACHE_MAX_BYTES', str(128 * 1024 * 1024))),
+        ttl=int(os.getenv('LLM_CACHE_TTL', str(3 * 24 * 3600)))
+    )
+
+# 解析结果句柄（parse_id -> 解析结果），分析接口可直接传parse_id/file_id而不必回传整份简历
+parse_handles = ResultCache(
+    'parse_handles',
+    cache_dir=CACHE_FOLDER,
+    memory_items=int(os.getenv('PARSE_HANDLE_MEMORY_ITEMS', '256')),
+    max_bytes=int(os.getenv('PARSE_HANDLE_MAX_BYTES', str(128 * 1024 * 1024))),
+    ttl=int(os.getenv('PARSE_HANDLE_TTL', str(24 * 3600)))
+)
+
+# 近似重复简历索引：off 关闭; surface 在结果中标注相似的历史简历; reuse 直接复用其分析结果
+NEAR_DUPLICATE_MODE = os.getenv('NEAR_DUPLICATE_MODE', 'surface').lower()
+near_duplicates = None
+if NEAR_DUPLICATE_MODE in ('surface', 'reuse'):
+    near_duplicates = NearDuplicateIndex(
+        os.path.join(CACHE_FOLDER, 'near_duplicates.sqlite3'),
+        max_distance=int(os.getenv('NEAR_DUPLICATE_MAX_DISTANCE', '6')),
+        ttl=float(os.getenv('NEAR_DUPLICATE_TTL', str(30 * 24 * 3600))),
+        max_items=int(os.getenv('NEAR_DUPLICATE_MAX_ITEMS', '100000'))
+    )
+
+# AI服务连接池（keep-alive，可选HTTP/2）
+llm_http_pool = HttpPool(
+    max_connections=int(os.getenv('LLM_POOL_MAX_CONNECTIONS', '20')),
+    max_keepalive=int(os.getenv('LLM_POOL_MAX_KEEPALIVE', '10')),
+    keepalive_expiry=float(os.getenv('LLM_POOL_KEEPALIVE_EXPIRY', '60')),
+    http2=os.getenv('LLM_HTTP2', 'true').lower() == 'true'
+)
+
+# AI调用调度器（速率限制 + 并发上限 + 优先级队列）
+llm_scheduler = LLMScheduler(
+    requests_per_minute=float(os.getenv('LLM_REQUESTS_PER_MINUTE', '20')),
+    tokens_per_minute=float(os.getenv('LLM_TOKENS_PER_MINUTE', '100000')),
+    max_concurrency=int(os.getenv('LLM_MAX_CONCURRENCY', '4')),
+    max_wait=float(os.getenv('LLM_MAX_QUEUE_WAIT', '300'))
+)
+
+
+
+def build_llm_router():
+    """按 LLM_PROVIDERS 配置多服务商路由；未配置时返回None（使用GROK_API_KEY单服务商）"""
+    names = [name.strip() for name in os.getenv('LLM_PROVIDERS', '').split(',') if name.strip()]
+    if not names:
+        return None
+
+    providers = []
+    for name in names:
+        if name not in PROVIDER_PRESETS:
+            logger.warning(f"⚠️ 未知的AI服务商: {name}，可选: {', '.join(PROVIDER_PRESETS)}")
+            continue
+        api_key = os.getenv(f'{name.upper()}_API_KEY')
+        if not api_key and name == 'openrouter' and GROK_API_KEY.startswith('sk-or-'):
+            api_key = GROK_API_KEY
+        if not api_key:
+            logger.warning(f"⚠️ 未配置 {name.upper()}_API_KEY，跳过服务商 {name}")
+            continue
+        providers.append(Provider(name, api_key, os.getenv(f'{name.upper()}_MODEL'), http_pool=llm_http_pool))
+
+    return ProviderRouter(
+        providers,
+        hedge=os.getenv('LLM_HEDGE', 'false').lower() == 'true',
+        hedge_percentile=float(os.getenv('LLM_HEDGE_PERCENTILE', '0.9')),
+        hedge_min_delay=float(os.getenv('LLM_HEDGE_MIN_DELAY', '3')),
+        failure_threshold=int(os.getenv('LLM_FAILURE_THRESHOLD', '3')),
+        cooldown=float(os.getenv('LLM_PROVIDER_COOLDOWN', '30')),
+        scheduler=llm_scheduler
+    )
+
+
 # 初始化解析器和分析器
 try:
-    resume_parser = ResumeParser()
-    analyzer = DeepSeekAnalyzer(GROK_API_KEY)  # 传入Grok API密钥，类内部会适配
+    resume_parser = ResumeParser(
+        engine=os.getenv('PARSER_ENGINE', 'stream'), cache=parse_cache,
+        processes=int(os.getenv('PARSER_PROCESSES', '0'))
+    )
+    # 预先启动解析进程，避免首个批量请求承担启动开销（子进程在初始化时改为直接写stderr，不使用继承的日志队列）
+    if not _PARSER_WORKER:
+        resume_parser.warm_up()
+    # 传入Grok API密钥，类内部会适配；配置了LLM_PROVIDERS时使用多服务商路由
+    analyzer = DeepSeekAnalyzer(
+        GROK_API_KEY, cache=llm_cache, http_pool=llm_http_pool, scheduler=llm_scheduler,
+        router=build_llm_router(),
+        budget=TokenBudget(
+            input_budget=int(os.getenv('LLM_INPUT_TOKEN_BUDGET', '6000')),
+            adaptive_max_tokens=os.getenv('LLM_ADAPTIVE_MAX_TOKENS', 'true').lower() == 'true'
+        )
+    )
+    if os.getenv('LLM_WARMUP', 'true').lower() == 'true' and not _PARSER_WORKER:
+        analyzer.warm_up()
     logger.info("✅ 简历解析器和AI分析器初始化成功")
 except Exception as e:
     logger.error(f"❌ 初始化解析器失败: {str(e)}")
     logger.error(traceback.format_exc())
 
 
+# AI分析模式：separate（分析、推荐两次请求）或 combined（一次JSON结构化请求）
+ANALYSIS_MODE = os.getenv('ANALYSIS_MODE', 'separate')
+
+# AI调用线程池：/full_analysis 中的分析和推荐并发执行
+llm_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('LLM_WORKERS', '8')),
+    thread_name_prefix='llm'
+)
+
+
+# 批量分析线程池：每份简历占用一个线程完成解析和分析
+batch_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('BATCH_WORKERS', '8')),
+    thread_name_prefix='batch'
+)
+BATCH_LLM_CONCURRENCY = int(os.getenv('BATCH_LLM_CONCURRENCY', '2'))
+# 单次批量的文件数和压缩包解压后总大小上限（防止压缩炸弹）
+BATCH_MAX_FILES = int(os.getenv('BATCH_MAX_FILES', '200'))
+BATCH_MAX_TOTAL_BYTES = int(os.getenv('BATCH_MAX_TOTAL_BYTES', str(512 * 1024 * 1024)))
+# 配置了解析进程时每次送入进程池的文件数，只有这一组文件的内容同时驻留内存
+BATCH_PARSE_CHUNK = int(os.getenv('BATCH_PARSE_CHUNK', '16'))
+
+# 接口准入控制：每个接口的并发上限和等待队列长度，超出时立即返回429
+ADMISSION_ENABLED = os.getenv('ADMISSION_ENABLED', 'true').lower() == 'true'
+ADMISSION_DEFAULTS = {
+    'full_analysis': (8, 8),
+    'full_analysis_stream': (8, 8),
+    'analyze': (16, 16),
+    'recommend_jobs': (16, 16),
+    'analyze_stream': (8, 8),
+    'batch_analysis': (2, 0),
+}
+admission_limiters = {}
+if ADMISSION_ENABLED:
+    for name, (max_in_flight, max_queue) in ADMISSION_DEFAULTS.items():
+        admission_limiters[name] = AdmissionLimiter(
+            name,
+            max_in_flight=int(os.getenv(f'ADMISSION_{name.upper()}_MAX_IN_FLIGHT', str(max_in_flight))),
+            max_queue=int(os.getenv(f'ADMISSION_{name.upper()}_MAX_QUEUE', str(max_queue))),
+            max_wait=float(os.getenv('ADMISSION_MAX_WAIT', '10'))
+        )
+
+
+# 请求合并：相同内容、相同参数的并发请求共享同一次解析后的AI分析（只合并同时进行中的请求）
+SINGLE_FLIGHT_ENABLED = os.getenv('SINGLE_FLIGHT_ENABLED', 'true').lower() == 'true'
+single_flights = {name: SingleFlight(name) for name in ('full_analysis', 'analyze', 'recommend_jobs')}
+
+
+def _coalesced(name, key, func):
+    """执行func；相同键的请求正在进行时等待并共享其结果，返回(结果, 是否共享)"""
+    if not SINGLE_FLIGHT_ENABLED:
+        return func(), False
+    start = time.perf_counter()
+    result, shared = single_flights[name].do(key, func)
+    if shared:
+        # 只有等待他人结果的请求记录coalesce阶段（执行计算的请求已记录各自的阶段）
+        record_stage('coalesce', time.perf_counter() - start)
+    return result, shared
+
+
+def _too_many_requests(message, retry_after):
+    """429响应，Retry-After为按当前处理速度估算的等待秒数"""
+    response = jsonify({'error': message, 'retry_after': retry_after})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+
+def admission(name):
+    """接口准入控制装饰器：在读取上传内容之前占用名额，流式响应在输出结束后才释放"""
+    def decorator(view):
+        limiter = admission_limiters.get(name)
+        if limiter is None:
+            return view
+
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                with stage('admission'):
+                    limiter.acquire()
+            except Overloaded as e:
+                logger.warning("🚦 [%s] 拒绝请求: %s（Retry-After %ss）", name, e, e.retry_after)
+                return _too_many_requests(str(e), e.retry_after)
+
+            start = time.monotonic()
+            try:
+                response = app.make_response(view(*args, **kwargs))
+            except BaseException:
+                limiter.release(time.monotonic() - start)
+                raise
+            if response.is_streamed:
+                response.call_on_close(lambda: limiter.release(time.monotonic() - start))
+            else:
+                limiter.release(time.monotonic() - start)
+            return response
+        return wrapper
+    return decorator
+
+
+def _timed(func, *args):
+    """执行函数并返回(结果, 耗时毫秒)"""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, round((time.perf_counter() - start) * 1000, 1)
+
+
+def _json_response(payload):
+    """序列化响应（计入serialize阶段）"""
+    with stage('serialize'):
+        return jsonify(payload)
+
+
+def _flag(value) -> bool:
+    """请求中的布尔参数，如bypass_cache、compact（JSON布尔值或表单字符串）"""
+    if isinstance(value, str):
+        return value.lower() in ('1', 'true', 'yes')
+    return bool(value)
+
+
 def allowed_file(filename):
     """检查文件是否允许上传"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def _check_upload(request_id):
+    """检查上传文件，返回(文件, 错误响应)"""
+    logger.debug("[%s] 检查文件上传...", request_id)
+    if request.content_length and request.content_length > MAX_FILE_SIZE:
+        logger.error("[%s] 文件过大: %s bytes", request_id, request.content_length)
+        return None, (jsonify({'error': '文件过大，请上传小于16MB的文件'}), 413)
+
+    # 首次访问request.files时接收并解析整个上传请求体
+    with stage('upload'):
+        has_file = 'file' in request.files
+    if not has_file:
+        logger.error("[%s] 没有文件上传", request_id)
+        return None, (jsonify({'error': '没有文件上传'}), 400)
+
+    file = request.files['file']
+    logger.info("[%s] 接收到文件: %s", request_id, file.filename)
+
+    if file.filename == '':
+        logger.error("[%s] 没有选择文件", request_id)
+        return None, (jsonify({'error': '没有选择文件'}), 400)
+
+    if not allowed_file(file.filename):
+        logger.error("[%s] 文件格式不支持: %s", request_id, file.filename)
+        return None, (jsonify({'error': '只支持.docx格式文件'}), 400)
+
+    return file, None
+
+
+def _content_id(parsed_data) -> str:
+    """按简历文本内容生成的ID（同一份简历得到相同的ID）；没有raw_text时使用整个数据"""
+    text = parsed_data.get('raw_text') if isinstance(parsed_data, dict) else None
+    if not isinstance(text, str):
+        text = json.dumps(parsed_data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:32]
+
+
+def _remember_parse(parsed_data) -> str:
+    """保存解析结果并返回parse_id（按文本内容生成，同一份简历得到相同的parse_id）"""
+    parse_id = _content_id(parsed_data)
+    if parse_handles.get(parse_id) is None:
+        parse_handles.put(parse_id, parsed_data)
+    return parse_id
+
+
+def _resolve_resume_data(data):
+    """从请求中取得简历数据：resume_data（完整内容）、parse_id 或 file_id，返回(简历数据, 错误响应)"""
+    if not data:
+        return None, (jsonify({'error': '缺少resume_data、parse_id或file_id参数'}), 400)
+
+    if 'resume_data' in data:
+        return data['resume_data'], None
+
+    if 'parse_id' in data:
+        parsed_data = parse_handles.get(str(data['parse_id']))
+        if parsed_data is None:
+            return None, (jsonify({'error': '解析结果不存在或已过期，请重新解析'}), 404)
+        return parsed_data, None
+
+    if 'file_id' in data:
+        file_path = os.path.join(UPLOAD_FOLDER, os.path.basename(str(data['file_id'])))
+        if not os.path.exists(file_path):
+            return None, (jsonify({'error': '文件不存在'}), 404)
+        # 解析缓存命中时不会重新解码文档
+        parsed_data = resume_parser.parse_resume(file_path)
+        _remember_parse(parsed_data)
+        return parsed_data, None
+
+    return None, (jsonify({'error': '缺少resume_data、parse_id或file_id参数'}), 400)
+
+
+def _parse_upload(file, request_id, timings):
+    """直接从上传数据流解析简历（小文件在内存中，超过溢写阈值的由SpooledRequest写入临时文件）"""
+    stream = file.stream
+    stream.seek(0, os.SEEK_END)
+    file_size = stream.tell()
+    stream.seek(0)
+    logger.info("[%s] 文件大小: %s bytes", request_id, file_size)
+
+    logger.info("[%s] 开始解析简历...", request_id)
+    with stage('parse'):
+        parsed_data, timings['parse_ms'] = _timed(resume_parser.parse_stream, stream)
+    logger.info("[%s] 简历解析成功", request_id)
+    return parsed_data
+
+
+def _analysis_payload(filename, parsed_data, mode, use_cache, request_id, timings, on_stage=None, compact=False):
+    """对解析结果执行AI分析和岗位推荐，返回 /full_analysis 的响应内容
+
+    on_stage(阶段, 状态) 用于上报进度（后台任务使用）；compact=True 时解析结果只返回段落偏移。
+    """
+    def report(stage, status):
+        if on_stage is not None:
+            on_stage(stage, status)
+
+    parse_id = _remember_parse(parsed_data)
+    near_duplicate, fingerprint = None, None
+    if near_duplicates is not None:
+        fingerprint = simhash(parsed_data['raw_text'])
+        match = near_duplicates.find(fingerprint)
+        if match is not None and match['key'] != parse_id:
+            near_duplicate = {'parse_id': match['key'], 'similarity': match['similarity'], 'reused': False}
+            logger.info("[%s] 🧬 发现近似重复简历: %s（相似度%s）", request_id, match['key'], match['similarity'])
+            previous = near_duplicates.payload(match['key']) if NEAR_DUPLICATE_MODE == 'reuse' and use_cache else None
+            if previous is not None:
+                near_duplicate['reused'] = True
+                report('analysis', 'done')
+                report('recommendations', 'done')
+                return {
+                    'success': True,
+                    'original_filename': filename,
+                    'parse_id': parse_id,
+                    'parsed_data': to_wire(parsed_data, compact),
+                    'analysis': previous['analysis'],
+                    'recommendations': previous['recommendations'],
+                    'errors': {'analysis_error': None, 'recommendation_error': None},
+                    'near_duplicate': near_duplicate,
+                    'timings': timings
+                }
+
+    llm_start = time.perf_counter()
+    if mode == 'combined':
+        # 4-5. 合并模式：一次请求同时返回分析和推荐
+        logger.info("[%s] 开始AI合并分析...", request_id)
+        report('analysis', 'running')
+        report('recommendations', 'running')
+        analysis_result, timings['combined_ms'] = _timed(analyzer.analyze_combined, parsed_data, use_cache)
+        recommendation_result = {
+            'success': analysis_result['success'],
+            'recommendations': analysis_result['recommendations'],
+            'error': None if analysis_result['success'] else analysis_result['recommendation_error']
+        }
+    else:
+        # 4-5. AI分析和岗位推荐互不依赖，并发执行（复制上下文以保留调度优先级）
+        logger.info("[%s] 开始AI分析和岗位推荐（并发）...", request_id)
+        report('analysis', 'running')
+        report('recommendations', 'running')
+        analysis_future = llm_executor.submit(
+            contextvars.copy_context().run, _timed, analyzer.analyze_resume, parsed_data, use_cache
+        )
+        recommendation_future = llm_executor.submit(
+            contextvars.copy_context().run, _timed, analyzer.generate_job_recommendations, parsed_data, use_cache
+        )
+        analysis_result, timings['analysis_ms'] = analysis_future.result()
+        recommendation_result, timings['recommendation_ms'] = recommendation_future.result()
+    timings['llm_wall_ms'] = round((time.perf_counter() - llm_start) * 1000, 1)
+
+    if analysis_result['success']:
+        logger.info("[%s] AI分析成功", request_id)
+    else:
+        logger.error("[%s] AI分析失败: %s", request_id, analysis_result['error'])
+    report('analysis', 'done' if analysis_result['success'] else 'failed')
+
+    if recommendation_result['success']:
+        logger.info("[%s] 岗位推荐成功", request_id)
+    else:
+        logger.error("[%s] 岗位推荐失败: %s", request_id, recommendation_result['error'])
+    report('recommendations', 'done' if recommendation_result['success'] else 'failed')
+
+    if fingerprint is not None and analysis_result['success'] and recommendation_result['success']:
+        near_duplicates.add(fingerprint, parse_id, {
+            'analysis': analysis_result['analysis'],
+            'recommendations': recommendation_result['recommendations']
+        })
+
+    return {
+        'success': True,
+        'original_filename': filename,
+        'parse_id': parse_id,
+        'parsed_data': to_wire(parsed_data, compact),
+        'analysis': analysis_result['analysis'] if analysis_result['success'] else None,
+        'recommendations': recommendation_result['recommendations'] if recommendation_result['success'] else None,
+        'errors': {
+            'analysis_error': None if analysis_result['success'] else analysis_result['error'],
+            'recommendation_error': None if recommendation_result['success'] else recommendation_result['error']
+        },
+        'near_duplicate': near_duplicate,
+        'timings': timings
+    }
+
+
+def _sse(event: str, data) -> str:
+    """格式化一条Server-Sent Events消息"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _sse_response(generator):
+    """包装SSE流式响应（禁用代理缓冲）"""
+    return Response(generator, mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+
+def _pump_stream(stage, make_stream, out_queue):
+    """在线程中消费AI流式输出，把(阶段, 增量, 结束信息)放入队列"""
+    start = time.perf_counter()
+    chunks = []
+    try:
+        for delta in make_stream():
+            chunks.append(delta)
+            out_queue.put((stage, delta, None))
+        error = None
+    except Exception as e:
+        logger.error("❌ 流式%s失败: %s", stage, e)
+        error = str(e)
+    elapsed = round((time.perf_counter() - start) * 1000, 1)
+    out_queue.put((stage, None, {'text': ''.join(chunks), 'error': error, 'ms': elapsed}))
+
+
+def _collect_batch_files():
+    """收集批量上传的简历：多个file字段，或.zip压缩包中的.docx，返回[BatchEntry]（内容按需读取）"""
+    return collect_batch_files(
+        request.files.getlist('files') + request.files.getlist('file'), allowed_file,
+        max_file_size=MAX_FILE_SIZE, max_files=BATCH_MAX_FILES, max_total_bytes=BATCH_MAX_TOTAL_BYTES
+    )
+
+
+def _read_batch_entry(index, entry):
+    """读取（解压）单份简历，返回(内容, 失败结果)；内容为None且无失败结果表示文件过大"""
+    try:
+        return entry.read(), None
+    except (zipfile.BadZipFile, OSError, EOFError) as e:
+        logger.warning("📦 读取批量文件失败: %s: %s", entry.filename, e)
+        return None, {'index': index, 'filename': entry.filename, 'success': False, 'stage': 'upload',
+                      'error': f'读取文件失败: {str(e)}'}
+
+
+def _batch_item(index, filename, parsed, mode, use_cache, llm_slots, compact=False):
+    """批量分析中的单份简历：parsed为parse_many的结果（None表示文件过大），AI分析受llm_slots限制"""
+    request_id = f"batch-{index}"
+    timings = {}
+    start = time.perf_counter()
+    if parsed is None:
+        return {'index': index, 'filename': filename, 'success': False, 'stage': 'upload',
+                'error': '文件过大，请上传小于16MB的文件'}
+    if not parsed['success']:
+        return {'index': index, 'filename': filename, 'success': False, 'stage': 'parse',
+                'error': parsed['error']}
+    parsed_data = parsed['data']
+
+    with llm_slots, request_priority(PRIORITY_BATCH):
+        payload = _analysis_payload(filename, parsed_data, mode, use_cache, request_id, timings, compact=compact)
+    timings['total_ms'] = round((time.perf_counter() - start) * 1000, 1)
+
+    # payload自带的success表示"流程已执行"，批量结果中以AI分析/推荐是否都成功为准，需在合并后覆盖
+    errors = payload['errors']
+    return {'index': index, 'filename': filename, **payload,
+            'success': not (errors['analysis_error'] or errors['recommendation_error'])}
+
+
+def _parse_then_analyze(index, entry, mode, use_cache, llm_slots, compact, parse_times):
+    """未配置解析进程时，在批量线程中读取并解析单份简历再分析，解析完即可开始AI调用"""
+    filename = entry.filename
+    data, failure = _read_batch_entry(index, entry)
+    if failure is not None:
+        return failure
+    parsed = None
+    if data is not None:
+        parse_start = time.perf_counter()
+        with stage('parse'):
+            parsed = resume_parser.parse_many([data])[0]
+        parse_times.append(time.perf_counter() - parse_start)
+    return _batch_item(index, filename, parsed, mode, use_cache, llm_slots, compact)
+
+
+def _process_job(job, progress):
+    """后台任务：解析已保存的简历并完成AI分析（按批量优先级调度）"""
+    request_id = f"job-{job['id'][:8]}"
+    request_start = time.perf_counter()
+    timings = {}
+    options = job['options']
+
+    try:
+        with request_priority(PRIORITY_BATCH):
+            progress('parse', 'running')
+            try:
+                with stage('parse'):
+                    parsed_data, timings['parse_ms'] = _timed(resume_parser.parse_resume, job['input_path'])
+            except Exception:
+                progress('parse', 'failed')
+                raise
+            progress('parse', 'done')
+
+            payload = _analysis_payload(job['filename'], parsed_data, options['mode'], options['use_cache'],
+                                        request_id, timings, on_stage=progress,
+                                        compact=options.get('compact', False))
+    finally:
+        if os.path.exists(job['input_path']):
+            os.remove(job['input_path'])
+
+    timings['total_ms'] = round((time.perf_counter() - request_start) * 1000, 1)
+    logger.info("[%s] 后台分析完成，耗时: %s", request_id, timings)
+    return payload
+
+
+# 后台任务队列（/jobs 提交、轮询），状态持久化到SQLite，重启后恢复未完成任务
+JOB_INPUT_FOLDER = os.path.join(TEMP_FOLDER, 'jobs')
+os.makedirs(JOB_INPUT_FOLDER, exist_ok=True)
+job_store = JobStore(os.path.join(CACHE_FOLDER, 'jobs.sqlite3'))
+job_store.purge(float(os.getenv('JOB_RETENTION', str(7 * 24 * 3600))))
+job_queue = JobQueue(
+    job_store,
+    _process_job,
+    workers=int(os.getenv('JOB_WORKERS', '2')),
+    max_pending=int(os.getenv('JOB_MAX_PENDING', '100')),
+    lease=float(os.getenv('JOB_LEASE', '120'))
+)
+# 开发服务器开启调试时，Werkzeug重载器的父进程只负责监视文件并重启子进程，不处理请求；
+# 子进程（WERKZEUG_RUN_MAIN=true）同样会执行到这里，只在子进程中恢复，避免同一任务执行两次
+FLASK_DEBUG = os.getenv('FLASK_DEBUG', 'true').lower() == 'true'
+_reloader_parent = __name__ == '__main__' and FLASK_DEBUG and os.getenv('WERKZEUG_RUN_MAIN') != 'true'
+if not _reloader_parent and not _PARSER_WORKER:
+    # 多进程部署时只恢复主进程启动之前遗留的任务（由gunicorn.conf.py写入启动时间）
+    job_queue.recover(float(os.environ['SERVER_STARTED_AT']) if os.getenv('SERVER_STARTED_AT') else None)
+
+_shutdown_lock = threading.Lock()
+_shutdown_done = False
+
+
+def shutdown_services():
+    """优雅退出：等待运行中的任务完成（未开始的任务留待下次启动恢复），关闭解析进程和连接池"""
+    global _shutdown_done
+    with _shutdown_lock:
+        if _shutdown_done:
+            return
+        _shutdown_done = True
+    logger.info("🛑 正在关闭后台服务...")
+    job_queue.shutdown(wait=True, cancel_pending=True)
+    resume_parser.close()
+    llm_http_pool.close()
+
+
+if not _PARSER_WORKER:
+    atexit.register(shutdown_services)
+
+
+@app.before_request
+def _begin_timing():
+    begin_request()
+
+
+@app.after_request
+def _add_server_timing(response):
+    """各阶段耗时写入Server-Timing响应头（流式响应只包含首个字节之前的阶段）"""
+    timings = current_timings()
+    if timings is not None:
+        response.headers['Server-Timing'] = timings.server_timing()
+        REQUEST_SECONDS.observe(time.perf_counter() - timings.started,
+                                endpoint=request.endpoint or 'unknown', status=response.status_code)
+    return response
+
+
+@app.teardown_request
+def _end_timing(exc):
+    end_request()
+
+
+@REGISTRY.collector
+def _runtime_metrics():
+    """/metrics 抓取时导出缓存命中、近似重复命中和队列深度"""
+    hits, misses = [], []
+    for name, cache in (('parse', parse_cache), ('llm', llm_cache), ('parse_handles', parse_handles)):
+        if cache is None:
+            continue
+        stats = cache.stats()
+        hits.append(({'cache': name, 'layer': 'memory'}, stats['memory_hits']))
+        hits.append(({'cache': name, 'layer': 'disk'}, stats['disk_hits']))
+        misses.append(({'cache': name}, stats['misses']))
+    if near_duplicates is not None:
+        stats = near_duplicates.stats()
+        hits.append(({'cache': 'near_duplicates', 'layer': 'simhash'}, stats['hits']))
+        misses.append(({'cache': 'near_duplicates'}, stats['lookups'] - stats['hits']))
+    scheduler = llm_scheduler.stats()
+    admission_stats = {name: limiter.stats() for name, limiter in admission_limiters.items()}
+    coalesced = [({'endpoint': name}, flight.stats()['coalesced']) for name, flight in single_flights.items()]
+    return [
+        ('resume_analyzer_coalesced_requests_total', 'counter', '合并到进行中的相同请求、未重复调用AI的请求数', coalesced),
+        ('resume_analyzer_admission_in_flight', 'gauge', '各接口正在处理的请求数',
+         [({'endpoint': name}, stats['in_flight']) for name, stats in admission_stats.items()]),
+        ('resume_analyzer_admission_waiting', 'gauge', '各接口等待处理名额的请求数',
+         [({'endpoint': name}, stats['waiting']) for name, stats in admission_stats.items()]),
+        ('resume_analyzer_admission_rejected_total', 'counter', '各接口因超出容量被拒绝（429）的请求数',
+         [({'endpoint': name}, stats['rejected'] + stats['timed_out']) for name, stats in admission_stats.items()]),
+        ('resume_analyzer_cache_hits_total', 'counter', '缓存命中次数', hits),
+        ('resume_analyzer_cache_misses_total', 'counter', '缓存未命中次数', misses),
+        ('resume_analyzer_llm_queue_depth', 'gauge', '等待AI调用名额的请求数', [({}, scheduler['queue_depth'])]),
+        ('resume_analyzer_llm_in_flight', 'gauge', '正在进行的AI调用数', [({}, scheduler['in_flight'])]),
+        ('resume_analyzer_jobs_pending', 'gauge', '排队和运行中的后台任务数', [({}, job_queue.depth())]),
+    ]
+
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus指标：各阶段耗时直方图、请求耗时、token用量、缓存命中（多进程部署时为当前工作进程的数据）"""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """健康检查接口"""
-    return jsonify({'status': 'ok', 'message': '服务正常运行'})
+    return jsonify({
+        'status': 'ok',
+        'message': '服务正常运行',
+        'parse_cache': parse_cache.stats() if parse_cache else None,
+        'parse_handles': parse_handles.stats(),
+        'near_duplicates': near_duplicates.stats() if near_duplicates else None,
+        'llm_cache': llm_cache.stats() if llm_cache else None,
+        'llm_pool': llm_http_pool.pool_stats(),
+        'llm_scheduler': llm_scheduler.stats(),
+        'llm_router': analyzer.router.stats(),
+        'admission': {name: limiter.stats() for name, limiter in admission_limiters.items()},
+        'single_flight': {name: flight.stats() for name, flight in single_flights.items()},
+        'jobs': {'pending': job_queue.depth(), 'max_pending': job_queue.max_pending}
+    })
 
 
 @app.route('/upload', methods=['POST'])
 def upload_resume():
     """上传简历文件接口"""
     try:
+        if request.content_length and request.content_length > MAX_FILE_SIZE:
+            return jsonify({'error': '文件过大，请上传小于16MB的文件'}), 413
+
         if 'file' not in request.files:
             return jsonify({'error': '没有文件上传'}), 400
 
@@ -127,11 +814,13 @@ def parse_resume():
             return jsonify({'error': '文件不存在'}), 404
 
         # 解析简历
-        parsed_data = resume_parser.parse_resume(file_path)
+        with stage('parse'):
+            parsed_data = resume_parser.parse_resume(file_path)
 
-        return jsonify({
+        return _json_response({
             'success': True,
-            'data': parsed_data
+            'parse_id': _remember_parse(parsed_data),
+            'data': to_wire(parsed_data, _flag(data.get('compact')))
         })
 
     except Exception as e:
@@ -139,22 +828,26 @@ def parse_resume():
 
 
 @app.route('/analyze', methods=['POST'])
+@admission('analyze')
 def analyze_resume():
     """分析简历并提供建议"""
     try:
         data = request.get_json()
-        if not data or 'resume_data' not in data:
-            return jsonify({'error': '缺少resume_data参数'}), 400
-
-        resume_data = data['resume_data']
+        resume_data, error_response = _resolve_resume_data(data)
+        if error_response:
+            return error_response
 
         # 使用Grok分析简历
-        analysis_result = analyzer.analyze_resume(resume_data)
+        use_cache = not _flag(data.get('bypass_cache'))
+        analysis_result, _ = _coalesced(
+            'analyze', f"{_content_id(resume_data)}:{use_cache}",
+            lambda: analyzer.analyze_resume(resume_data, use_cache)
+        )
 
         if not analysis_result['success']:
             return jsonify({'error': analysis_result['error']}), 500
 
-        return jsonify({
+        return _json_response({
             'success': True,
             'analysis': analysis_result['analysis'],
             'raw_analysis': analysis_result['raw_analysis']
@@ -165,22 +858,26 @@ def analyze_resume():
 
 
 @app.route('/recommend_jobs', methods=['POST'])
+@admission('recommend_jobs')
 def recommend_jobs():
     """推荐岗位接口"""
     try:
         data = request.get_json()
-        if not data or 'resume_data' not in data:
-            return jsonify({'error': '缺少resume_data参数'}), 400
-
-        resume_data = data['resume_data']
+        resume_data, error_response = _resolve_resume_data(data)
+        if error_response:
+            return error_response
 
         # 生成岗位推荐
-        recommendation_result = analyzer.generate_job_recommendations(resume_data)
+        use_cache = not _flag(data.get('bypass_cache'))
+        recommendation_result, _ = _coalesced(
+            'recommend_jobs', f"{_content_id(resume_data)}:{use_cache}",
+            lambda: analyzer.generate_job_recommendations(resume_data, use_cache)
+        )
 
         if not recommendation_result['success']:
             return jsonify({'error': recommendation_result['error']}), 500
 
-        return jsonify({
+        return _json_response({
             'success': True,
             'recommendations': recommendation_result['recommendations']
         })
@@ -190,97 +887,306 @@ def recommend_jobs():
 
 
 @app.route('/full_analysis', methods=['POST'])
+@admission('full_analysis')
 def full_analysis():
     """完整分析流程：上传->解析->分析->推荐"""
     request_id = str(uuid.uuid4())[:8]
-    logger.info(f"🔍 [{request_id}] 开始完整分析流程")
+    logger.info("🔍 [%s] 开始完整分析流程", request_id)
+    request_start = time.perf_counter()
+    timings = {}
 
     try:
         # 1. 检查文件上传
-        logger.debug(f"[{request_id}] 检查文件上传...")
-        if 'file' not in request.files:
-            logger.error(f"[{request_id}] 没有文件上传")
-            return jsonify({'error': '没有文件上传'}), 400
+        file, error_response = _check_upload(request_id)
+        if error_response:
+            return error_response
+        filename = secure_filename(file.filename)
 
-        file = request.files['file']
-        logger.info(f"[{request_id}] 接收到文件: {file.filename}")
+        # 2-3. 保存临时文件并解析简历
+        parsed_data = _parse_upload(file, request_id, timings)
+        logger.debug("[%s] 解析结果: %s", request_id, list(parsed_data.keys()))
+
+        mode = request.form.get('mode', ANALYSIS_MODE)
+        use_cache = not _flag(request.form.get('bypass_cache'))
+        compact = _flag(request.form.get('compact'))
+        # 同一份简历被多人同时上传时只分析一次，结果中的文件名和耗时按各自的请求填写
+        payload, shared = _coalesced(
+            'full_analysis', f"{_content_id(parsed_data)}:{mode}:{use_cache}:{compact}",
+            lambda: _analysis_payload(filename, parsed_data, mode, use_cache, request_id, timings, compact=compact)
+        )
+        if shared:
+            logger.info("[%s] 🔗 合并到正在进行的相同分析", request_id)
+            payload = {**payload, 'original_filename': filename, 'coalesced': True, 'timings': timings}
+
+        timings['total_ms'] = round((time.perf_counter() - request_start) * 1000, 1)
+        logger.info("[%s] 完整分析流程完成，耗时: %s", request_id, timings)
+        return _json_response(payload)
 
-        if file.filename == '':
-            logger.error(f"[{request_id}] 没有选择文件")
-            return jsonify({'error': '没有选择文件'}), 400
+    except Exception as e:
+        logger.error("[%s] 分析过程发生异常: %s", request_id, e)
+        logger.error("[%s] 异常详情: %s", request_id, traceback.format_exc())
+        return jsonify({'error': f'分析失败: {str(e)}'}), 500
 
-        if not allowed_file(file.filename):
-            logger.error(f"[{request_id}] 文件格式不支持: {file.filename}")
-            return jsonify({'error': '只支持.docx格式文件'}), 400
 
-        # 2. 保存临时文件
-        logger.debug(f"[{request_id}] 保存临时文件...")
-        filename = secure_filename(file.filename)
-        temp_filename = f"{uuid.uuid4()}_{filename}"
-        temp_file_path = os.path.join(TEMP_FOLDER, temp_filename)
-        logger.info(f"[{request_id}] 临时文件路径: {temp_file_path}")
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    """提交后台完整分析任务，立即返回任务ID"""
+    request_id = str(uuid.uuid4())[:8]
+    try:
+        # 在接收上传内容之前检查队列容量
+        if job_queue.depth() >= job_queue.max_pending:
+            return _too_many_requests('任务队列已满，请稍后重试', job_queue.retry_after())
 
-        file.save(temp_file_path)
-        file_size = os.path.getsize(temp_file_path)
-        logger.info(f"[{request_id}] 文件保存成功，大小: {file_size} bytes")
+        file, error_response = _check_upload(request_id)
+        if error_response:
+            return error_response
 
+        filename = secure_filename(file.filename)
+        input_path = os.path.join(JOB_INPUT_FOLDER, f"{uuid.uuid4()}_{filename}")
+        file.save(input_path)
+
+        options = {
+            'mode': request.form.get('mode', ANALYSIS_MODE),
+            'use_cache': not _flag(request.form.get('bypass_cache')),
+            'compact': _flag(request.form.get('compact'))
+        }
+        job_id = job_store.create(filename, input_path, options, ['parse', 'analysis', 'recommendations'])
         try:
-            # 3. 解析简历
-            logger.info(f"[{request_id}] 开始解析简历...")
-            parsed_data = resume_parser.parse_resume(temp_file_path)
-            logger.info(f"[{request_id}] 简历解析成功")
-            logger.debug(f"[{request_id}] 解析结果: {list(parsed_data.keys())}")
-
-            # 4. AI分析
-            logger.info(f"[{request_id}] 开始AI分析...")
-            analysis_result = analyzer.analyze_resume(parsed_data)
-            if analysis_result['success']:
-                logger.info(f"[{request_id}] AI分析成功")
-            else:
-                logger.error(f"[{request_id}] AI分析失败: {analysis_result['error']}")
+            job_queue.submit(job_id)
+        except QueueFull as e:
+            job_store.update(job_id, status=STATUS_FAILED, error=str(e))
+            os.remove(input_path)
+            return _too_many_requests('任务队列已满，请稍后重试', job_queue.retry_after())
 
-            # 5. 岗位推荐
-            logger.info(f"[{request_id}] 开始岗位推荐...")
-            recommendation_result = analyzer.generate_job_recommendations(parsed_data)
-            if recommendation_result['success']:
-                logger.info(f"[{request_id}] 岗位推荐成功")
-            else:
-                logger.error(f"[{request_id}] 岗位推荐失败: {recommendation_result['error']}")
+        logger.info("[%s] 已提交后台任务: %s", request_id, job_id)
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status_url': f'/jobs/{job_id}'
+        }), 202
 
-            # 6. 清理临时文件
-            if os.path.exists(temp_file_path):
-                os.remove(temp_file_path)
-                logger.debug(f"[{request_id}] 临时文件已删除")
+    except Exception as e:
+        logger.error("[%s] 提交任务失败: %s", request_id, e)
+        return jsonify({'error': f'提交任务失败: {str(e)}'}), 500
+
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """查询后台任务状态、各阶段进度和最终结果"""
+    job = job_store.get(job_id)
+    if job is None:
+        return jsonify({'error': '任务不存在'}), 404
+
+    return jsonify({
+        'success': True,
+        'job_id': job['id'],
+        'status': job['status'],
+        'stages': job['stages'],
+        'original_filename': job['filename'],
+        'created_at': job['created_at'],
+        'updated_at': job['updated_at'],
+        'result': job['result'],
+        'error': job['error']
+    })
+
+
+@app.route('/batch_analysis', methods=['POST'])
+@admission('batch_analysis')
+def batch_analysis():
+    """批量分析：接收多个.docx或.zip，按完成顺序逐行返回NDJSON结果，最后一行为汇总"""
+    request_id = str(uuid.uuid4())[:8]
+    try:
+        with stage('upload'):
+            items = _collect_batch_files()
+    except zipfile.BadZipFile:
+        return jsonify({'error': '压缩包格式错误'}), 400
+    except BatchTooLarge as e:
+        return jsonify({'error': str(e)}), 413
+    if not items:
+        return jsonify({'error': '没有可分析的.docx文件'}), 400
+
+    mode = request.form.get('mode', ANALYSIS_MODE)
+    use_cache = not _flag(request.form.get('bypass_cache'))
+    compact = _flag(request.form.get('compact'))
+    logger.info("📦 [%s] 开始批量分析: %s份简历", request_id, len(items))
+
+    def generate():
+        start = time.perf_counter()
+        llm_slots = threading.BoundedSemaphore(BATCH_LLM_CONCURRENCY)
+
+        if resume_parser.processes:
+            # 分组读取并在解析进程池中解析（保持顺序，单个文件失败不影响其他文件），
+            # 每组解析完即提交AI分析，同一时间只有一组文件的内容驻留内存
+            parse_start = time.perf_counter()
+            futures = []
+            parsed_count = 0
+            for chunk_start in range(0, len(items), BATCH_PARSE_CHUNK):
+                chunk = list(enumerate(items[chunk_start:chunk_start + BATCH_PARSE_CHUNK], chunk_start))
+                contents, failures = {}, {}
+                for index, entry in chunk:
+                    contents[index], failures[index] = _read_batch_entry(index, entry)
+                valid = [index for index, _ in chunk if contents[index] is not None]
+                parsed = dict.fromkeys(contents)
+                with stage('parse'):
+                    for index, outcome in zip(valid, resume_parser.parse_many([contents[index] for index in valid])):
+                        parsed[index] = outcome
+                parsed_count += len(valid)
+                del contents
+                # futures按文件顺序排列（异常结果按位置取index）
+                for index, entry in chunk:
+                    if failures[index] is not None:
+                        future = Future()
+                        future.set_result(failures[index])
+                    else:
+                        future = batch_executor.submit(_batch_item, index, entry.filename, parsed[index], mode,
+                                                       use_cache, llm_slots, compact)
+                    futures.append(future)
+            parse_ms = round((time.perf_counter() - parse_start) * 1000, 1)
+            logger.info("📦 [%s] 批量解析完成: %s份, 耗时%sms", request_id, parsed_count, parse_ms)
+        else:
+            # 没有解析进程池时不在当前线程中串行解析整批文件，每份简历在批量线程中读取、解析后立即分析并返回结果
+            parse_times = []
+            futures = [
+                batch_executor.submit(_parse_then_analyze, index, entry, mode, use_cache, llm_slots,
+                                      compact, parse_times)
+                for index, entry in enumerate(items)
+            ]
+
+        succeeded, failed, parse_failed = 0, 0, 0
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {'index': futures.index(future), 'success': False, 'stage': 'analysis',
+                          'error': f'分析失败: {str(e)}'}
+            if result['success']:
+                succeeded += 1
+            else:
+                failed += 1
+                if result.get('stage') in ('upload', 'parse'):
+                    parse_failed += 1
+            yield json.dumps(result, ensure_ascii=False) + '\n'
+
+        if not resume_parser.processes:
+            # 逐份解析时为各文件解析耗时之和
+            parse_ms = round(sum(parse_times) * 1000, 1)
+        elapsed = time.perf_counter() - start
+        summary = {
+            'total': len(items),
+            'succeeded': succeeded,
+            'failed': failed,
+            'parse_failed': parse_failed,
+            'parse_ms': parse_ms,
+            'elapsed_s': round(elapsed, 2),
+            'resumes_per_minute': round(len(items) / elapsed * 60, 2) if elapsed else None
+        }
+        logger.info("📦 [%s] 批量分析完成: %s", request_id, summary)
+        yield json.dumps({'summary': summary}, ensure_ascii=False) + '\n'
+
+    # 压缩包中的文件在处理时才解压，输出期间需保持请求上下文（上传文件）不被关闭
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson',
+                    headers={'X-Accel-Buffering': 'no'})
+
+
+@app.route('/analyze_stream', methods=['POST'])
+@admission('analyze_stream')
+def analyze_resume_stream():
+    """流式分析简历（SSE）：逐块推送analysis事件，最后推送done事件"""
+    data = request.get_json()
+    try:
+        resume_data, error_response = _resolve_resume_data(data)
+    except Exception as e:
+        return jsonify({'error': f'解析失败: {str(e)}'}), 500
+    if error_response:
+        return error_response
+    use_cache = not _flag(data.get('bypass_cache'))
 
-            logger.info(f"[{request_id}] 完整分析流程完成")
-            return jsonify({
+    def generate():
+        chunks = []
+        try:
+            for delta in analyzer.stream_analysis(resume_data, use_cache):
+                chunks.append(delta)
+                yield _sse('analysis', {'delta': delta})
+            raw_analysis = ''.join(chunks)
+            yield _sse('done', {
                 'success': True,
-                'original_filename': filename,
-                'parsed_data': parsed_data,
-                'analysis': analysis_result['analysis'] if analysis_result['success'] else None,
-                'recommendations': recommendation_result['recommendations'] if recommendation_result['success'] else None,
-                'errors': {
-                    'analysis_error': None if analysis_result['success'] else analysis_result['error'],
-                    'recommendation_error': None if recommendation_result['success'] else recommendation_result['error']
-                }
+                'analysis': analyzer.structure_analysis(raw_analysis),
+                'raw_analysis': raw_analysis
             })
-
         except Exception as e:
-            # 确保删除临时文件
-            if os.path.exists(temp_file_path):
-                os.remove(temp_file_path)
-                logger.debug(f"[{request_id}] 异常时清理临时文件")
-            raise e
+            logger.error("❌ 流式分析失败: %s", e)
+            yield _sse('error', {'error': f'分析失败: {str(e)}'})
+
+    return _sse_response(generate())
 
+
+@app.route('/full_analysis_stream', methods=['POST'])
+@admission('full_analysis_stream')
+def full_analysis_stream():
+    """流式完整分析（SSE）：先推送parsed事件，再并发推送analysis/recommendations增量，最后推送done事件"""
+    request_id = str(uuid.uuid4())[:8]
+    logger.info("🔍 [%s] 开始流式完整分析流程", request_id)
+    request_start = time.perf_counter()
+    timings = {}
+
+    try:
+        file, error_response = _check_upload(request_id)
+        if error_response:
+            return error_response
+        filename = secure_filename(file.filename)
+        parsed_data = _parse_upload(file, request_id, timings)
     except Exception as e:
-        logger.error(f"[{request_id}] 分析过程发生异常: {str(e)}")
-        logger.error(f"[{request_id}] 异常详情: {traceback.format_exc()}")
+        logger.error("[%s] 解析过程发生异常: %s", request_id, e)
         return jsonify({'error': f'分析失败: {str(e)}'}), 500
 
+    use_cache = not _flag(request.form.get('bypass_cache'))
+    compact = _flag(request.form.get('compact'))
+
+    def generate():
+        yield _sse('parsed', {'original_filename': filename, 'parse_id': _remember_parse(parsed_data),
+                              'parsed_data': to_wire(parsed_data, compact)})
+
+        # 分析和推荐并发执行，增量按到达顺序推送
+        out_queue = queue.Queue()
+        llm_executor.submit(_pump_stream, 'analysis',
+                            lambda: analyzer.stream_analysis(parsed_data, use_cache), out_queue)
+        llm_executor.submit(_pump_stream, 'recommendations',
+                            lambda: analyzer.stream_job_recommendations(parsed_data, use_cache), out_queue)
+
+        results = {}
+        while len(results) < 2:
+            stage, delta, final = out_queue.get()
+            if final is None:
+                yield _sse(stage, {'delta': delta})
+            else:
+                results[stage] = final
+
+        analysis = results['analysis']
+        recommendations = results['recommendations']
+        timings['analysis_ms'] = analysis['ms']
+        timings['recommendation_ms'] = recommendations['ms']
+        timings['total_ms'] = round((time.perf_counter() - request_start) * 1000, 1)
+        logger.info("[%s] 流式完整分析流程完成，耗时: %s", request_id, timings)
+
+        yield _sse('done', {
+            'success': True,
+            'analysis': analyzer.structure_analysis(analysis['text']) if not analysis['error'] else None,
+            'recommendations': recommendations['text'] if not recommendations['error'] else None,
+            'errors': {
+                'analysis_error': f"分析失败: {analysis['error']}" if analysis['error'] else None,
+                'recommendation_error': f"岗位推荐失败: {recommendations['error']}" if recommendations['error'] else None
+            },
+            'timings': timings
+        })
+
+    return _sse_response(generate())
+
 
 @app.errorhandler(413)
 def too_large(e):
     """文件过大错误处理"""
+    if request.endpoint == 'batch_analysis':
+        return jsonify({'error': f'上传内容过大，批量分析每次请上传小于{BATCH_MAX_CONTENT_LENGTH // (1024 * 1024)}MB的文件'}), 413
     return jsonify({'error': '文件过大，请上传小于16MB的文件'}), 413
 
 
@@ -295,4 +1201,9 @@ if __name__ == '__main__':
     print(f"上传目录: {os.path.abspath(UPLOAD_FOLDER)}")
     print(f"临时目录: {os.path.abspath(TEMP_FOLDER)}")
     print("请确保已设置Grok API密钥")
-    app.run(host='127.0.0.1', port=5000, debug=True)
\ No newline at end of file
+    print("开发服务器仅用于调试，生产环境请使用: gunicorn -c gunicorn.conf.py app:app")
+    app.run(
+        host=os.getenv('BACKEND_HOST', '127.0.0.1'),
+        port=int(os.getenv('BACKEND_PORT', '5000')),
+        debug=FLASK_DEBUG
+    )
\ No newline at end of file
@@ -0,0 +1,141 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+# 除邮箱外的所有字段合并为一个预编译正则，一次扫描全文；同一首字符下分支顺序即优先级（手机先于座机）。
+# 每个分支都以单个字符开头，正则引擎据此得到首字符集合，在C层直接跳过其余字符（正文中的大段中文、
+# 不可能开头的数字3/5/6/7/9等），只在候选位置上逐个比较首字符并尝试对应的分支；
+# 前一个字符是数字的位置（数字串中间）在首字符后的后向断言处即失败。
+# 手机、网址等字段在分支末尾放一个空分组作为类别标记（match.lastgroup），值为整个匹配。
+_MONTH = r'\s*[年./-]\s*(?:1[0-2]|0?[1-9])(?!\d)(?:\s*月)?'
+_DATE_TAIL = _MONTH + r'(?:\s*(?:至|到|~|～|—+|–|-)\s*(?:(?:19|20)\d{2}' + _MONTH + r'|至今|现在|今))?'
+_MOBILE_TAIL = r'[3-9]\d(?:[-\s]?\d{4}){2}(?!\d)'
+_LANDLINE_TAIL = r'[-\s]?(?:\d{7,8}|\d{3,4}[-\s]?\d{4})(?!\d)'  # 0755-12345678 / 0755-8888-9999 / 010 8888 9999
+_URL_TAIL = r'/[\w\-./]+'
+_ENTITY_BRANCHES = (
+    # (首字符, 其余部分中的各分支[(类别, 正则)])，类别为None表示正则内已含值分组
+    ('1', r'(?<!\d.)', [('masked', r'[3-9]\d[-\s]?\*{4}[-\s]?\d{4}(?!\d)'), ('mobile', r'(?<!\+.)' + _MOBILE_TAIL),
+                        ('date', r'9\d{2}' + _DATE_TAIL)]),
+    ('2', r'(?<!\d.)', [('date', r'0\d{2}' + _DATE_TAIL)]),
+    ('0', r'(?<!\d.)', [('landline', r'\d{2,3}' + _LANDLINE_TAIL)]),
+    ('8', r'(?<![\d+].)', [('mobile', r'6[-\s]?1' + _MOBILE_TAIL), ('landline', r'00[-\s]?\d{3}[-\s]?\d{4}(?!\d)')]),
+    ('4', r'(?<!\d.)', [('landline', r'00[-\s]?\d{3}[-\s]?\d{4}(?!\d)')]),  # 400-123-4567
+    (r'\+', r'(?<![\d+].)', [('mobile', r'86[-\s]?1' + _MOBILE_TAIL)]),
+    (r'\(', r'(?<!\d.)', [('landline', r'0\d{2,3}\)' + _LANDLINE_TAIL)]),
+    ('h', '', [('url', r'(?i:ttps?://)[^\s，。；、)）]+')]),
+    ('H', '', [('url', r'(?i:ttps?://)[^\s，。；、)）]+')]),
+    ('w', '', [('url', r'(?i:ww\.(?:github|gitee|linkedin)\.com)' + _URL_TAIL)]),
+    ('W', '', [('url', r'(?i:ww\.(?:github|gitee|linkedin)\.com)' + _URL_TAIL)]),
+    ('g', '', [('url', r'(?i:it(?:hub|ee)\.com)' + _URL_TAIL)]),
+    ('G', '', [('url', r'(?i:it(?:hub|ee)\.com)' + _URL_TAIL)]),
+    ('l', '', [('url', r'(?i:inkedin\.com)' + _URL_TAIL)]),
+    ('L', '', [('url', r'(?i:inkedin\.com)' + _URL_TAIL)]),
+    ('姓', '', [(None, r'\s*名\s*[:：]\s*(?P<name_{}>[一-龥]{{2,4}})')]),
+    ('现', '', [(None, r'居地?\s*[:：]\s*(?P<location_{}>[^\s,，;；|｜]{{2,30}})')]),
+    ('所', '', [(None, r'在(?:地|城市)\s*[:：]\s*(?P<location_{}>[^\s,，;；|｜]{{2,30}})')]),
+    ('居', '', [(None, r'住地\s*[:：]\s*(?P<location_{}>[^\s,，;；|｜]{{2,30}})')]),
+    ('地', '', [(None, r'址\s*[:：]\s*(?P<location_{}>[^\s,，;；|｜]{{2,30}})')]),
+    ('籍', '', [(None, r'贯\s*[:：]\s*(?P<location_{}>[^\s,，;；|｜]{{2,30}})')]),
+)
+
+
+def _build_entity_pattern() -> re.Pattern:
+    """拼接各首字符的分支（分组名加序号避免重名，由_GROUP_KINDS映射回类别）"""
+    alternatives = []
+    index = 0
+    for first, guard, branches in _ENTITY_BRANCHES:
+        parts = []
+        for kind, tail in branches:
+            index += 1
+            parts.append(tail.format(index) if kind is None else f'{tail}(?P<{kind}_{index}>)')
+        alternatives.append(f"{first}{guard}(?:{'|'.join(parts)})")
+    return re.compile('|'.join(alternatives))
+
+
+_ENTITY_PATTERN = _build_entity_pattern()
+_GROUP_KINDS = {name: name.rsplit('_', 1)[0] for name in _ENTITY_PATTERN.groupindex}
+
+# 邮箱可以由任意字母数字开头，放进上面的扫描会让正文中每个字母都要尝试一次；
+# 改为用str.find定位"@"，再向前找到本地部分的开头
+_EMAIL_PATTERN = re.compile(r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+_EMAIL_LOCAL_CHARS = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789._%+-')
+
+# 只标记类别的字段，值为整个匹配
+_WHOLE_MATCH_TYPES = frozenset(('masked', 'mobile', 'landline', 'date', 'url'))
+
+_CHINESE_NAME = re.compile(r'[\u4e00-\u9fa5]{2,4}')
+
+ENTITY_TYPES = ('email', 'mobile', 'landline', 'masked', 'url', 'date', 'name', 'location')
+
+
+def extract_entities(text: str) -> Dict[str, List[Dict]]:
+    """一次扫描提取所有邮箱、电话（手机/座机/掩码）、网址、日期、姓名和所在地
+
+    返回 {类型: [{'value', 'start', 'end'}, ...]}，按出现顺序排列。
+    """
+    entities: Dict[str, List[Dict]] = {kind: [] for kind in ENTITY_TYPES}
+    emails = _find_emails(text)
+    shadowed = set()
+    for match in _ENTITY_PATTERN.finditer(text):
+        kind = _GROUP_KINDS[match.lastgroup]
+        # 与邮箱重叠时保留先开始的一个（与从左到右逐位置匹配的结果一致），如邮箱本地部分中的手机号让位于邮箱
+        if emails:
+            index = _overlapping_email(emails, *match.span())
+            if index is not None:
+                if match.start() >= emails[index][0]:
+                    continue
+                shadowed.add(index)
+        start, end = match.span() if kind in _WHOLE_MATCH_TYPES else match.span(match.lastgroup)
+        entities[kind].append({'value': text[start:end], 'start': start, 'end': end})
+    entities['email'] = [{'value': text[start:end], 'start': start, 'end': end}
+                         for index, (start, end) in enumerate(emails) if index not in shadowed]
+
+    # 没有"姓名："标注时，取第一行中的中文名字
+    if not entities['name']:
+        newline = text.find('\n')
+        name_match = _CHINESE_NAME.search(text, 0, newline if newline >= 0 else len(text))
+        if name_match:
+            entities['name'].append({'value': name_match.group(), 'start': name_match.start(),
+                                     'end': name_match.end()})
+    return entities
+
+
+def _find_emails(text: str) -> List[Tuple[int, int]]:
+    """定位所有"@"，从本地部分的开头匹配邮箱，返回[(起, 止)]"""
+    emails = []
+    at = text.find('@')
+    while at >= 0:
+        start = at
+        while start > 0 and text[start - 1] in _EMAIL_LOCAL_CHARS:
+            start -= 1
+        match = _EMAIL_PATTERN.match(text, start) if start < at else None
+        if match:
+            emails.append(match.span())
+            at = text.find('@', match.end())
+        else:
+            at = text.find('@', at + 1)
+    return emails
+
+
+def _overlapping_email(emails: List[Tuple[int, int]], start: int, end: int) -> Optional[int]:
+    """与[start, end)重叠的邮箱序号"""
+    for index, (email_start, email_end) in enumerate(emails):
+        if start < email_end and end > email_start:
+            return index
+    return None
+
+
+def summarize(entities: Dict[str, List[Dict]]) -> Dict:
+    """汇总为基本信息字典（保留旧版的邮箱/电话/可能的姓名字段，其余字段只在识别到时出现）"""
+    basic_info = {}
+    if entities['email']:
+        basic_info['邮箱'] = entities['email'][0]['value']
+    phones = entities['mobile'] or entities['landline'] or entities['masked']
+    if phones:
+        basic_info['电话'] = phones[0]['value']
+    if entities['name']:
+        basic_info['可能的姓名'] = entities['name'][0]['value']
+    if entities['location']:
+        basic_info['所在地'] = entities['location'][0]['value']
+    if entities['url']:
+        basic_info['主页'] = ', '.join(item['value'] for item in entities['url'])
+    return basic_info
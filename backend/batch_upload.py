@@ -0,0 +1,66 @@
+import os
+import zipfile
+from typing import Callable, Iterable, List, Optional
+
+
+class BatchTooLarge(Exception):
+    """批量上传的文件数或解压后总大小超出上限"""
+
+
+class BatchEntry:
+    """批量上传中的一份简历：内容在处理到该文件时才读取（或解压），不预先缓存整批文件"""
+
+    __slots__ = ('filename', '_reader')
+
+    def __init__(self, filename: str, reader: Optional[Callable[[], Optional[bytes]]]):
+        self.filename = filename
+        self._reader = reader
+
+    def read(self) -> Optional[bytes]:
+        """返回文件内容；None表示文件过大"""
+        return self._reader() if self._reader is not None else None
+
+
+def collect_batch_files(files: Iterable, allowed: Callable[[str], bool], max_file_size: int,
+                        max_files: int, max_total_bytes: int) -> List[BatchEntry]:
+    """收集批量上传的简历：多个上传文件，或.zip压缩包中的.docx
+
+    压缩包只读取目录：按声明的解压大小检查单个文件和总大小，超出上限时抛出BatchTooLarge。
+    解压时读取量不超过声明的大小（与实际不符会CRC校验失败），因此声明的总大小就是实际解压量的上限。
+    调用方需在所有条目读取完毕前保持上传文件打开。
+    """
+    entries = []
+    total_bytes = 0
+    for file in files:
+        if not file.filename:
+            continue
+        if file.filename.lower().endswith('.zip'):
+            archive = zipfile.ZipFile(file.stream)
+            for info in archive.infolist():
+                name = info.filename
+                if info.is_dir() or name.startswith('__MACOSX/') or not allowed(name):
+                    continue
+                if info.file_size > max_file_size:
+                    entries.append(BatchEntry(os.path.basename(name), None))
+                else:
+                    total_bytes += info.file_size
+                    entries.append(BatchEntry(os.path.basename(name), _zip_reader(archive, info)))
+                _check_limits(len(entries), total_bytes, max_files, max_total_bytes)
+        elif allowed(file.filename):
+            entries.append(BatchEntry(file.filename, file.read))
+            _check_limits(len(entries), total_bytes, max_files, max_total_bytes)
+    return entries
+
+
+def _zip_reader(archive: zipfile.ZipFile, info: zipfile.ZipInfo) -> Callable[[], bytes]:
+    def read():
+        with archive.open(info) as entry:
+            return entry.read()
+    return read
+
+
+def _check_limits(count: int, total_bytes: int, max_files: int, max_total_bytes: int):
+    if count > max_files:
+        raise BatchTooLarge(f"批量分析每次最多{max_files}份简历")
+    if total_bytes > max_total_bytes:
+        raise BatchTooLarge(f"压缩包解压后超过{max_total_bytes // (1024 * 1024)}MB")
@@ -1,48 +1,118 @@
-from openai import OpenAI
+import re
 import logging
+import time
+import hashlib
 import traceback
-from typing import Dict, List
+from typing import Callable, Dict, Iterator, List, Optional
 import json
+from contextlib import contextmanager
+from result_cache import ResultCache, content_key
+from http_pool import HttpPool
+from llm_scheduler import LLMScheduler
+from llm_router import Provider, ProviderRouter, preset_for_key
+from resume_sections import section_index, select_sections
+from token_budget import TokenBudget, estimate_tokens
+from metrics import LLM_TOKENS, record_stage, stage, timed_stage
 
 # 配置日志
 logger = logging.getLogger(__name__)
 
+# 提示词逻辑变化时需要递增，使旧的AI响应缓存失效
+PROMPT_VERSION = '1'
+
+# 合并模式下分析结果的七个方面
+ANALYSIS_SECTIONS = [
+    '个人信息完整性',
+    '教育背景描述',
+    '工作经历描述',
+    '技能展示',
+    '项目经历描述',
+    '整体格式和结构',
+    '语言表达和专业性'
+]
+# 合并模式的七个方面对应到分开模式（_structure_analysis）的结果键，两种模式返回相同的键
+ANALYSIS_SECTION_KEYS = {
+    '个人信息完整性': '个人信息',
+    '教育背景描述': '教育背景',
+    '工作经历描述': '工作经历',
+    '技能展示': '技能展示',
+    '项目经历描述': '项目经历',
+    '整体格式和结构': '整体建议',
+    '语言表达和专业性': '整体建议'
+}
+JOB_RECOMMENDATION_COUNT = 5
+
+# 岗位推荐只需要的简历章节（其余章节不发送给AI，减少输入token）
+RECOMMENDATION_SECTIONS = ('技能', '工作经历', '项目经历')
+
+# 合并模式的JSON响应结构
+COMBINED_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'analysis': {
+            'type': 'object',
+            'properties': {
+                section: {
+                    'type': 'object',
+                    'properties': {
+                        '现状分析': {'type': 'string'},
+                        '具体问题': {'type': 'string'},
+                        '改进建议': {'type': 'string'},
+                        '优化示例': {'type': 'string'}
+                    },
+                    'required': ['现状分析', '具体问题', '改进建议', '优化示例'],
+                    'additionalProperties': False
+                }
+                for section in ANALYSIS_SECTIONS
+            },
+            'required': ANALYSIS_SECTIONS,
+            'additionalProperties': False
+        },
+        'recommendations': {
+            'type': 'array',
+            'minItems': JOB_RECOMMENDATION_COUNT,
+            'maxItems': JOB_RECOMMENDATION_COUNT,
+            'items': {
+                'type': 'object',
+                'properties': {
+                    'name': {'type': 'string'},
+                    'reason': {'type': 'string'},
+                    'score': {'type': 'integer', 'minimum': 1, 'maximum': 10},
+                    'skills_to_strengthen': {'type': 'array', 'items': {'type': 'string'}}
+                },
+                'required': ['name', 'reason', 'score', 'skills_to_strengthen'],
+                'additionalProperties': False
+            }
+        }
+    },
+    'required': ['analysis', 'recommendations'],
+    'additionalProperties': False
+}
+
 
 class DeepSeekAnalyzer:
     """通用AI分析器（支持DeepSeek和Grok）"""
 
-    def __init__(self, api_key: str, use_grok: bool = True):
+    def __init__(self, api_key: str, use_grok: bool = True, cache: Optional[ResultCache] = None,
+                 http_pool: Optional[HttpPool] = None, scheduler: Optional[LLMScheduler] = None,
+                 router: Optional[ProviderRouter] = None, budget: Optional[TokenBudget] = None):
         logger.info("🤖 初始化AI分析器...")
+        self.cache = cache
+        self.budget = budget or TokenBudget()
+        self.http_pool = http_pool
+        self.scheduler = scheduler
         try:
-            if use_grok:
-                # 检查API密钥格式
-                if api_key.startswith('sk-or-'):
-                    # 使用OpenRouter的Grok API
-                    self.client = OpenAI(
-                        api_key=api_key,
-                        base_url="https://openrouter.ai/api/v1",
-                        default_headers={"HTTP-Referer": "http://localhost:5000", "X-Title": "Resume Analyzer"}
-                    )
-                    self.model_name = "x-ai/grok-4-fast:free"
-                    logger.info("✅ OpenRouter Grok客户端初始化成功")
-                else:
-                    # 假设是官方API密钥
-                    self.client = OpenAI(
-                        api_key=api_key,
-                        base_url="https://api.x-ai.com/v1"
-                    )
-                    self.model_name = "grok-beta"
-                    logger.info("✅ X.AI官方客户端初始化成功")
-            else:
-                # 使用DeepSeek API
-                self.client = OpenAI(
-                    api_key=api_key,
-                    base_url="https://api.deepseek.com"
-                )
-                self.model_name = "deepseek-chat"
-                logger.info("✅ DeepSeek客户端初始化成功")
+            if router is None:
+                # 未配置多服务商时，按密钥格式选择单个服务商
+                provider = Provider(preset_for_key(api_key, use_grok), api_key, http_pool=http_pool)
+                router = ProviderRouter([provider], scheduler=scheduler)
+            self.router = router
+            # 日志显示主服务商的模型名；故障切换/对冲时可能由任一服务商作答，
+            # 缓存键因此包含全部已配置的模型，服务商配置变化后旧缓存自动失效
+            self.model_name = router.primary.model_name
+            self.cache_models = sorted({provider.model_name for provider in router.providers})
         except Exception as e:
-            logger.error(f"❌ AI客户端初始化失败: {str(e)}")
+            logger.error("❌ AI客户端初始化失败: %s", e)
             raise
         self.system_prompt = """
 你是一个专业的简历分析师，请根据用户提供的简历内容，提供详细的修改建议。
@@ -62,10 +132,36 @@ class DeepSeekAnalyzer:
 - 改进建议
 - 优化后的示例（如适用）
 
+请用中文回答，语言要专业、具体、可操作。
+"""
+        self.job_prompt = """
+基于提供的简历内容，请推荐5个最适合的岗位，并说明推荐理由。
+
+对于每个推荐岗位，请提供：
+1. 岗位名称
+2. 推荐理由
+3. 匹配度（1-10分）
+4. 需要加强的技能
+
+请用中文回答，格式要清晰。
+"""
+        self.combined_prompt = f"""
+你是一个专业的简历分析师和职业顾问。请根据用户提供的简历内容，一次性完成简历分析和岗位推荐。
+
+简历分析需覆盖以下七个方面：{'、'.join(ANALYSIS_SECTIONS)}。
+每个方面包含：现状分析、具体问题、改进建议、优化示例（不适用时填写空字符串）。
+
+岗位推荐需给出{JOB_RECOMMENDATION_COUNT}个最适合的岗位，每个岗位包含：
+name（岗位名称）、reason（推荐理由）、score（匹配度，1-10的整数）、skills_to_strengthen（需要加强的技能列表）。
+
+只输出一个JSON对象，不要输出任何其他文字，格式如下：
+{{"analysis": {{"个人信息完整性": {{"现状分析": "", "具体问题": "", "改进建议": "", "优化示例": ""}}, ...}},
+ "recommendations": [{{"name": "", "reason": "", "score": 8, "skills_to_strengthen": [""]}}, ...]}}
+
 请用中文回答，语言要专业、具体、可操作。
 """
 
-    def analyze_resume(self, resume_data: Dict) -> Dict:
+    def analyze_resume(self, resume_data: Dict, use_cache: bool = True) -> Dict:
         """分析简历并提供建议"""
         logger.info("🤖 开始AI分析简历...")
 
@@ -73,27 +169,15 @@ class DeepSeekAnalyzer:
             # 构造用户输入
             logger.debug("📝 格式化简历数据...")
             user_content = self._format_resume_for_analysis(resume_data)
-            logger.debug(f"📏 输入内容长度: {len(user_content)} 字符")
+            logger.debug("📏 输入内容长度: %s 字符", len(user_content))
 
             logger.info("🌐 调用AI API...")
-            logger.debug(f"🎯 使用模型: {self.model_name}")
-
-            response = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": user_content}
-                ],
-                temperature=0.7,
-                max_tokens=2000,
-                timeout=300  # 增加超时时间到5分钟
-            )
+            logger.debug("🎯 使用模型: %s", self.model_name)
 
-            logger.info("✅ API调用成功")
+            analysis_result = self._complete(self.system_prompt, user_content, max_tokens=2000, use_cache=use_cache)
 
-            # 解析响应
-            analysis_result = response.choices[0].message.content
-            logger.debug(f"📥 响应长度: {len(analysis_result)} 字符")
+            logger.info("✅ API调用成功")
+            logger.debug("📥 响应长度: %s 字符", len(analysis_result))
 
             # 结构化分析结果
             logger.debug("🔄 结构化分析结果...")
@@ -107,8 +191,8 @@ class DeepSeekAnalyzer:
             }
 
         except Exception as e:
-            logger.error(f"❌ AI分析失败: {str(e)}")
-            logger.error(f"📋 异常详情: {traceback.format_exc()}")
+            logger.error("❌ AI分析失败: %s", e)
+            logger.error("📋 异常详情: %s", traceback.format_exc())
             return {
                 'success': False,
                 'error': f"分析失败: {str(e)}",
@@ -116,6 +200,127 @@ class DeepSeekAnalyzer:
                 'raw_analysis': None
             }
 
+    def _complete(self, system_prompt: str, user_content: str, max_tokens: int,
+                  use_cache: bool = True, validate: Optional[Callable] = None, adaptive: bool = True,
+                  **extra) -> str:
+        """调用对话补全接口（带响应缓存）
+
+        use_cache=False 时跳过缓存读取，但仍会用新结果刷新缓存；
+        validate 校验失败的结果不会写入缓存；adaptive=False 时不按输入长度调整max_tokens。
+        """
+        if adaptive:
+            max_tokens = self.budget.max_tokens_for(max_tokens, estimate_tokens(user_content))
+        params = {'temperature': 0.7, 'max_tokens': max_tokens, **extra}
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._cache_key(system_prompt, user_content, params)
+            if use_cache:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    logger.info("⚡ 命中AI响应缓存，跳过API调用")
+                    return cached['content']
+
+        with self._slot(system_prompt, user_content, params) as usage, stage('llm'):
+            response = self.router.complete(
+                self._messages(system_prompt, user_content),
+                {**params, 'timeout': 300}  # 增加超时时间到5分钟
+            )
+            usage['tokens'] = response.usage.total_tokens if response.usage else None
+        self._log_usage(system_prompt, user_content, params, response)
+        content = response.choices[0].message.content
+
+        if cache_key is not None:
+            if validate is not None:
+                validate(content)
+            self.cache.put(cache_key, {'content': content})
+        return content
+
+    def _complete_stream(self, system_prompt: str, user_content: str, max_tokens: int,
+                         use_cache: bool = True) -> Iterator[str]:
+        """流式调用对话补全接口，逐块产出文本；命中缓存时一次性产出完整结果"""
+        max_tokens = self.budget.max_tokens_for(max_tokens, estimate_tokens(user_content))
+        params = {'temperature': 0.7, 'max_tokens': max_tokens}
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._cache_key(system_prompt, user_content, params)
+            if use_cache:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    logger.info("⚡ 命中AI响应缓存，跳过API调用")
+                    yield cached['content']
+                    return
+
+        chunks = []
+        # 流式调用在整个输出期间占用调度名额
+        with self._slot(system_prompt, user_content, params), stage('llm'):
+            stream = self.router.stream(
+                self._messages(system_prompt, user_content),
+                {**params, 'timeout': 300}  # 增加超时时间到5分钟
+            )
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    chunks.append(delta)
+                    yield delta
+
+        if cache_key is not None:
+            self.cache.put(cache_key, {'content': ''.join(chunks)})
+
+    def _messages(self, system_prompt: str, user_content: str) -> List[Dict]:
+        """构造对话消息"""
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_content}
+        ]
+
+    def _estimate_tokens(self, system_prompt: str, user_content: str, params: Dict) -> int:
+        """估算一次调用的令牌数（输入估算 + 输出上限）"""
+        return estimate_tokens(system_prompt) + estimate_tokens(user_content) + params.get('max_tokens', 0)
+
+    def _log_usage(self, system_prompt: str, user_content: str, params: Dict, response):
+        """记录输入token的本地估算值和上游返回的实际用量"""
+        if not response.usage:
+            return
+        LLM_TOKENS.inc(response.usage.prompt_tokens, kind='prompt')
+        LLM_TOKENS.inc(response.usage.completion_tokens, kind='completion')
+        estimated = estimate_tokens(system_prompt) + estimate_tokens(user_content)
+        actual = response.usage.prompt_tokens
+        error = (estimated - actual) / actual * 100 if actual else 0.0
+        logger.info("🔢 输入token 估算%s/实际%s（偏差%+.0f%%），输出token 上限%s/实际%s",
+                    estimated, actual, error, params['max_tokens'], response.usage.completion_tokens)
+
+    @contextmanager
+    def _slot(self, system_prompt: str, user_content: str, params: Dict):
+        """经调度器限流后再调用上游；未配置调度器时直接放行"""
+        if self.scheduler is None:
+            yield {'tokens': None}
+            return
+        queued_at = time.perf_counter()
+        with self.scheduler.slot(self._estimate_tokens(system_prompt, user_content, params)) as usage:
+            record_stage('llm_queue', time.perf_counter() - queued_at)
+            yield usage
+
+    def _cache_key(self, system_prompt: str, user_content: str, params: Dict) -> str:
+        """AI响应缓存键：已配置的模型 + 提示词版本 + 采样参数 + 归一化后的简历内容"""
+        prompt_hash = hashlib.sha256(system_prompt.encode('utf-8')).hexdigest()
+        header = json.dumps([self.cache_models, prompt_hash, params], sort_keys=True, ensure_ascii=False)
+        # 只有空白差异的重复提交视为同一份简历
+        normalized = re.sub(r'\s+', ' ', user_content).strip()
+        return content_key(f"{header}\n{normalized}".encode('utf-8'), f"llm-{PROMPT_VERSION}")
+
+    def warm_up(self):
+        """预先建立到各AI服务商的连接（需要使用共享连接池）"""
+        self.router.warm_up()
+
+    def pool_stats(self) -> Optional[Dict]:
+        """连接池复用统计"""
+        return self.http_pool.pool_stats() if self.http_pool else None
+
+    @timed_stage('format')
     def _format_resume_for_analysis(self, resume_data: Dict) -> str:
         """格式化简历数据供分析（简化版）"""
         formatted_content = "以下是简历内容:\n\n"
@@ -127,17 +332,36 @@ class DeepSeekAnalyzer:
                 formatted_content += f"{key}: {value}\n"
             formatted_content += "\n"
 
-        # 完整的原始文本内容
+        # 完整的原始文本内容（去除样板行和重复行，超出输入预算时截断）
         if resume_data.get('raw_text'):
+            resume_text, _ = self.budget.fit(resume_data['raw_text'])
             formatted_content += "完整简历内容:\n"
             formatted_content += "=" * 40 + "\n"
-            formatted_content += resume_data['raw_text']
+            formatted_content += resume_text
             formatted_content += "\n" + "=" * 40
         else:
             formatted_content += "未能获取到简历内容"
 
         return formatted_content
 
+    @timed_stage('format')
+    def _format_resume_for_recommendations(self, resume_data: Dict) -> str:
+        """岗位推荐用的简历内容：只保留技能、工作经历和项目经历章节；识别不到这些章节时退回完整内容"""
+        raw_text = resume_data.get('raw_text') or ''
+        sections = resume_data.get('sections')
+        if sections is None:
+            sections = section_index(raw_text)
+        selected = select_sections(raw_text, sections, RECOMMENDATION_SECTIONS)
+        if not selected:
+            return self._format_resume_for_analysis(resume_data)
+
+        logger.debug("✂️ 岗位推荐输入按章节裁剪: %s -> %s 字符", len(raw_text), len(selected))
+        formatted_content = "以下是简历中的技能、工作经历和项目经历:\n\n"
+        formatted_content += "=" * 40 + "\n"
+        formatted_content += self.budget.fit(selected)[0]
+        formatted_content += "\n" + "=" * 40
+        return formatted_content
+
     def _structure_analysis(self, analysis_text: str) -> Dict:
         """结构化分析结果"""
         try:
@@ -176,44 +400,158 @@ class DeepSeekAnalyzer:
             # 如果结构化失败，返回原始文本
             return {'整体分析': analysis_text}
 
-    def generate_job_recommendations(self, resume_data: Dict) -> Dict:
+    def generate_job_recommendations(self, resume_data: Dict, use_cache: bool = True) -> Dict:
         """根据简历推荐合适的岗位"""
         try:
-            job_prompt = """
-基于提供的简历内容，请推荐5个最适合的岗位，并说明推荐理由。
+            user_content = self._format_resume_for_recommendations(resume_data)
 
-对于每个推荐岗位，请提供：
-1. 岗位名称
-2. 推荐理由
-3. 匹配度（1-10分）
-4. 需要加强的技能
+            recommendations = self._complete(self.job_prompt, user_content, max_tokens=1500, use_cache=use_cache)
 
-请用中文回答，格式要清晰。
-"""
+            return {
+                'success': True,
+                'recommendations': recommendations
+            }
+
+        except Exception as e:
+            return {
+                'success': False,
+                'error': f"岗位推荐失败: {str(e)}",
+                'recommendations': None
+            }
 
+    def stream_analysis(self, resume_data: Dict, use_cache: bool = True) -> Iterator[str]:
+        """流式分析简历，逐块产出分析文本"""
+        logger.info("🤖 开始AI流式分析简历...")
+        user_content = self._format_resume_for_analysis(resume_data)
+        return self._complete_stream(self.system_prompt, user_content, max_tokens=2000, use_cache=use_cache)
+
+    def stream_job_recommendations(self, resume_data: Dict, use_cache: bool = True) -> Iterator[str]:
+        """流式生成岗位推荐，逐块产出推荐文本"""
+        logger.info("🤖 开始AI流式岗位推荐...")
+        user_content = self._format_resume_for_recommendations(resume_data)
+        return self._complete_stream(self.job_prompt, user_content, max_tokens=1500, use_cache=use_cache)
+
+    def structure_analysis(self, analysis_text: str) -> Dict:
+        """结构化完整的分析文本（供流式接口在结束时使用）"""
+        return self._structure_analysis(analysis_text)
+
+    def analyze_combined(self, resume_data: Dict, use_cache: bool = True) -> Dict:
+        """合并模式：一次请求同时完成简历分析和岗位推荐（JSON结构化输出）"""
+        logger.info("🤖 开始AI合并分析（分析+推荐）...")
+
+        try:
             user_content = self._format_resume_for_analysis(resume_data)
+            logger.debug("📏 输入内容长度: %s 字符", len(user_content))
+
+            # 不支持json_schema的服务商（DeepSeek）会由路由器降级为json_object
+            response_format = {
+                'type': 'json_schema',
+                'json_schema': {'name': 'resume_review', 'strict': True, 'schema': COMBINED_SCHEMA}
+            }
 
-            response = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {"role": "system", "content": job_prompt},
-                    {"role": "user", "content": user_content}
-                ],
-                temperature=0.7,
-                max_tokens=1500,
-                timeout=300  # 增加超时时间到5分钟
+            raw_result = self._complete(
+                # JSON输出被截断会导致解析失败，不缩小max_tokens
+                self.combined_prompt, user_content, max_tokens=3500, use_cache=use_cache, adaptive=False,
+                validate=lambda text: self._validate_combined(self._load_json(text)),
+                response_format=response_format
             )
+            logger.debug("📥 响应长度: %s 字符", len(raw_result))
 
-            recommendations = response.choices[0].message.content
+            payload = self._validate_combined(self._load_json(raw_result))
 
+            logger.info("🎉 合并分析完成")
             return {
                 'success': True,
-                'recommendations': recommendations
+                'analysis': self._render_analysis_sections(payload['analysis']),
+                'raw_analysis': raw_result,
+                'recommendations': self._render_recommendations(payload['recommendations']),
+                'recommendation_items': payload['recommendations']
             }
 
         except Exception as e:
+            logger.error("❌ AI合并分析失败: %s", e)
+            logger.error("📋 异常详情: %s", traceback.format_exc())
             return {
                 'success': False,
-                'error': f"岗位推荐失败: {str(e)}",
-                'recommendations': None
-            }
\ No newline at end of file
+                'error': f"分析失败: {str(e)}",
+                'recommendation_error': f"岗位推荐失败: {str(e)}",
+                'analysis': None,
+                'raw_analysis': None,
+                'recommendations': None,
+                'recommendation_items': None
+            }
+
+    def _load_json(self, text: str) -> Dict:
+        """解析模型返回的JSON（兼容```json代码块包裹）"""
+        text = text.strip()
+        if text.startswith('```'):
+            text = text.split('\n', 1)[1] if '\n' in text else ''
+            text = text.rsplit('```', 1)[0]
+        return json.loads(text)
+
+    def _validate_combined(self, payload: Dict) -> Dict:
+        """校验合并模式的JSON结果，不符合结构时抛出ValueError"""
+        if not isinstance(payload, dict):
+            raise ValueError("响应不是JSON对象")
+
+        analysis = payload.get('analysis')
+        if not isinstance(analysis, dict):
+            raise ValueError("响应缺少analysis字段")
+        missing = [section for section in ANALYSIS_SECTIONS if not isinstance(analysis.get(section), dict)]
+        if missing:
+            raise ValueError(f"分析结果缺少以下方面: {', '.join(missing)}")
+
+        recommendations = payload.get('recommendations')
+        if not isinstance(recommendations, list) or not recommendations:
+            raise ValueError("响应缺少recommendations字段")
+        items = []
+        for index, item in enumerate(recommendations[:JOB_RECOMMENDATION_COUNT], 1):
+            if not isinstance(item, dict) or not item.get('name'):
+                raise ValueError(f"第{index}个推荐岗位缺少名称")
+            try:
+                score = int(item.get('score'))
+            except (TypeError, ValueError):
+                raise ValueError(f"第{index}个推荐岗位的匹配度无效: {item.get('score')}")
+            skills = item.get('skills_to_strengthen') or []
+            if isinstance(skills, str):
+                skills = [skills]
+            items.append({
+                'name': str(item['name']),
+                'reason': str(item.get('reason', '')),
+                'score': min(max(score, 1), 10),
+                'skills_to_strengthen': [str(skill) for skill in skills]
+            })
+
+        return {
+            'analysis': {section: analysis[section] for section in ANALYSIS_SECTIONS},
+            'recommendations': items
+        }
+
+    def _render_analysis_sections(self, analysis: Dict) -> Dict:
+        """把结构化分析转成与analyze_resume相同的 {方面: 文本} 格式（键见 ANALYSIS_SECTION_KEYS）"""
+        structured = {}
+        for section in ANALYSIS_SECTIONS:
+            lines = []
+            for label in ('现状分析', '具体问题', '改进建议', '优化示例'):
+                value = str(analysis[section].get(label, '')).strip()
+                if value:
+                    lines.append(f"**{label}**: {value}")
+            if not lines:
+                continue
+            key = ANALYSIS_SECTION_KEYS[section]
+            # 格式和语言两个方面合并到"整体建议"，保留原方面名作为小标题
+            if list(ANALYSIS_SECTION_KEYS.values()).count(key) > 1:
+                lines.insert(0, f"【{section}】")
+            structured[key] = (structured[key] + '\n' if key in structured else '') + '\n'.join(lines)
+        return structured
+
+    def _render_recommendations(self, items: List[Dict]) -> str:
+        """把结构化岗位推荐转成与generate_job_recommendations相同的文本格式"""
+        blocks = []
+        for index, item in enumerate(items, 1):
+            block = f"### {index}. {item['name']}（匹配度: {item['score']}/10）\n"
+            block += f"- 推荐理由: {item['reason']}\n"
+            if item['skills_to_strengthen']:
+                block += f"- 需要加强的技能: {'、'.join(item['skills_to_strengthen'])}\n"
+            blocks.append(block)
+        return '\n'.join(blocks)
@@ -0,0 +1,176 @@
+import re
+import zipfile
+import logging
+from xml.parsers import expat
+from typing import Dict, List, Optional, Tuple
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# WordprocessingML 命名空间
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+# 标记兼容性命名空间（文本框在 mc:Choice 和 mc:Fallback 中各有一份）
+MC_NS = 'http://schemas.openxmlformats.org/markup-compatibility/2006'
+
+DOCUMENT_PART = 'word/document.xml'
+HEADER_PART = re.compile(r'^word/header(\d*)\.xml$')
+FOOTER_PART = re.compile(r'^word/footer(\d*)\.xml$')
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def _w(tag: str) -> str:
+    """expat 的带命名空间标签名（uri + 空格 + 本地名）"""
+    return f"{W_NS} {tag}"
+
+
+PARAGRAPH = _w('p')
+RUN = _w('r')
+TEXT = _w('t')
+TABLE_ROW = _w('tr')
+TABLE_CELL = _w('tc')
+TEXTBOX_CONTENT = _w('txbxContent')
+MC_FALLBACK = f"{MC_NS} Fallback"
+
+# 文本来源标签
+SOURCE_BODY = 'body'
+SOURCE_TABLE = 'table'
+SOURCE_TEXTBOX = 'textbox'
+SOURCE_HEADER = 'header'
+SOURCE_FOOTER = 'footer'
+
+# 与 python-docx 的 Run.text 保持一致的特殊元素
+RUN_SPECIAL_CHARS = {
+    _w('tab'): '\t',
+    _w('ptab'): '\t',
+    _w('cr'): '\n',
+    _w('noBreakHyphen'): '-',
+}
+BREAK = _w('br')
+
+
+class _BlockCollector:
+    """流式收集一个部件中的全部文本块：正文段落、表格行、文本框段落（按阅读顺序）
+
+    表格按行输出，同一行的单元格用" | "连接；文本框内容在锚点处输出；
+    mc:Fallback 中的重复内容（旧版VML文本框）被跳过。
+    """
+
+    def __init__(self, source: str, blocks: List[Tuple[str, str]]):
+        self.source = source
+        self.blocks = blocks
+        self._stack: List[str] = []
+        self._skip_depth = -1  # 处于 mc:Fallback 内时为其在栈中的位置
+        self._paragraphs: List[List[str]] = []  # 嵌套段落（文本框段落位于外层段落的run中）
+        self._containers: List[str] = []  # 最近的容器：单元格或文本框
+        self._rows: List[List[List[str]]] = []  # 表格行 -> 单元格 -> 段落文本
+        self._in_text = False
+
+    def start(self, name: str, attrs: Dict):
+        parent = self._stack[-1] if self._stack else None
+        self._stack.append(name)
+        if self._skip_depth >= 0:
+            return
+        if name == MC_FALLBACK:
+            self._skip_depth = len(self._stack) - 1
+        elif name == PARAGRAPH:
+            self._paragraphs.append([])
+        elif name == TABLE_ROW:
+            self._rows.append([])
+        elif name == TABLE_CELL:
+            if self._rows:
+                self._rows[-1].append([])
+            self._containers.append(TABLE_CELL)
+        elif name == TEXTBOX_CONTENT:
+            self._containers.append(TEXTBOX_CONTENT)
+        elif parent == RUN and self._paragraphs:
+            if name == TEXT:
+                self._in_text = True
+            elif name in RUN_SPECIAL_CHARS:
+                self._paragraphs[-1].append(RUN_SPECIAL_CHARS[name])
+            elif name == BREAK:
+                if attrs.get(_w('type'), 'textWrapping') == 'textWrapping':
+                    self._paragraphs[-1].append('\n')
+
+    def end(self, name: str):
+        self._stack.pop()
+        if self._skip_depth >= 0:
+            if len(self._stack) == self._skip_depth:
+                self._skip_depth = -1
+            return
+        if name == TEXT:
+            self._in_text = False
+        elif name == PARAGRAPH and self._paragraphs:
+            self._end_paragraph(''.join(self._paragraphs.pop()))
+        elif name == TABLE_ROW and self._rows:
+            cells = [' '.join(text.strip() for text in cell if text.strip()) for cell in self._rows.pop()]
+            self._emit(SOURCE_TABLE, ' | '.join(cell for cell in cells if cell))
+        elif name in (TABLE_CELL, TEXTBOX_CONTENT) and self._containers:
+            self._containers.pop()
+
+    def _end_paragraph(self, text: str):
+        container = self._containers[-1] if self._containers else None
+        if container == TABLE_CELL and self._rows and self._rows[-1]:
+            self._rows[-1][-1].append(text)
+        elif container == TEXTBOX_CONTENT:
+            self._emit(SOURCE_TEXTBOX, text)
+        else:
+            self._emit(self.source, text)
+
+    def _emit(self, source: str, text: str):
+        if text.strip():
+            self.blocks.append((source, text))
+
+    def data(self, text: str):
+        if self._in_text and self._paragraphs:
+            self._paragraphs[-1].append(text)
+
+
+def _part_order(name: str, pattern) -> Optional[int]:
+    match = pattern.match(name)
+    if not match:
+        return None
+    return int(match.group(1) or 0)
+
+
+def _parse_part(archive: zipfile.ZipFile, part: str, collector):
+    """对一个XML部件做一次解压 + 一次expat流式解析"""
+    parser = expat.ParserCreate(namespace_separator=' ')
+    parser.buffer_text = True
+    parser.StartElementHandler = collector.start
+    parser.EndElementHandler = collector.end
+    parser.CharacterDataHandler = collector.data
+    with archive.open(part) as stream:
+        while True:
+            chunk = stream.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            parser.Parse(chunk, False)
+        parser.Parse(b'', True)
+
+
+def extract_blocks(source) -> List[Tuple[str, str]]:
+    """以流式方式提取整个 .docx 的文本块，返回 [(来源标签, 文本)]
+
+    阅读顺序：页眉 -> 正文（段落、表格行、文本框）-> 页脚。每个部件只解压和解析一次，
+    不构建 python-docx 对象；多个页眉/页脚（首页、奇偶页）中重复的文本只保留一次。
+    """
+    blocks: List[Tuple[str, str]] = []
+    with zipfile.ZipFile(source) as archive:
+        names = archive.namelist()
+        headers = sorted((n for n in names if HEADER_PART.match(n)), key=lambda n: _part_order(n, HEADER_PART))
+        footers = sorted((n for n in names if FOOTER_PART.match(n)), key=lambda n: _part_order(n, FOOTER_PART))
+
+        for parts, tag in ((headers, SOURCE_HEADER), ([DOCUMENT_PART], SOURCE_BODY), (footers, SOURCE_FOOTER)):
+            seen = set()
+            for part in parts:
+                part_blocks: List[Tuple[str, str]] = []
+                _parse_part(archive, part, _BlockCollector(tag, part_blocks))
+                for block in part_blocks:
+                    # 页眉页脚的多个版本通常内容相同，只保留第一次出现的文本
+                    if tag != SOURCE_BODY and block in seen:
+                        continue
+                    seen.add(block)
+                    blocks.append(block)
+
+    logger.debug("📑 流式提取文本块数: %s", len(blocks))
+    return blocks
@@ -0,0 +1,38 @@
+# 生产环境服务器配置：gunicorn -c gunicorn.conf.py app:app（在backend目录下执行）
+import os
+import sys
+import time
+from dotenv import load_dotenv
+
+# 加载配置文件
+load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config.env'))
+
+bind = f"{os.getenv('BACKEND_HOST', '127.0.0.1')}:{os.getenv('BACKEND_PORT', '5000')}"
+workers = int(os.getenv('SERVER_WORKERS', '2'))
+# 每个工作进程的线程数；AI请求大部分时间在等待网络，线程足以覆盖并发
+threads = int(os.getenv('SERVER_THREADS', '8'))
+worker_class = 'gthread'
+
+# 完整分析可能持续数分钟（含AI调用排队）
+timeout = int(os.getenv('SERVER_TIMEOUT', '600'))
+graceful_timeout = int(os.getenv('SERVER_GRACEFUL_TIMEOUT', '60'))
+keepalive = 5
+
+# 不预加载应用：app模块在导入时会打开SQLite连接、启动任务队列/解析进程/调度线程，
+# 这些都不能跨fork共享，因此由每个工作进程各自初始化一次（解析器和分析器在进程内常驻复用）
+preload_app = False
+
+accesslog = '-'
+errorlog = '-'
+
+
+def on_starting(server):
+    # 记录主进程启动时间：各工作进程只恢复此前遗留的任务，不会抢走其他工作进程刚提交的任务
+    os.environ['SERVER_STARTED_AT'] = str(time.time())
+
+
+def worker_exit(server, worker):
+    # 优雅退出：等待正在执行的任务完成，关闭解析进程和连接池
+    app_module = sys.modules.get('app')
+    if app_module is not None and hasattr(app_module, 'shutdown_services'):
+        app_module.shutdown_services()
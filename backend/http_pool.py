@@ -0,0 +1,159 @@
+import time
+import asyncio
+import logging
+import threading
+import importlib.util
+import httpx
+from typing import Dict, Optional
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# HTTP/2 需要可选依赖 h2（pip install httpx[http2]）
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
+
+class PoolStats:
+    """连接池统计：通过 httpcore 的 trace 扩展区分新建连接和复用连接"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+        self.tls_handshakes = 0
+
+    def _record(self, name: str):
+        if name == 'connection.connect_tcp.complete':
+            with self._lock:
+                self.connections_opened += 1
+        elif name == 'connection.start_tls.complete':
+            with self._lock:
+                self.tls_handshakes += 1
+
+    def trace(self, name: str, info: Dict):
+        """同步客户端的trace回调"""
+        self._record(name)
+
+    async def atrace(self, name: str, info: Dict):
+        """异步客户端的trace回调（httpcore要求为协程函数）"""
+        self._record(name)
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            reused = max(self.requests - self.connections_opened, 0)
+            return {
+                'requests': self.requests,
+                'connections_opened': self.connections_opened,
+                'tls_handshakes': self.tls_handshakes,
+                'reused_requests': reused,
+                'reuse_rate': round(reused / self.requests, 4) if self.requests else 0.0
+            }
+
+
+class _TracedTransport(httpx.HTTPTransport):
+    """为每个请求挂上trace回调的同步传输层"""
+
+    def __init__(self, stats: PoolStats, **kwargs):
+        super().__init__(**kwargs)
+        self._stats = stats
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.extensions = {**request.extensions, 'trace': self._stats.trace}
+        self._stats.count_request()
+        return super().handle_request(request)
+
+
+class _AsyncTracedTransport(httpx.AsyncHTTPTransport):
+    """为每个请求挂上trace回调的异步传输层"""
+
+    def __init__(self, stats: PoolStats, **kwargs):
+        super().__init__(**kwargs)
+        self._stats = stats
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        request.extensions = {**request.extensions, 'trace': self._stats.atrace}
+        self._stats.count_request()
+        return await super().handle_async_request(request)
+
+
+class HttpPool:
+    """上游AI服务的共享连接池（同步+异步客户端，keep-alive，可选HTTP/2）"""
+
+    def __init__(self, max_connections: int = 20, max_keepalive: int = 10,
+                 keepalive_expiry: float = 60.0, http2: bool = True, timeout: float = 300.0):
+        if http2 and not HTTP2_AVAILABLE:
+            logger.warning("⚠️ 未安装h2，HTTP/2不可用，回退到HTTP/1.1")
+            http2 = False
+        self.http2 = http2
+
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.limits = limits
+        self.stats = PoolStats()
+        self.async_stats = PoolStats()
+
+        self._transport = _TracedTransport(self.stats, limits=limits, http2=http2)
+        self.client = httpx.Client(transport=self._transport, timeout=timeout)
+        self.async_client = httpx.AsyncClient(
+            transport=_AsyncTracedTransport(self.async_stats, limits=limits, http2=http2),
+            timeout=timeout
+        )
+        # 异步客户端的连接绑定在使用它的事件循环上（路由器的后台循环），关闭时需在该循环中执行
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+        logger.info("🔌 AI连接池: 最大连接%s, keep-alive %s个/%ss, HTTP/2=%s",
+                    max_connections, max_keepalive, keepalive_expiry, '开启' if http2 else '关闭')
+
+    def attach_loop(self, loop: asyncio.AbstractEventLoop):
+        """登记异步客户端所在的事件循环"""
+        self._async_loop = loop
+
+    def warm_up(self, url: str, timeout: float = 5.0) -> bool:
+        """预先建立到上游的TCP+TLS连接，避免首个请求承担握手延迟"""
+        start = time.perf_counter()
+        try:
+            # 任何HTTP响应（包括401/404）都说明连接已建立并进入连接池
+            self.client.head(url, timeout=timeout)
+            logger.info("🔥 连接预热完成: %s (%.0fms)", url, (time.perf_counter() - start) * 1000)
+            return True
+        except httpx.HTTPError as e:
+            logger.warning("⚠️ 连接预热失败: %s - %s", url, e)
+            return False
+
+    async def awarm_up(self, url: str, timeout: float = 5.0) -> bool:
+        """warm_up 的异步版本，预热异步客户端的连接池（需在 attach_loop 登记的事件循环中执行）"""
+        start = time.perf_counter()
+        try:
+            await self.async_client.head(url, timeout=timeout)
+            logger.info("🔥 异步连接预热完成: %s (%.0fms)", url, (time.perf_counter() - start) * 1000)
+            return True
+        except httpx.HTTPError as e:
+            logger.warning("⚠️ 异步连接预热失败: %s - %s", url, e)
+            return False
+
+    def pool_stats(self) -> Dict:
+        """连接池状态：请求数、新建连接数、复用率、当前连接数"""
+        stats = {'http2': self.http2, 'sync': self.stats.snapshot(), 'async': self.async_stats.snapshot()}
+        connections = getattr(getattr(self._transport, '_pool', None), 'connections', None)
+        if connections is not None:
+            stats['sync']['open_connections'] = len(connections)
+            stats['sync']['idle_connections'] = sum(1 for conn in connections if conn.is_idle())
+        return stats
+
+    def close(self, timeout: float = 5.0):
+        """关闭同步和异步连接池"""
+        self.client.close()
+        loop = self._async_loop
+        try:
+            if loop is not None and loop.is_running():
+                asyncio.run_coroutine_threadsafe(self.async_client.aclose(), loop).result(timeout)
+            else:
+                asyncio.run(self.async_client.aclose())
+        except Exception as e:
+            logger.warning("⚠️ 关闭异步连接池失败: %s", e)
@@ -0,0 +1,242 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import logging
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from admission import DrainRate
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 任务状态
+STATUS_QUEUED = 'queued'
+STATUS_RUNNING = 'running'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+
+class QueueFull(Exception):
+    """等待中的任务数已达上限"""
+
+
+class JobStore:
+    """任务状态持久化（SQLite），服务重启后可恢复未完成的任务"""
+
+    def __init__(self, db_path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, status TEXT NOT NULL, stages TEXT NOT NULL, "
+            "filename TEXT, input_path TEXT, options TEXT NOT NULL, "
+            "result TEXT, error TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def create(self, filename: str, input_path: str, options: Dict, stages: List[str]) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, status, stages, filename, input_path, options, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, STATUS_QUEUED, json.dumps({stage: 'pending' for stage in stages}),
+                 filename, input_path, json.dumps(options), now, now)
+            )
+            self._db.commit()
+        return job_id
+
+    def update(self, job_id: str, **fields):
+        """更新任务字段；stages/result 自动序列化为JSON"""
+        for key in ('stages', 'result'):
+            if key in fields and fields[key] is not None:
+                fields[key] = json.dumps(fields[key], ensure_ascii=False)
+        fields['updated_at'] = time.time()
+        assignments = ', '.join(f"{key} = ?" for key in fields)
+        with self._lock:
+            self._db.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+            self._db.commit()
+
+    def set_stage(self, job_id: str, stage: str, status: str):
+        """更新单个阶段的进度"""
+        with self._lock:
+            row = self._db.execute("SELECT stages FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return
+            stages = json.loads(row[0])
+            stages[stage] = status
+            self._db.execute("UPDATE jobs SET stages = ?, updated_at = ? WHERE id = ?",
+                             (json.dumps(stages), time.time(), job_id))
+            self._db.commit()
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, status, stages, filename, input_path, options, result, error, created_at, updated_at "
+                "FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            'id': row[0],
+            'status': row[1],
+            'stages': json.loads(row[2]),
+            'filename': row[3],
+            'input_path': row[4],
+            'options': json.loads(row[5]),
+            'result': json.loads(row[6]) if row[6] else None,
+            'error': row[7],
+            'created_at': row[8],
+            'updated_at': row[9]
+        }
+
+    def claim_unfinished(self, before: float) -> List[str]:
+        """认领在 before 之前最后更新、且仍在排队或运行中的任务（服务重启前未完成），按创建时间排序
+
+        查询和更新在同一个写事务中完成：多个工作进程同时启动时，每个任务只会被一个进程认领。
+        """
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._db.execute(
+                    "SELECT id FROM jobs WHERE status IN (?, ?) AND updated_at < ? ORDER BY created_at",
+                    (STATUS_QUEUED, STATUS_RUNNING, before)
+                ).fetchall()
+                self._db.executemany("UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?",
+                                     [(STATUS_QUEUED, time.time(), row[0]) for row in rows])
+                self._db.commit()
+            except BaseException:
+                self._db.rollback()
+                raise
+        return [row[0] for row in rows]
+
+    def heartbeat(self, job_ids: List[str]):
+        """刷新本进程持有的排队/运行中任务的更新时间（租约续期）"""
+        if not job_ids:
+            return
+        now = time.time()
+        with self._lock:
+            self._db.executemany("UPDATE jobs SET updated_at = ? WHERE id = ? AND status IN (?, ?)",
+                                 [(now, job_id, STATUS_QUEUED, STATUS_RUNNING) for job_id in job_ids])
+            self._db.commit()
+
+    def purge(self, older_than: float) -> int:
+        """删除早于指定秒数前完成的任务"""
+        with self._lock:
+            count = self._db.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (STATUS_DONE, STATUS_FAILED, time.time() - older_than)
+            ).rowcount
+            self._db.commit()
+        return count
+
+
+class JobQueue:
+    """有界的后台任务队列：固定数量的工作线程处理任务，超出等待上限时拒绝提交
+
+    本进程持有的任务（排队或运行中）每 lease/4 秒续期一次；工作进程崩溃或被回收后，
+    其任务超过 lease 秒未续期，由其他存活的进程认领并重新执行。
+    """
+
+    def __init__(self, store: JobStore, handler: Callable, workers: int = 2, max_pending: int = 100,
+                 lease: float = 120.0):
+        self.store = store
+        self.handler = handler
+        self.max_pending = max_pending
+        self.lease = lease
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job')
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._owned = set()  # 本进程已提交、尚未结束的任务
+        self._workers = workers
+        self._maintainer = None
+        self._closing = threading.Event()  # 开始关闭：不再认领其他进程的任务，但继续为运行中的任务续期
+        self._stopping = threading.Event()
+        self.drain = DrainRate(window=600)
+
+    def submit(self, job_id: str, force: bool = False):
+        """提交任务到工作线程；force=True 用于重启恢复，不受等待上限约束"""
+        with self._lock:
+            if not force and self._pending >= self.max_pending:
+                raise QueueFull(f"任务队列已满（{self.max_pending}个）")
+            self._pending += 1
+            self._owned.add(job_id)
+        self._start_maintainer()
+        self._executor.submit(self._run, job_id)
+
+    def recover(self, started_at: Optional[float] = None) -> int:
+        """重新提交服务启动（started_at，默认当前时间）之前未完成的任务，并开始定期认领租约过期的任务"""
+        job_ids = self.store.claim_unfinished(started_at if started_at is not None else time.time())
+        for job_id in job_ids:
+            self.submit(job_id, force=True)
+        if job_ids:
+            logger.info("♻️ 恢复未完成的任务: %s个", len(job_ids))
+        self._start_maintainer()
+        return len(job_ids)
+
+    def _start_maintainer(self):
+        with self._lock:
+            if self._maintainer is not None or self._stopping.is_set():
+                return
+            self._maintainer = threading.Thread(target=self._maintain, name='job-lease', daemon=True)
+        self._maintainer.start()
+
+    def _maintain(self):
+        """续期本进程的任务，并认领其他进程遗留的、租约已过期的任务"""
+        while not self._stopping.wait(self.lease / 4):
+            try:
+                with self._lock:
+                    owned = list(self._owned)
+                self.store.heartbeat(owned)
+                if self._closing.is_set():
+                    continue
+                job_ids = self.store.claim_unfinished(time.time() - self.lease)
+                for job_id in job_ids:
+                    self.submit(job_id, force=True)
+                if job_ids:
+                    logger.warning("♻️ 认领租约过期的任务: %s个", len(job_ids))
+            except Exception as e:
+                logger.error("❌ 任务租约维护失败: %s", e)
+
+    def depth(self) -> int:
+        """排队和运行中的任务数"""
+        with self._lock:
+            return self._pending
+
+    def retry_after(self) -> int:
+        """队列满时建议客户端等待的秒数（按近期任务完成速度估算）"""
+        return self.drain.retry_after(self.depth() - self.max_pending, self._workers, default=60)
+
+    def _run(self, job_id: str):
+        start = time.monotonic()
+        try:
+            job = self.store.get(job_id)
+            if job is None:
+                return
+            self.store.update(job_id, status=STATUS_RUNNING)
+            logger.info("⚙️ [job %s] 开始处理: %s", job_id[:8], job['filename'])
+            result = self.handler(job, lambda stage, status: self.store.set_stage(job_id, stage, status))
+            self.store.update(job_id, status=STATUS_DONE, result=result)
+            logger.info("✅ [job %s] 处理完成", job_id[:8])
+        except Exception as e:
+            logger.error("❌ [job %s] 处理失败: %s", job_id[:8], e)
+            logger.error(traceback.format_exc())
+            self.store.update(job_id, status=STATUS_FAILED, error=str(e))
+        finally:
+            self.drain.record(time.monotonic() - start)
+            with self._lock:
+                self._pending -= 1
+                self._owned.discard(job_id)
+
+    def shutdown(self, wait: bool = True, cancel_pending: bool = False):
+        """停止工作线程；cancel_pending=True 时未开始的任务保持排队状态，由其他进程在租约过期后或下次启动时恢复"""
+        self._closing.set()
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_pending)
+        self._stopping.set()
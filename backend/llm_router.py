@@ -0,0 +1,359 @@
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+from openai import AsyncOpenAI, OpenAI
+from http_pool import HttpPool
+from llm_scheduler import LLMScheduler
+from token_budget import estimate_tokens
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 预置的AI服务：(base_url, 默认模型, 额外请求头, 是否支持json_schema)
+PROVIDER_PRESETS = {
+    'openrouter': (
+        "https://openrouter.ai/api/v1",
+        "x-ai/grok-4-fast:free",
+        {"HTTP-Referer": "http://localhost:5000", "X-Title": "Resume Analyzer"},
+        True
+    ),
+    'xai': ("https://api.x-ai.com/v1", "grok-beta", None, True),
+    # DeepSeek只支持json_object，不支持json_schema
+    'deepseek': ("https://api.deepseek.com", "deepseek-chat", None, False),
+}
+
+PROVIDER_LABELS = {'openrouter': 'OpenRouter Grok', 'xai': 'X.AI官方', 'deepseek': 'DeepSeek'}
+
+
+def preset_for_key(api_key: str, use_grok: bool = True) -> str:
+    """根据API密钥格式推断服务商（与旧版单服务商行为一致）"""
+    if not use_grok:
+        return 'deepseek'
+    return 'openrouter' if api_key.startswith('sk-or-') else 'xai'
+
+
+def _percentile(samples, percentile: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percentile))]
+
+
+class Provider:
+    """单个AI服务商：客户端 + 健康状态 + 延迟统计"""
+
+    def __init__(self, name: str, api_key: str, model_name: Optional[str] = None,
+                 http_pool: Optional[HttpPool] = None):
+        base_url, default_model, default_headers, supports_json_schema = PROVIDER_PRESETS[name]
+        self.name = name
+        self.base_url = base_url
+        self.model_name = model_name or default_model
+        self.supports_json_schema = supports_json_schema
+        self.http_pool = http_pool
+
+        self.client = OpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            default_headers=default_headers,
+            http_client=http_pool.client if http_pool else None
+        )
+        # 异步客户端只在路由器的后台事件循环中使用
+        self.async_client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            default_headers=default_headers,
+            http_client=http_pool.async_client if http_pool else None
+        )
+
+        self.ewma_ms = None
+        self.failures = 0
+        self.unhealthy_until = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.cancelled = 0
+        self.latencies = deque(maxlen=200)
+        # 流式调用的首块延迟（TTFB）单独统计，不与完整响应的延迟混在一起
+        self.ttfb_ewma_ms = None
+        self.ttfb_latencies = deque(maxlen=200)
+        logger.info("✅ %s客户端初始化成功（模型: %s）", PROVIDER_LABELS.get(name, name), self.model_name)
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.unhealthy_until
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        return _percentile(self.latencies, percentile)
+
+    def params_for(self, params: Dict) -> Dict:
+        """按服务商能力调整请求参数"""
+        response_format = params.get('response_format')
+        if response_format and response_format.get('type') == 'json_schema' and not self.supports_json_schema:
+            return {**params, 'response_format': {'type': 'json_object'}}
+        return params
+
+
+class ProviderRouter:
+    """多服务商路由：健康检查 + EWMA延迟排序 + 自动故障切换 + 可选对冲请求"""
+
+    def __init__(self, providers: List[Provider], hedge: bool = False, hedge_percentile: float = 0.9,
+                 hedge_min_delay: float = 3.0, failure_threshold: int = 3, cooldown: float = 30.0,
+                 ewma_alpha: float = 0.3, scheduler: Optional[LLMScheduler] = None):
+        if not providers:
+            raise ValueError("至少需要配置一个AI服务商")
+        self.providers = providers
+        self.hedge = hedge and len(providers) > 1
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.ewma_alpha = ewma_alpha
+        # 调用方已为首个请求占用调度名额；对冲/故障切换发出的额外请求在此记账
+        self.scheduler = scheduler
+
+        self._lock = threading.Lock()
+        self._loop = None
+        self._stats = {'failovers': 0, 'hedges_fired': 0, 'hedge_wins': 0}
+
+    @property
+    def primary(self) -> Provider:
+        return self.providers[0]
+
+    def ranked(self) -> List[Provider]:
+        """健康的服务商按EWMA延迟升序（未测量过的优先试探）；全部不健康时按恢复时间排序"""
+        now = time.monotonic()
+        with self._lock:
+            healthy = [p for p in self.providers if p.healthy(now)]
+            if healthy:
+                return sorted(healthy, key=lambda p: p.ewma_ms or 0.0)
+            return sorted(self.providers, key=lambda p: p.unhealthy_until)
+
+    def _record(self, provider: Provider, elapsed_ms: Optional[float], ttfb: bool = False):
+        """记录一次调用结果，elapsed_ms为None表示失败；ttfb=True表示流式调用的首块延迟"""
+        with self._lock:
+            provider.requests += 1
+            if elapsed_ms is None:
+                provider.errors += 1
+                provider.failures += 1
+                if provider.failures >= self.failure_threshold:
+                    provider.unhealthy_until = time.monotonic() + self.cooldown
+                    logger.warning("⚠️ 服务商 %s 连续失败%s次，暂停使用 %.0f 秒",
+                                   provider.name, provider.failures, self.cooldown)
+                return
+            provider.failures = 0
+            provider.unhealthy_until = 0.0
+            if ttfb:
+                provider.ttfb_latencies.append(elapsed_ms)
+                provider.ttfb_ewma_ms = self._ewma(provider.ttfb_ewma_ms, elapsed_ms)
+                return
+            provider.latencies.append(elapsed_ms)
+            provider.ewma_ms = self._ewma(provider.ewma_ms, elapsed_ms)
+
+    def _ewma(self, current: Optional[float], sample: float) -> float:
+        if current is None:
+            return sample
+        return self.ewma_alpha * sample + (1 - self.ewma_alpha) * current
+
+    def _record_cancelled(self, provider: Provider, elapsed_ms: float):
+        """记录对冲落败被取消的调用：实际延迟至少为已等待的时间（删失样本，只作下限）
+
+        否则总是落败的慢服务商永远没有延迟样本，会一直排在首位，每个请求都要等到对冲才返回。
+        只在下限高于当前EWMA时上调，不计为失败。
+        """
+        with self._lock:
+            provider.cancelled += 1
+            provider.latencies.append(elapsed_ms)
+            if provider.ewma_ms is None or elapsed_ms > provider.ewma_ms:
+                provider.ewma_ms = self._ewma(provider.ewma_ms, elapsed_ms)
+
+    def _hedge_delay(self, provider: Provider) -> float:
+        """对冲请求的触发延迟：主服务商延迟的指定分位数，且不低于下限"""
+        with self._lock:
+            percentile = provider.latency_percentile(self.hedge_percentile)
+        return max(self.hedge_min_delay, (percentile or 0.0) / 1000)
+
+    @contextmanager
+    def _charged(self, messages: List[Dict], params: Dict, extra: bool):
+        """额外请求（对冲/故障切换）向调度器记账；首个请求已由调用方占用名额"""
+        if not extra or self.scheduler is None:
+            yield {'tokens': None}
+            return
+        estimated = sum(estimate_tokens(message['content']) for message in messages) + params.get('max_tokens', 0)
+        with self.scheduler.charge(estimated) as usage:
+            yield usage
+
+    # ---- 同步接口（Flask线程） ----
+
+    def complete(self, messages: List[Dict], params: Dict):
+        """同步调用；开启对冲时在后台事件循环中执行以便取消较慢的请求"""
+        if self.hedge:
+            future = asyncio.run_coroutine_threadsafe(self.acomplete(messages, params), self._event_loop())
+            return future.result()
+
+        last_error = None
+        for index, provider in enumerate(self.ranked()):
+            if index > 0:
+                with self._lock:
+                    self._stats['failovers'] += 1
+                logger.warning("🔀 故障切换到服务商 %s", provider.name)
+            start = time.perf_counter()
+            try:
+                with self._charged(messages, params, index > 0) as usage:
+                    response = provider.client.chat.completions.create(
+                        model=provider.model_name, messages=messages, **provider.params_for(params)
+                    )
+                    usage['tokens'] = response.usage.total_tokens if response.usage else None
+            except Exception as e:
+                self._record(provider, None)
+                logger.error("❌ 服务商 %s 调用失败: %s", provider.name, e)
+                last_error = e
+                continue
+            self._record(provider, (time.perf_counter() - start) * 1000)
+            return response
+        raise last_error
+
+    def stream(self, messages: List[Dict], params: Dict) -> Iterator:
+        """同步流式调用；在收到首个数据块之前失败时切换到下一个服务商"""
+        last_error = None
+        for index, provider in enumerate(self.ranked()):
+            if index > 0:
+                with self._lock:
+                    self._stats['failovers'] += 1
+            # 切换后的流在整个输出期间占用额外名额
+            with self._charged(messages, params, index > 0):
+                start = time.perf_counter()
+                try:
+                    chunks = iter(provider.client.chat.completions.create(
+                        model=provider.model_name, messages=messages, stream=True, **provider.params_for(params)
+                    ))
+                    first = next(chunks, None)
+                except Exception as e:
+                    self._record(provider, None)
+                    logger.error("❌ 服务商 %s 流式调用失败: %s", provider.name, e)
+                    last_error = e
+                    continue
+                self._record(provider, (time.perf_counter() - start) * 1000, ttfb=True)
+                if first is not None:
+                    yield first
+                yield from chunks
+                return
+        raise last_error
+
+    # ---- 异步接口（后台事件循环） ----
+
+    def _event_loop(self) -> asyncio.AbstractEventLoop:
+        """路由器专用的后台事件循环（异步客户端只在此循环中使用）"""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name='llm-router', daemon=True).start()
+                for pool in self._pools():
+                    pool.attach_loop(self._loop)
+            return self._loop
+
+    def _pools(self) -> List[HttpPool]:
+        """各服务商使用的连接池（去重）"""
+        pools = []
+        for provider in self.providers:
+            if provider.http_pool is not None and all(pool is not provider.http_pool for pool in pools):
+                pools.append(provider.http_pool)
+        return pools
+
+    async def _attempt(self, provider: Provider, messages: List[Dict], params: Dict, extra: bool = False):
+        start = time.perf_counter()
+        try:
+            with self._charged(messages, params, extra) as usage:
+                response = await provider.async_client.chat.completions.create(
+                    model=provider.model_name, messages=messages, **provider.params_for(params)
+                )
+                usage['tokens'] = response.usage.total_tokens if response.usage else None
+        except asyncio.CancelledError:
+            self._record_cancelled(provider, (time.perf_counter() - start) * 1000)
+            raise
+        except Exception:
+            self._record(provider, None)
+            raise
+        self._record(provider, (time.perf_counter() - start) * 1000)
+        return response
+
+    async def acomplete(self, messages: List[Dict], params: Dict):
+        """异步调用：可选对冲，失败时依次切换服务商"""
+        candidates = self.ranked()
+        if self.hedge and len(candidates) > 1:
+            return await self._hedged(candidates, messages, params)
+
+        last_error = None
+        for index, provider in enumerate(candidates):
+            try:
+                return await self._attempt(provider, messages, params, extra=index > 0)
+            except Exception as e:
+                logger.error("❌ 服务商 %s 调用失败: %s", provider.name, e)
+                last_error = e
+        raise last_error
+
+    async def _hedged(self, candidates: List[Provider], messages: List[Dict], params: Dict):
+        """主请求超过延迟阈值仍未返回时，向下一个服务商发出对冲请求；先成功者胜出，其余取消"""
+        primary, rest = candidates[0], list(candidates[1:])
+        tasks = {asyncio.ensure_future(self._attempt(primary, messages, params)): primary}
+        last_error = None
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self._hedge_delay(primary))
+            while True:
+                for task in done:
+                    provider = tasks.pop(task)
+                    if task.exception() is None:
+                        if provider is not primary:
+                            with self._lock:
+                                self._stats['hedge_wins'] += 1
+                        return task.result()
+                    last_error = task.exception()
+                    logger.error("❌ 服务商 %s 调用失败: %s", provider.name, last_error)
+
+                # 主请求超时未返回或已失败：启动下一个服务商
+                if rest:
+                    provider = rest.pop(0)
+                    with self._lock:
+                        self._stats['hedges_fired' if tasks else 'failovers'] += 1
+                    logger.info("🔀 向服务商 %s 发出%s请求", provider.name, '对冲' if tasks else '切换')
+                    tasks[asyncio.ensure_future(self._attempt(provider, messages, params, extra=True))] = provider
+                if not tasks:
+                    raise last_error
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            # 取消落败的请求（中断其HTTP连接）
+            for task in tasks:
+                task.cancel()
+
+    def warm_up(self):
+        """预热所有服务商的连接；开启对冲时请求走异步客户端，同时预热后台循环中的异步连接池"""
+        for provider in self.providers:
+            if provider.http_pool is None:
+                continue
+            provider.http_pool.warm_up(provider.base_url)
+            if self.hedge:
+                asyncio.run_coroutine_threadsafe(
+                    provider.http_pool.awarm_up(provider.base_url), self._event_loop()
+                ).result()
+
+    def stats(self) -> Dict:
+        """各服务商的健康状态和延迟统计"""
+        now = time.monotonic()
+        with self._lock:
+            providers = {}
+            for provider in self.providers:
+                p90 = provider.latency_percentile(0.9)
+                ttfb_p90 = _percentile(provider.ttfb_latencies, 0.9)
+                providers[provider.name] = {
+                    'model': provider.model_name,
+                    'healthy': provider.healthy(now),
+                    'requests': provider.requests,
+                    'errors': provider.errors,
+                    'cancelled': provider.cancelled,
+                    'ewma_ms': round(provider.ewma_ms, 1) if provider.ewma_ms is not None else None,
+                    'p90_ms': round(p90, 1) if p90 is not None else None,
+                    'ttfb_ewma_ms': round(provider.ttfb_ewma_ms, 1) if provider.ttfb_ewma_ms is not None else None,
+                    'ttfb_p90_ms': round(ttfb_p90, 1) if ttfb_p90 is not None else None
+                }
+            return {'hedge': self.hedge, 'providers': providers, **self._stats}
@@ -0,0 +1,206 @@
+import time
+import heapq
+import logging
+import itertools
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 优先级：数值越小越先调度
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+# 当前请求的优先级（线程/协程上下文内有效，默认交互式）
+_current_priority = contextvars.ContextVar('llm_priority', default=PRIORITY_INTERACTIVE)
+
+
+@contextmanager
+def request_priority(priority: int):
+    """在当前上下文内设置AI调用的优先级"""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+class SchedulerTimeout(Exception):
+    """排队等待超过上限"""
+
+
+class TokenBucket:
+    """按分钟速率连续补充的令牌桶（非线程安全，由调度器的锁保护）"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """获得amount个令牌还需等待的秒数（超过桶容量的请求按满桶处理）"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+    def give_back(self, amount: float):
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class LLMScheduler:
+    """AI调用调度器：请求/令牌速率限制 + 并发上限 + 优先级队列"""
+
+    def __init__(self, requests_per_minute: float = 20, tokens_per_minute: float = 100000,
+                 max_concurrency: int = 4, max_wait: float = 300.0):
+        self.max_concurrency = max_concurrency
+        self.max_wait = max_wait
+        self._request_bucket = TokenBucket(requests_per_minute)
+        self._token_bucket = TokenBucket(tokens_per_minute)
+
+        self._cond = threading.Condition()
+        self._waiting = []  # (优先级, 序号)
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._paused_until = 0.0
+
+        self._wait_times = deque(maxlen=1000)
+        self._stats = {'admitted': 0, 'timeouts': 0, 'rate_limited': 0, 'extra_calls': 0}
+
+    @contextmanager
+    def slot(self, estimated_tokens: int):
+        """占用一个调用名额；退出时释放，并按实际用量修正令牌桶
+
+        用法:
+            with scheduler.slot(estimated) as usage:
+                response = client.chat.completions.create(...)
+                usage['tokens'] = response.usage.total_tokens
+        """
+        self._acquire(estimated_tokens)
+        usage = {'tokens': None}
+        try:
+            yield usage
+        except Exception as e:
+            if getattr(e, 'status_code', None) == 429:
+                self._pause_for(e)
+            raise
+        finally:
+            self._release(estimated_tokens, usage['tokens'])
+
+    @contextmanager
+    def charge(self, estimated_tokens: int):
+        """为已占用名额的调用额外发出的上游请求（对冲/故障切换）记账，不排队等待
+
+        额外请求同样消耗服务商的请求和令牌配额；直接扣减令牌桶（可透支），
+        使后续排队的调用相应延后，而不是让对冲请求本身等待。
+        """
+        with self._cond:
+            now = time.monotonic()
+            self._request_bucket._refill(now)
+            self._token_bucket._refill(now)
+            self._request_bucket.take(1)
+            self._token_bucket.take(estimated_tokens)
+            self._in_flight += 1
+            self._stats['extra_calls'] += 1
+        usage = {'tokens': None}
+        try:
+            yield usage
+        except Exception as e:
+            if getattr(e, 'status_code', None) == 429:
+                self._pause_for(e)
+            raise
+        finally:
+            self._release(estimated_tokens, usage['tokens'])
+
+    def _acquire(self, estimated_tokens: int):
+        priority = _current_priority.get()
+        entry = (priority, next(self._sequence))
+        start = time.monotonic()
+        deadline = start + self.max_wait
+
+        with self._cond:
+            heapq.heappush(self._waiting, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    delay = self._admission_delay(entry, estimated_tokens, now)
+                    if delay == 0.0:
+                        break
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self._stats['timeouts'] += 1
+                        raise SchedulerTimeout(f"AI服务排队超时（{self.max_wait:.0f}秒）")
+                    # delay为None表示需要等待其他请求释放名额
+                    self._cond.wait(remaining if delay is None else min(delay, remaining))
+            except BaseException:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+                raise
+
+            heapq.heappop(self._waiting)
+            self._request_bucket.take(1)
+            self._token_bucket.take(estimated_tokens)
+            self._in_flight += 1
+            self._stats['admitted'] += 1
+            self._wait_times.append(time.monotonic() - start)
+            self._cond.notify_all()
+
+    def _admission_delay(self, entry, estimated_tokens: int, now: float) -> Optional[float]:
+        """返回0表示可以放行，正数表示需要等待的秒数，None表示需要等待通知"""
+        if self._waiting[0] != entry or self._in_flight >= self.max_concurrency:
+            return None
+        if now < self._paused_until:
+            return self._paused_until - now
+        return max(self._request_bucket.wait_time(1, now),
+                   self._token_bucket.wait_time(estimated_tokens, now))
+
+    def _release(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        with self._cond:
+            self._in_flight -= 1
+            if actual_tokens is not None and actual_tokens < estimated_tokens:
+                self._token_bucket.give_back(estimated_tokens - actual_tokens)
+            elif actual_tokens is not None:
+                self._token_bucket.take(actual_tokens - estimated_tokens)
+            self._cond.notify_all()
+
+    def _pause_for(self, error: Exception):
+        """上游返回429时暂停放行，优先使用Retry-After"""
+        retry_after = 5.0
+        response = getattr(error, 'response', None)
+        if response is not None:
+            try:
+                retry_after = float(response.headers.get('retry-after', retry_after))
+            except (TypeError, ValueError):
+                pass
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            self._stats['rate_limited'] += 1
+        logger.warning("⚠️ 上游限流(429)，暂停调度 %.0f 秒", retry_after)
+
+    def stats(self) -> Dict:
+        """队列深度、并发数和等待时间统计"""
+        with self._cond:
+            waits = sorted(self._wait_times)
+            stats = dict(self._stats)
+            stats['queue_depth'] = len(self._waiting)
+            stats['in_flight'] = self._in_flight
+            stats['paused_for'] = round(max(self._paused_until - time.monotonic(), 0.0), 1)
+        if waits:
+            stats['wait_avg_ms'] = round(sum(waits) / len(waits) * 1000, 1)
+            stats['wait_p95_ms'] = round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 1)
+            stats['wait_max_ms'] = round(waits[-1] * 1000, 1)
+        return stats
@@ -0,0 +1,142 @@
+import sys
+import queue
+import atexit
+import logging
+import logging.handlers
+import threading
+from typing import Dict, Optional
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+class AsyncQueueHandler(logging.handlers.QueueHandler):
+    """把日志记录放入有界队列，由后台线程格式化并写入文件/控制台
+
+    与标准 QueueHandler 不同，入队时不在请求线程上拼接消息（msg % args 留给后台线程），
+    只有异常堆栈在当前线程格式化（traceback对象不应跨线程保留）。
+    队列满时丢弃 INFO/DEBUG 并计数以免阻塞请求，WARNING 及以上等待入队，不会丢失。
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 参数中的字典/列表（如耗时统计）在入队后可能继续被修改，先做浅拷贝
+        if isinstance(record.args, tuple):
+            record.args = tuple(
+                arg.copy() if isinstance(arg, (dict, list)) else arg for arg in record.args
+            )
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if record.levelno >= logging.WARNING:
+                self.queue.put(record)
+            else:
+                self.dropped += 1
+
+
+class DebugSampler(logging.Filter):
+    """DEBUG日志按调用位置采样：同一行代码每 every 条只保留1条（其他级别不受影响）"""
+
+    def __init__(self, every: int = 10):
+        super().__init__()
+        self.every = max(every, 1)
+        self._counts: Dict[tuple, int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno != logging.DEBUG or self.every == 1:
+            return True
+        site = (record.pathname, record.lineno)
+        with self._lock:
+            count = self._counts.get(site, 0)
+            self._counts[site] = count + 1
+        return count % self.every == 0
+
+
+def parse_module_levels(spec: str) -> Dict[str, int]:
+    """解析 "resume_parser=DEBUG,werkzeug=WARNING" 形式的按模块日志级别"""
+    levels = {}
+    for item in spec.split(','):
+        if '=' not in item:
+            continue
+        name, level = (part.strip() for part in item.split('=', 1))
+        if name and level:
+            levels[name] = parse_level(level)
+    return levels
+
+
+def parse_level(name: str) -> Optional[int]:
+    """日志级别名（不区分大小写）转为数值，无法识别时返回None"""
+    level = logging.getLevelName(name.strip().upper())
+    return level if isinstance(level, int) else None
+
+
+def setup_logging(log_file: Optional[str] = 'resume_analyzer.log', level: str = 'INFO', module_levels: str = '',
+                  debug_sample_every: int = 10, queue_size: int = 10000,
+                  stream=None) -> logging.handlers.QueueListener:
+    """配置根日志：请求线程只把记录放入队列，后台线程负责格式化和写入
+
+    level 为根级别，module_levels 按模块覆盖（如 "resume_parser=DEBUG"）。
+    低于级别的日志在 logger.isEnabledFor 处即返回，不创建记录也不格式化参数。
+    """
+    handlers = [logging.StreamHandler(stream or sys.stderr)]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file, encoding='utf-8'))
+    formatter = logging.Formatter(LOG_FORMAT)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    queue_handler = AsyncQueueHandler(queue.Queue(maxsize=queue_size))
+    queue_handler.addFilter(DebugSampler(debug_sample_every))
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    # 配置错误的级别不应让服务在导入时崩溃：根级别回退到INFO，按模块的级别忽略无效项
+    root_level = parse_level(level)
+    root.setLevel(root_level if root_level is not None else logging.INFO)
+    invalid = [] if root_level is not None else [f"LOG_LEVEL={level}"]
+    for name, module_level in parse_module_levels(module_levels).items():
+        if module_level is None:
+            invalid.append(f"LOG_LEVELS中的{name}")
+            continue
+        logging.getLogger(name).setLevel(module_level)
+
+    listener = logging.handlers.QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    listener.start()
+    # 退出时写完队列中剩余的日志
+    atexit.register(_stop_listener, listener)
+    if invalid:
+        logging.getLogger(__name__).warning("⚠️ 无法识别的日志级别: %s（根级别回退到INFO，按模块的无效项已忽略）", ', '.join(invalid))
+    return listener
+
+
+def reset_logging_after_fork(stream=None):
+    """在fork出的子进程（如解析进程池）中调用：改为直接写stderr
+
+    子进程继承的日志队列没有后台线程消费，日志会丢失，队列写满后WARNING以上的日志还会一直阻塞。
+    保留原队列处理器上的采样过滤器。
+    """
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    root = logging.getLogger()
+    for inherited in root.handlers[:]:
+        if isinstance(inherited, logging.handlers.QueueHandler):
+            root.removeHandler(inherited)
+            for log_filter in inherited.filters:
+                handler.addFilter(log_filter)
+    root.addHandler(handler)
+
+
+def _stop_listener(listener: logging.handlers.QueueListener):
+    if listener._thread is not None:
+        listener.stop()
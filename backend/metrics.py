@@ -0,0 +1,208 @@
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# 覆盖从毫秒级（解析、格式化）到分钟级（AI调用排队+生成）的耗时
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple, extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """单调递增计数器（按标签分组）"""
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels.get(name, '') for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_labels(self.labelnames, key)} {_number(value)}')
+        return lines
+
+
+class Histogram:
+    """累积分桶直方图（Prometheus histogram 语义：每个桶统计 <= le 的观测数）"""
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple, List] = {}  # 标签 -> [各桶计数, 总和, 总数]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(name, '') for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                for bound, bucket_count in zip(self.buckets, counts):
+                    bucket_labels = _labels(self.labelnames, key, 'le="%s"' % bound)
+                    lines.append(f'{self.name}_bucket{bucket_labels} {bucket_count}')
+                inf_labels = _labels(self.labelnames, key, 'le="+Inf"')
+                lines.append(f'{self.name}_bucket{inf_labels} {count}')
+                lines.append(f'{self.name}_sum{_labels(self.labelnames, key)} {repr(total)}')
+                lines.append(f'{self.name}_count{_labels(self.labelnames, key)} {count}')
+        return lines
+
+
+class Registry:
+    """指标注册表；collector 在抓取时调用，用于导出缓存命中数等已有统计"""
+
+    def __init__(self):
+        self._metrics: List = []
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, List[Tuple[Dict, float]]]]]] = []
+
+    def counter(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, help_text, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, help_text, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, func: Callable):
+        """注册采集函数：返回 [(指标名, 类型, 说明, [(标签字典, 值), ...]), ...]"""
+        self._collectors.append(func)
+        return func
+
+    def render(self) -> str:
+        """Prometheus 文本格式（0.0.4）"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for func in self._collectors:
+            for name, kind, help_text, samples in func():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, value in samples:
+                    names = tuple(labels)
+                    lines.append(f'{name}{_labels(names, tuple(labels[n] for n in names))} {_number(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    'resume_analyzer_stage_seconds', '各处理阶段耗时（秒）', ('stage',)
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    'resume_analyzer_request_seconds', '接口请求总耗时（秒）', ('endpoint', 'status')
+)
+LLM_TOKENS = REGISTRY.counter(
+    'resume_analyzer_llm_tokens_total', 'AI调用消耗的token数（上游返回的实际用量）', ('kind',)
+)
+
+
+class StageTimings:
+    """一次请求内各阶段的累计耗时（并发执行的同名阶段耗时相加）"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._stages: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float):
+        with self._lock:
+            self._stages[stage] = self._stages.get(stage, 0.0) + seconds
+
+    def as_dict(self) -> Dict[str, float]:
+        """各阶段耗时（毫秒）"""
+        with self._lock:
+            return {stage: round(seconds * 1000, 1) for stage, seconds in self._stages.items()}
+
+    def server_timing(self) -> str:
+        """Server-Timing 响应头，如 "upload;dur=3.1, parse;dur=12.4, total;dur=8123.0" """
+        entries = [f'{stage};dur={ms}' for stage, ms in self.as_dict().items()]
+        entries.append(f'total;dur={round((time.perf_counter() - self.started) * 1000, 1)}')
+        return ', '.join(entries)
+
+
+# 当前请求的阶段耗时（线程/协程上下文内有效；提交到线程池时需复制上下文）
+_current_timings = contextvars.ContextVar('stage_timings', default=None)
+
+
+def begin_request() -> StageTimings:
+    """开始记录当前上下文的阶段耗时（工作线程会被复用，请求结束时调用 end_request）"""
+    timings = StageTimings()
+    _current_timings.set(timings)
+    return timings
+
+
+def current_timings() -> Optional[StageTimings]:
+    return _current_timings.get()
+
+
+def end_request():
+    _current_timings.set(None)
+
+
+def record_stage(name: str, seconds: float):
+    """记录一个处理阶段的耗时：写入阶段直方图，并累加到当前请求的 Server-Timing"""
+    STAGE_SECONDS.observe(seconds, stage=name)
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+@contextmanager
+def stage(name: str):
+    """以上下文管理器的形式记录 with 块内的耗时"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start)
+
+
+def timed_stage(name: str):
+    """stage 的装饰器形式"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
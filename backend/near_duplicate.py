@@ -0,0 +1,193 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_BITS = 64
+SHINGLE_SIZE = 3
+
+# 归一化：去除空白和标点，数字统一为0（换了电话号码、调整了日期的简历仍视为相同）
+_NOISE = re.compile(r'[\s\W_]+')
+_DIGITS = re.compile(r'\d')
+
+
+def normalize(text: str) -> str:
+    return _DIGITS.sub('0', _NOISE.sub('', text.lower()))
+
+
+def simhash(text: str) -> int:
+    """64位SimHash指纹：对归一化文本的字符3-gram（中文按字切分）取哈希后逐位投票"""
+    normalized = normalize(text)
+    shingles = {normalized[i:i + SHINGLE_SIZE] for i in range(max(len(normalized) - SHINGLE_SIZE + 1, 1))}
+    if not shingles or shingles == {''}:
+        return 0
+
+    # 每个3-gram的哈希展开为64个'0'/'1'字符后拼接，第i位的票数即步长切片中'1'的个数（在C层完成计数）
+    bits = ''.join(
+        format(int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big'), '064b')
+        for shingle in shingles
+    )
+    half = len(shingles) / 2
+    fingerprint = 0
+    for i in range(FINGERPRINT_BITS):
+        if bits[i::FINGERPRINT_BITS].count('1') > half:
+            fingerprint |= 1 << (FINGERPRINT_BITS - 1 - i)
+    return fingerprint
+
+
+def similarity(distance: int) -> float:
+    """汉明距离换算为相似度（0~1）"""
+    return round(1 - distance / FINGERPRINT_BITS, 4)
+
+
+def _to_signed(value: int) -> int:
+    """SQLite INTEGER 为有符号64位"""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+class NearDuplicateIndex:
+    """近似重复简历索引：SimHash + 分块精确匹配（鸽巢原理）
+
+    汉明距离不超过 max_distance 的两个指纹，切成 max_distance+1 块后至少有一块完全相同，
+    因此查询只需查 max_distance+1 个哈希表，再对少量候选计算汉明距离。
+    指纹和对应的分析结果持久化到SQLite，启动时载入内存索引；多进程部署时，
+    查询前至多每 refresh_interval 秒增量载入其他进程新写入的指纹。
+    超过 ttl 秒或超出 max_items 条的最早记录被删除（SQLite 至多每 prune_interval 秒清理一次，
+    各进程的内存索引按同样的规则裁剪）。
+    """
+
+    def __init__(self, db_path: str, max_distance: int = 3, refresh_interval: float = 1.0,
+                 ttl: float = 30 * 24 * 3600, max_items: int = 100000, prune_interval: float = 60.0):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.max_distance = max_distance
+        blocks = max_distance + 1
+        widths = [FINGERPRINT_BITS // blocks + (1 if i < FINGERPRINT_BITS % blocks else 0) for i in range(blocks)]
+        self._blocks: List[Tuple[int, int]] = []  # (右移位数, 掩码)
+        shift = FINGERPRINT_BITS
+        for width in widths:
+            shift -= width
+            self._blocks.append((shift, (1 << width) - 1))
+
+        self._lock = threading.Lock()
+        self._tables: List[Dict[int, List[int]]] = [{} for _ in self._blocks]
+        # 指纹 -> (最近一次写入的键, 写入时间)，按写入顺序排列，裁剪时从头部移除
+        self._keys: "OrderedDict[int, Tuple[str, float]]" = OrderedDict()
+        self._stats = {'lookups': 0, 'hits': 0, 'pruned': 0}
+        self.refresh_interval = refresh_interval
+        self.ttl = ttl
+        self.max_items = max_items
+        self.prune_interval = prune_interval
+        self._last_rowid = 0
+        self._refreshed_at = 0.0
+        self._pruned_at = 0.0
+
+        self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS fingerprints ("
+            "key TEXT PRIMARY KEY, fingerprint INTEGER NOT NULL, payload TEXT, created_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_fingerprints_created ON fingerprints(created_at)")
+        self._db.commit()
+        with self._lock:
+            self._prune_db(time.time())
+            self._refresh()
+        logger.info(f"🧬 近似重复索引已载入: {len(self._keys)}个指纹（最大汉明距离{max_distance}）")
+
+    def _index(self, fingerprint: int, key: str, created_at: Optional[float] = None):
+        if fingerprint not in self._keys:
+            for table, (shift, mask) in zip(self._tables, self._blocks):
+                table.setdefault((fingerprint >> shift) & mask, []).append(fingerprint)
+        self._keys[fingerprint] = (key, created_at if created_at is not None else time.time())
+        self._keys.move_to_end(fingerprint)
+
+    def _unindex(self, fingerprint: int):
+        for table, (shift, mask) in zip(self._tables, self._blocks):
+            block = (fingerprint >> shift) & mask
+            candidates = table[block]
+            candidates.remove(fingerprint)
+            if not candidates:
+                del table[block]
+        del self._keys[fingerprint]
+
+    def _refresh(self):
+        """载入上次之后写入的指纹，并裁剪过期/超量的内存条目（需持有锁）"""
+        rows = self._db.execute(
+            "SELECT rowid, key, fingerprint, created_at FROM fingerprints WHERE rowid > ? ORDER BY rowid",
+            (self._last_rowid,)
+        ).fetchall()
+        for rowid, key, fingerprint, created_at in rows:
+            self._index(fingerprint % (1 << 64), key, created_at)
+            self._last_rowid = rowid
+        self._prune_memory(time.time())
+        self._refreshed_at = time.monotonic()
+
+    def _prune_memory(self, now: float):
+        """按写入顺序移除超过ttl或超出max_items的指纹（需持有锁）"""
+        cutoff = now - self.ttl
+        while self._keys:
+            fingerprint, (_, created_at) = next(iter(self._keys.items()))
+            if created_at >= cutoff and len(self._keys) <= self.max_items:
+                break
+            self._unindex(fingerprint)
+
+    def _prune_db(self, now: float):
+        """删除超过ttl的记录，并只保留最新的max_items条（需持有锁）"""
+        expired = self._db.execute("DELETE FROM fingerprints WHERE created_at < ?", (now - self.ttl,)).rowcount
+        overflow = self._db.execute(
+            "DELETE FROM fingerprints WHERE rowid IN ("
+            "SELECT rowid FROM fingerprints ORDER BY created_at DESC LIMIT -1 OFFSET ?)", (self.max_items,)
+        ).rowcount
+        self._db.commit()
+        self._stats['pruned'] += max(expired, 0) + max(overflow, 0)
+        self._pruned_at = time.monotonic()
+
+    def find(self, fingerprint: int) -> Optional[Dict]:
+        """查找汉明距离最小（且不超过max_distance）的已存指纹，返回 {'key', 'distance', 'similarity'}"""
+        best = None
+        with self._lock:
+            if time.monotonic() - self._refreshed_at >= self.refresh_interval:
+                self._refresh()
+            self._stats['lookups'] += 1
+            for table, (shift, mask) in zip(self._tables, self._blocks):
+                for candidate in table.get((fingerprint >> shift) & mask, ()):
+                    distance = (candidate ^ fingerprint).bit_count()
+                    if distance <= self.max_distance and (best is None or distance < best[1]):
+                        best = (candidate, distance)
+            if best is None:
+                return None
+            self._stats['hits'] += 1
+            key = self._keys[best[0]][0]
+        return {'key': key, 'distance': best[1], 'similarity': similarity(best[1])}
+
+    def add(self, fingerprint: int, key: str, payload: Optional[Dict] = None):
+        """写入指纹及其关联结果（同一键重复写入时覆盖）"""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO fingerprints (key, fingerprint, payload, created_at) VALUES (?, ?, ?, ?)",
+                (key, _to_signed(fingerprint),
+                 json.dumps(payload, ensure_ascii=False) if payload is not None else None, time.time())
+            )
+            self._db.commit()
+            if time.monotonic() - self._pruned_at >= self.prune_interval:
+                self._prune_db(time.time())
+            self._refresh()
+
+    def payload(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._db.execute("SELECT payload FROM fingerprints WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'fingerprints': len(self._keys), 'max_distance': self.max_distance,
+                    'max_items': self.max_items, **self._stats}
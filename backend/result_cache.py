@@ -0,0 +1,179 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from copy import deepcopy
+from typing import Dict, Optional
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+
+def content_key(data: bytes, version: str) -> str:
+    """根据内容字节和版本号生成缓存键"""
+    digest = hashlib.sha256(data).hexdigest()
+    return f"{version}:{digest}"
+
+
+def content_key_stream(stream, version: str, chunk_size: int = 64 * 1024) -> str:
+    """分块读取可seek的文件对象生成缓存键（不整体读入内存），读取后回到起始位置"""
+    digest = hashlib.sha256()
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(chunk_size), b''):
+        digest.update(chunk)
+    stream.seek(0)
+    return f"{version}:{digest.hexdigest()}"
+
+
+class ResultCache:
+    """两级结果缓存：进程内LRU + SQLite磁盘层
+
+    - 内存层按条目数淘汰（LRU）
+    - 磁盘层按总字节数淘汰（最久未访问优先）
+    - 两层都按TTL过期
+    - 磁盘层读写失败（数据库被锁、磁盘已满等）只记录日志：读取按未命中处理，写入只保留在内存层
+    """
+
+    def __init__(self, name: str, cache_dir: Optional[str] = None,
+                 memory_items: int = 256, max_bytes: int = 256 * 1024 * 1024,
+                 ttl: int = 7 * 24 * 3600):
+        self.name = name
+        self.memory_items = memory_items
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0, 'disk_errors': 0}
+
+        self._db = None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            db_path = os.path.join(cache_dir, f"{name}.sqlite3")
+            # 多个工作进程共用同一个数据库文件，等待写锁的时间与任务库一致
+            self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON entries(accessed_at)")
+            self._db.commit()
+            logger.info(f"🗄️ 缓存[{name}]磁盘层: {os.path.abspath(db_path)}")
+
+    def get(self, key: str) -> Optional[Dict]:
+        """读取缓存，未命中返回None"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if now - created_at <= self.ttl:
+                    self._memory.move_to_end(key)
+                    self._stats['memory_hits'] += 1
+                    return deepcopy(value)
+                del self._memory[key]
+
+            if self._db is not None:
+                try:
+                    value = self._disk_get(key, now)
+                except (sqlite3.Error, ValueError) as e:
+                    self._disk_error('读取', e)
+                    value = None
+                if value is not None:
+                    self._stats['disk_hits'] += 1
+                    return deepcopy(value)
+
+            self._stats['misses'] += 1
+            return None
+
+    def _disk_get(self, key: str, now: float) -> Optional[Dict]:
+        """从磁盘层读取（需持有锁），命中时同时写入内存层"""
+        row = self._db.execute(
+            "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if now - row[1] > self.ttl:
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._db.commit()
+            return None
+        value = json.loads(row[0])
+        self._db.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+        self._db.commit()
+        self._remember(key, value, row[1])
+        return value
+
+    def _disk_error(self, action: str, error: Exception):
+        """磁盘层出错时回滚并记录（需持有锁），不影响调用方"""
+        self._stats['disk_errors'] += 1
+        try:
+            self._db.rollback()
+        except sqlite3.Error:
+            pass
+        logger.warning("⚠️ 缓存[%s]磁盘层%s失败，已忽略: %s", self.name, action, error)
+
+    def put(self, key: str, value: Dict):
+        """写入缓存"""
+        now = time.time()
+        value = deepcopy(value)
+        with self._lock:
+            self._remember(key, value, now)
+            if self._db is not None:
+                try:
+                    payload = json.dumps(value, ensure_ascii=False)
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO entries (key, value, size, created_at, accessed_at) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (key, payload, len(payload.encode('utf-8')), now, now)
+                    )
+                    self._evict_disk(now)
+                    self._db.commit()
+                except (sqlite3.Error, TypeError, ValueError) as e:
+                    self._disk_error('写入', e)
+
+    def _remember(self, key: str, value: Dict, created_at: float):
+        """写入内存层并按条目数淘汰"""
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def _evict_disk(self, now: float):
+        """删除过期条目，并在超出容量时淘汰最久未访问的条目"""
+        expired = self._db.execute("DELETE FROM entries WHERE created_at < ?", (now - self.ttl,)).rowcount
+        self._stats['evictions'] += max(expired, 0)
+
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._db.execute(
+            "SELECT key, size FROM entries ORDER BY accessed_at ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            self._stats['evictions'] += 1
+
+    def stats(self) -> Dict:
+        """命中/未命中统计"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_items'] = len(self._memory)
+            if self._db is not None:
+                try:
+                    row = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+                    stats['disk_items'], stats['disk_bytes'] = row
+                except sqlite3.Error as e:
+                    self._disk_error('统计', e)
+        hits = stats['memory_hits'] + stats['disk_hits']
+        lookups = hits + stats['misses']
+        stats['hit_rate'] = round(hits / lookups, 4) if lookups else 0.0
+        return stats
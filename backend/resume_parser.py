@@ -1,53 +1,307 @@
+import io
 import os
 import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from docx import Document
-import re
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
+from docx_stream import SOURCE_BODY, extract_blocks
+from resume_sections import section_index
+from basic_info import extract_entities, summarize
+from result_cache import ResultCache, content_key, content_key_stream
+from log_config import reset_logging_after_fork
 
 # 配置日志
 logger = logging.getLogger(__name__)
 
+# 可选的文本提取引擎：python-docx 对象模型（仅正文段落）/ 流式 XML 解析（正文、表格、文本框、页眉页脚）
+ENGINES = ('docx', 'stream')
+
+# 解析逻辑变化时需要递增，使旧的解析缓存失效
+PARSER_VERSION = '7'
+
+
+def paragraph_spans(text: str) -> List[List[int]]:
+    """非空行（去除首尾空白后）在文本中的[起, 止)偏移，段落内容不重复存储"""
+    spans = []
+    position = 0
+    for line in text.split('\n'):
+        stripped = line.strip()
+        if stripped:
+            start = position + (len(line) - len(line.lstrip()))
+            spans.append([start, start + len(stripped)])
+        position += len(line) + 1
+    return spans
+
+
+class ParagraphView(Sequence):
+    """按偏移从raw_text中按需切出段落的只读列表视图"""
+
+    def __init__(self, text: str, spans: List[List[int]]):
+        self._text = text
+        self._spans = spans
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._text[start:end] for start, end in self._spans[index]]
+        start, end = self._spans[index]
+        return self._text[start:end]
+
+
+class ParsedResume(dict):
+    """解析结果：paragraphs不单独存储（不进入缓存和JSON），访问时按paragraph_spans从raw_text中切出"""
+
+    def __missing__(self, key):
+        if key == 'paragraphs' and 'paragraph_spans' in self:
+            return ParagraphView(self['raw_text'], self['paragraph_spans'])
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+def paragraphs_of(parsed_data: Dict) -> Sequence:
+    """解析结果的段落列表（兼容旧版带paragraphs字段的结果）"""
+    if 'paragraphs' in parsed_data:
+        return parsed_data['paragraphs']
+    return ParagraphView(parsed_data['raw_text'], parsed_data['paragraph_spans'])
+
+
+def to_wire(parsed_data: Dict, compact: bool = False) -> Dict:
+    """返回给客户端的解析结果：默认展开为paragraphs列表（兼容旧客户端），compact时只返回偏移"""
+    if compact:
+        return parsed_data
+    wire = {key: value for key, value in parsed_data.items() if key != 'paragraph_spans'}
+    wire['paragraphs'] = list(paragraphs_of(parsed_data))
+    return wire
+
+
 class ResumeParser:
     """简历解析器 - 简化版（只做文本提取）"""
 
-    def __init__(self):
-        # 简化后不需要复杂的关键词定义
-        pass
+    def __init__(self, engine: str = 'docx', cache: Optional[ResultCache] = None, processes: int = 0):
+        if engine not in ENGINES:
+            raise ValueError(f"不支持的解析引擎: {engine}，可选: {', '.join(ENGINES)}")
+        self.engine = engine
+        self.cache = cache
+        # parse_many使用的进程数，0表示在当前进程中顺序解析
+        self.processes = processes
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._pool_broken = False  # 进程池曾异常退出：此后不再从（多线程的）服务进程fork
 
     def parse_resume(self, file_path: str) -> Dict:
         """解析简历文件"""
-        logger.info(f"📄 开始解析简历文件: {file_path}")
+        logger.info("📄 开始解析简历文件: %s", file_path)
 
         try:
             if not os.path.exists(file_path):
                 raise Exception(f"文件不存在: {file_path}")
 
-            logger.debug("📖 读取Word文档...")
-            doc = Document(file_path)
-            text_content = self._extract_text(doc)
+            source = file_path
+            cache_key = None
+            if self.cache is not None:
+                with open(file_path, 'rb') as f:
+                    data = f.read()
+                cache_key = content_key(data, f"{PARSER_VERSION}-{self.engine}")
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    logger.info("⚡ 命中解析缓存，跳过文档解码")
+                    return ParsedResume(cached)
+                source = io.BytesIO(data)
+
+            parsed_data = self._parse_source(source)
+
+            if cache_key is not None:
+                self.cache.put(cache_key, parsed_data)
+
+            return parsed_data
 
-            logger.info(f"📏 提取文本长度: {len(text_content)} 字符")
-            logger.debug(f"📝 文本前200字符: {text_content[:200]}...")
+        except Exception as e:
+            logger.error("❌ 解析简历失败: %s", e)
+            raise Exception(f"解析简历失败: {str(e)}")
+
+    def parse_stream(self, stream) -> Dict:
+        """直接从可seek的文件对象（如上传文件的内存/溢写缓冲区）解析简历，不落盘"""
+        logger.info("📄 开始解析上传的简历数据流")
+
+        try:
+            cache_key = None
+            if self.cache is not None:
+                cache_key = content_key_stream(stream, f"{PARSER_VERSION}-{self.engine}")
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    logger.info("⚡ 命中解析缓存，跳过文档解码")
+                    return ParsedResume(cached)
 
-            logger.debug("📝 简单提取文本内容...")
-            parsed_data = {
-                'raw_text': text_content,  # 主要内容
-                'text_length': len(text_content),  # 文本长度
-                'paragraphs': self._split_paragraphs(text_content),  # 段落列表
-                'basic_info': self._extract_basic_info(text_content)  # 基本信息（简单提取）
-            }
+            stream.seek(0)
+            parsed_data = self._parse_source(stream)
 
-            logger.info("✅ 简历解析完成")
-            logger.debug(f"📊 解析结果统计: 文本长度{parsed_data['text_length']}字符, "
-                        f"段落数{len(parsed_data['paragraphs'])}个, "
-                        f"基本信息{len(parsed_data['basic_info'])}项")
+            if cache_key is not None:
+                self.cache.put(cache_key, parsed_data)
 
             return parsed_data
 
         except Exception as e:
-            logger.error(f"❌ 解析简历失败: {str(e)}")
+            logger.error("❌ 解析简历失败: %s", e)
             raise Exception(f"解析简历失败: {str(e)}")
 
+    def _parse_source(self, source) -> Dict:
+        """从文件路径、文件对象或字节内容解析简历（不经过缓存）"""
+        if isinstance(source, (bytes, bytearray)):
+            source = io.BytesIO(source)
+
+        logger.debug("📖 读取Word文档（引擎: %s）...", self.engine)
+        if self.engine == 'stream':
+            text_content, source_spans = self._extract_text_stream(source)
+        else:
+            doc = Document(source)
+            text_content = self._extract_text(doc)
+            source_spans = [[0, len(text_content), SOURCE_BODY]] if text_content else []
+
+        logger.info("📏 提取文本长度: %s 字符", len(text_content))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("📝 文本前200字符: %s...", text_content[:200])
+
+        logger.debug("📝 简单提取文本内容...")
+        entities = extract_entities(text_content)
+        parsed_data = ParsedResume({
+            'raw_text': text_content,  # 主要内容
+            'text_length': len(text_content),  # 文本长度
+            'paragraph_spans': paragraph_spans(text_content),  # 段落在raw_text中的[起, 止)偏移
+            'sections': section_index(text_content),  # 各章节在raw_text中的[起, 止)偏移
+            'source_spans': source_spans,  # 文本来源（正文/表格/文本框/页眉/页脚）的[起, 止, 来源]
+            'basic_info': summarize(entities),  # 基本信息（每类取第一个）
+            'entities': entities  # 所有联系方式、网址、日期、所在地及其位置
+        })
+
+        logger.info("✅ 简历解析完成")
+        logger.debug("📊 解析结果统计: 文本长度%s字符, 段落数%s个, 基本信息%s项",
+                     parsed_data['text_length'], len(parsed_data['paragraph_spans']), len(parsed_data['basic_info']))
+        return parsed_data
+
+    def _parse_isolated(self, source) -> Dict:
+        """解析单个文件并隔离异常，返回 {'success', 'data'/'error'}"""
+        try:
+            return {'success': True, 'data': self._parse_source(source)}
+        except Exception as e:
+            logger.error("❌ 解析简历失败: %s", e)
+            return {'success': False, 'error': f"解析简历失败: {str(e)}"}
+
+    def parse_many(self, sources: List, chunksize: int = 4) -> List[Dict]:
+        """批量解析多个简历（文件路径或字节内容），按输入顺序返回 {'success', 'data'/'error'}
+
+        配置了processes时在常驻进程池中并行解析；命中缓存的文件不会提交到进程池。
+        """
+        results: List[Optional[Dict]] = [None] * len(sources)
+        pending = []  # (序号, 待解析内容, 缓存键)
+        for index, source in enumerate(sources):
+            cache_key = None
+            if self.cache is not None:
+                try:
+                    data = self._read_bytes(source)
+                except Exception as e:
+                    results[index] = {'success': False, 'error': f"解析简历失败: {str(e)}"}
+                    continue
+                cache_key = content_key(data, f"{PARSER_VERSION}-{self.engine}")
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    results[index] = {'success': True, 'data': ParsedResume(cached)}
+                    continue
+                source = data
+            pending.append((index, source, cache_key))
+
+        if pending:
+            logger.info("📚 批量解析: %s个文件（缓存命中%s个）", len(pending), len(sources) - len(pending))
+            outcomes = self._map_parse([source for _, source, _ in pending], chunksize)
+            for (index, _, cache_key), outcome in zip(pending, outcomes):
+                results[index] = outcome
+                if cache_key is not None and outcome['success']:
+                    self.cache.put(cache_key, outcome['data'])
+
+        return results
+
+    def _map_parse(self, sources: List, chunksize: int) -> List[Dict]:
+        """在进程池（或当前进程）中按顺序解析"""
+        if not self.processes:
+            return [self._parse_isolated(source) for source in sources]
+
+        pool = self._get_pool()
+        outcomes = []
+        try:
+            for outcome in pool.map(_parse_in_worker, sources, chunksize=chunksize):
+                outcomes.append(outcome)
+        except BrokenProcessPool as e:
+            # 工作进程异常退出：剩余文件记为失败，下次调用时重建进程池
+            logger.error("❌ 解析进程池异常: %s", e)
+            self._discard_pool(pool)
+            outcomes.extend({'success': False, 'error': f"解析进程异常退出: {str(e)}"}
+                            for _ in range(len(sources) - len(outcomes)))
+        return outcomes
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """常驻解析进程池（首次使用时创建，之后复用）"""
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=self._pool_context(),
+                    initializer=_init_worker,
+                    initargs=(self.engine,)
+                )
+            return self._pool
+
+    def _pool_context(self):
+        """进程启动方式：启动时（warm_up）用fork，重建时改用forkserver（不支持时用spawn）
+
+        重建发生在处理请求期间，其他线程可能正持有锁（日志、SQLite、连接池等），
+        此时fork出的子进程会继承这些永远不会释放的锁。
+        """
+        methods = multiprocessing.get_all_start_methods()
+        if not self._pool_broken:
+            return multiprocessing.get_context('fork' if 'fork' in methods else None)
+        if 'forkserver' not in methods:
+            return multiprocessing.get_context('spawn')
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload([__name__])
+        return context
+
+    def _discard_pool(self, pool: ProcessPoolExecutor):
+        """关闭已损坏的进程池，下次使用时重建（其他线程可能已经处理过同一个进程池）"""
+        with self._pool_lock:
+            if self._pool is pool:
+                pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+                self._pool_broken = True
+
+    def warm_up(self):
+        """预先启动所有解析进程，避免首个批量请求承担进程启动开销"""
+        if self.processes:
+            list(self._get_pool().map(_worker_ready, range(self.processes)))
+            logger.info("🔥 解析进程池已就绪: %s个进程", self.processes)
+
+    def close(self):
+        """关闭解析进程池"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    def _read_bytes(self, source) -> bytes:
+        """读取文件路径或字节内容"""
+        if isinstance(source, (bytes, bytearray)):
+            return bytes(source)
+        with open(source, 'rb') as f:
+            return f.read()
+
     def _extract_text(self, doc: Document) -> str:
         """提取文档文本"""
         full_text = []
@@ -56,43 +310,49 @@ class ResumeParser:
                 full_text.append(paragraph.text.strip())
         return '\n'.join(full_text)
 
-    def _split_paragraphs(self, text: str) -> List[str]:
-        """分割段落"""
-        paragraphs = []
-        for line in text.split('\n'):
-            line = line.strip()
-            if line:  # 只保留非空行
-                paragraphs.append(line)
-        return paragraphs
-
-    def _extract_basic_info(self, text: str) -> Dict:
-        """提取基本信息（简化版）"""
-        basic_info = {}
-
-        # 只做最基本的提取，不做复杂匹配
-        import re
-
-        # 提取邮箱
-        email_match = re.search(r'\b([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,})\b', text)
-        if email_match:
-            basic_info['邮箱'] = email_match.group(1)
-
-        # 提取电话号码（包括各种格式）
-        phone_patterns = [
-            r'1[3-9]\d{9}',  # 手机号
-            r'\d{3,4}[-\s]?\d{3,4}[-\s]?\d{4}',  # 固定电话
-            r'\d{3}\*{4}\d{4}'  # 掩码电话
-        ]
-        for pattern in phone_patterns:
-            phone_match = re.search(pattern, text)
-            if phone_match:
-                basic_info['电话'] = phone_match.group()
-                break
-
-        # 提取可能的姓名（取第一行中的中文名字）
-        first_line = text.split('\n')[0] if text.split('\n') else ''
-        name_match = re.search(r'([\u4e00-\u9fa5]{2,4})', first_line)
-        if name_match:
-            basic_info['可能的姓名'] = name_match.group(1)
-
-        return basic_info
\ No newline at end of file
+    def _extract_text_stream(self, source) -> Tuple[str, List[List]]:
+        """流式提取整个文档的文本（不构建python-docx对象树），返回(文本, 来源区间)
+
+        连续来自同一来源的行合并为一个区间 [起, 止, 来源]。
+        """
+        lines = []
+        source_spans = []
+        position = 0
+        for tag, text in extract_blocks(source):
+            text = text.strip()
+            if not text:
+                continue
+            if lines:
+                position += 1  # 换行符
+            lines.append(text)
+            if source_spans and source_spans[-1][2] == tag:
+                source_spans[-1][1] = position + len(text)
+            else:
+                source_spans.append([position, position + len(text), tag])
+            position += len(text)
+        return '\n'.join(lines), source_spans
+
+
+# ---- 解析进程池的工作进程函数（需为模块级函数以便序列化） ----
+
+_worker_parser = None
+
+
+def _init_worker(engine: str):
+    """工作进程初始化：每个进程创建一个常驻解析器
+
+    进程池在日志后台线程启动之后才fork，需先替换继承的日志队列。BrokenProcessPool后以forkserver/spawn重建时，
+    入口脚本会以 __mp_main__ 名义在子进程中重新执行（app.py据此跳过服务启动），其中的日志配置同样在这里替换。
+    """
+    global _worker_parser
+    reset_logging_after_fork()
+    _worker_parser = ResumeParser(engine=engine)
+
+
+def _worker_ready(_) -> bool:
+    """预热用的空任务"""
+    return True
+
+
+def _parse_in_worker(source) -> Dict:
+    return _worker_parser._parse_isolated(source)
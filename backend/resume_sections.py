@@ -0,0 +1,52 @@
+import re
+from typing import Dict, Iterable, List
+
+# 规范化的章节名 -> 常见标题写法（中英文）
+SECTION_HEADINGS = {
+    '个人信息': ['个人信息', '基本信息', '个人资料', '基本资料', '联系方式', 'Personal Information', 'Contact'],
+    '教育背景': ['教育背景', '教育经历', '学历背景', '学习经历', 'Education'],
+    '工作经历': ['工作经历', '工作经验', '实习经历', '实习经验', '职业经历', 'Work Experience', 'Experience',
+             'Internship'],
+    '技能': ['专业技能', '技能特长', '技能证书', '技能清单', '个人技能', '技术栈', '技能', 'Skills'],
+    '项目经历': ['项目经历', '项目经验', '项目介绍', 'Projects', 'Project Experience'],
+    '自我评价': ['自我评价', '个人评价', '自我介绍', '个人总结', 'Summary', 'Profile'],
+    '荣誉证书': ['获奖情况', '荣誉奖项', '获奖经历', '证书', '荣誉', 'Awards', 'Certificates'],
+}
+
+# 第一个标题之前的内容（姓名、联系方式等）归入该章节
+PREAMBLE_SECTION = '个人信息'
+
+_KEYWORD_TO_SECTION = {
+    keyword.lower(): section for section, keywords in SECTION_HEADINGS.items() for keyword in keywords
+}
+
+# 所有标题关键词合并为一个正则，一次扫描全文；较长的关键词在前，优先匹配（如"技能特长"先于"技能"）
+# 标题行：可选编号/括号 + 关键词 + 可选括号/序号，之后是冒号或行尾
+_HEADING_PATTERN = re.compile(
+    r'^[ \t]*(?:[一二三四五六七八九十\d]+[、.．)）]\s*)?[【\[(（]?[ \t]*'
+    r'(?P<keyword>' + '|'.join(re.escape(k) for k in sorted(_KEYWORD_TO_SECTION, key=len, reverse=True)) + r')'
+    r'[ \t]*[】\])）]?[ \t\d]*(?:[:：]|$)',
+    re.MULTILINE | re.IGNORECASE
+)
+
+
+def section_index(text: str) -> Dict[str, List[List[int]]]:
+    """定位简历中的各章节，返回 {章节名: [[起, 止), ...]}（同一章节可出现多次，如实习经历和工作经历）"""
+    headings = [(match.start(), _KEYWORD_TO_SECTION[match.group('keyword').lower()])
+                for match in _HEADING_PATTERN.finditer(text)]
+
+    sections: Dict[str, List[List[int]]] = {}
+    first = headings[0][0] if headings else len(text)
+    if text[:first].strip():
+        sections[PREAMBLE_SECTION] = [[0, first]]
+
+    for index, (start, section) in enumerate(headings):
+        end = headings[index + 1][0] if index + 1 < len(headings) else len(text)
+        sections.setdefault(section, []).append([start, end])
+    return sections
+
+
+def select_sections(text: str, sections: Dict[str, List[List[int]]], wanted: Iterable[str]) -> str:
+    """按原文顺序拼接指定章节的内容；一个章节都没有找到时返回空字符串"""
+    spans = sorted(span for name in wanted for span in sections.get(name, []))
+    return '\n'.join(text[start:end].strip() for start, end in spans)
@@ -0,0 +1,117 @@
+import re
+import logging
+from typing import Tuple
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 一次扫描对文本分类计数：中日韩字符 / 拉丁单词 / 数字串 / 其他非空白字符
+_TOKEN_CLASSES = re.compile(
+    r'(?P<cjk>[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\u3040-\u30ff\uac00-\ud7af])'
+    r'|(?P<word>[A-Za-z]+)'
+    r'|(?P<digits>\d+)'
+    r'|(?P<other>\S)'
+)
+
+# 常见的无信息量行：页码、模板标题、页眉页脚
+_BOILERPLATE_LINE = re.compile(
+    r'^\s*(?:(?:个人)?简历|resume|curriculum vitae|cv'
+    r'|第\s*\d+\s*页(?:\s*[/／,，]?\s*共\s*\d+\s*页)?|page\s*\d+(?:\s*(?:of|/)\s*\d+)?|\d+\s*/\s*\d+)\s*$',
+    re.IGNORECASE
+)
+
+TRUNCATION_MARKER = '\n...（内容过长，已截断）'
+
+
+def estimate_tokens(text: str) -> int:
+    """本地估算token数（适用于中英文混排）
+
+    中日韩字符约每字1个token；英文单词约每4个字母1个token（至少1个）；
+    数字约每3位1个token；标点等其他字符各算1个。
+    """
+    tokens = 0
+    for match in _TOKEN_CLASSES.finditer(text):
+        kind = match.lastgroup
+        if kind == 'cjk' or kind == 'other':
+            tokens += 1
+        elif kind == 'word':
+            tokens += (len(match.group()) + 3) // 4
+        else:
+            tokens += (len(match.group()) + 2) // 3
+    return tokens
+
+
+def compress_text(text: str) -> str:
+    """去除低价值内容：合并连续空白、删除重复行和页码/模板标题等样板行"""
+    lines = []
+    seen = set()
+    for line in text.split('\n'):
+        line = re.sub(r'[ \t\u3000\xa0]+', ' ', line).strip()
+        if not line or _BOILERPLATE_LINE.match(line):
+            continue
+        if line in seen:
+            continue
+        seen.add(line)
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """按估算token数截断文本（保留开头部分），尽量在行边界处截断；放不下的行按字符截取到剩余预算"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    budget = max_tokens - estimate_tokens(TRUNCATION_MARKER)
+    kept = []
+    used = 0
+    for line in text.split('\n'):
+        cost = estimate_tokens(line) + 1
+        if used + cost > budget:
+            # 超长的行（如整段无换行的工作描述）不能整行丢弃，否则后面的预算全部浪费
+            head = _truncate_line(line, budget - used - 1)
+            if head:
+                kept.append(head)
+            break
+        kept.append(line)
+        used += cost
+    return '\n'.join(kept) + TRUNCATION_MARKER
+
+
+def _truncate_line(line: str, max_tokens: int) -> str:
+    """二分查找估算token数不超过max_tokens的最长前缀"""
+    low, high = 0, len(line) if max_tokens > 0 else 0
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens(line[:middle]) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return line[:low]
+
+
+class TokenBudget:
+    """AI调用的token预算：压缩/截断输入到预算内，并按输入长度调整max_tokens"""
+
+    def __init__(self, input_budget: int = 6000, adaptive_max_tokens: bool = True,
+                 reference_input: int = 1500, min_scale: float = 0.6, max_scale: float = 1.5):
+        self.input_budget = input_budget
+        self.adaptive_max_tokens = adaptive_max_tokens
+        self.reference_input = reference_input
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+
+    def fit(self, text: str) -> Tuple[str, int]:
+        """返回(压缩并截断到预算内的文本, 估算token数)"""
+        compressed = compress_text(text)
+        fitted = truncate_to_tokens(compressed, self.input_budget)
+        tokens = estimate_tokens(fitted)
+        if fitted is not compressed:
+            logger.info("✂️ 简历内容超出输入预算(%s tokens)，已截断", self.input_budget)
+        return fitted, tokens
+
+    def max_tokens_for(self, base_max_tokens: int, input_tokens: int) -> int:
+        """按输入长度缩放输出上限：以reference_input为基准，限制在[min_scale, max_scale]倍之间"""
+        if not self.adaptive_max_tokens:
+            return base_max_tokens
+        scale = min(max(input_tokens / self.reference_input, self.min_scale), self.max_scale)
+        # 取整到50，避免相近长度的简历得到不同的参数而无法共享响应缓存
+        return max(50, int(base_max_tokens * scale) // 50 * 50)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+请求日志开销对比：旧配置（DEBUG级别、同步写文件、f-string立即格式化）vs 异步队列 + 延迟格式化
+
+用法:
+    python bench_logging.py [--requests N] [--level INFO]
+模拟一次 /full_analysis 请求在解析、分析各环节写出的日志，统计请求线程上每个请求的日志耗时。
+日志写入临时目录，不需要.docx文件，也不会调用AI服务。
+"""
+import sys
+import os
+import time
+import logging
+import tempfile
+import argparse
+import codecs
+
+# 设置编码
+if sys.stdout.encoding != 'utf-8':
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'ignore')
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from log_config import LOG_FORMAT, setup_logging
+
+TEXT = '负责订单系统的设计与开发，使用Python、Flask和MySQL，日均处理请求超过500万次。\n' * 60
+TIMINGS = {'parse_ms': 12.5, 'analysis_ms': 8123.4, 'recommendation_ms': 7988.1, 'llm_wall_ms': 8130.2}
+
+app_log = logging.getLogger('app')
+parser_log = logging.getLogger('resume_parser')
+analyzer_log = logging.getLogger('deepseek_analyzer')
+
+
+def request_before(request_id, filename):
+    """旧版写法：f-string在调用处立即格式化（级别被关闭时也一样）"""
+    app_log.info(f"🔍 [{request_id}] 开始完整分析流程")
+    app_log.debug(f"[{request_id}] 检查文件上传...")
+    app_log.info(f"[{request_id}] 接收到文件: {filename}")
+    app_log.info(f"[{request_id}] 文件大小: {len(TEXT) * 3} bytes")
+    app_log.info(f"[{request_id}] 开始解析简历...")
+    parser_log.info("📄 开始解析上传的简历数据流")
+    parser_log.debug("📖 读取Word文档（引擎: stream）...")
+    parser_log.info(f"📏 提取文本长度: {len(TEXT)} 字符")
+    parser_log.debug(f"📝 文本前200字符: {TEXT[:200]}...")
+    parser_log.info("✅ 简历解析完成")
+    app_log.info(f"[{request_id}] 简历解析成功")
+    app_log.debug(f"[{request_id}] 解析结果: {['raw_text', 'text_length', 'paragraph_spans', 'sections']}")
+    app_log.info(f"[{request_id}] 开始AI分析和岗位推荐（并发）...")
+    for _ in range(2):
+        analyzer_log.info("🤖 开始AI分析简历...")
+        analyzer_log.debug(f"📏 输入内容长度: {len(TEXT)} 字符")
+        analyzer_log.info("🌐 调用AI API...")
+        analyzer_log.info("✅ API调用成功")
+        analyzer_log.debug(f"📥 响应长度: {len(TEXT) // 2} 字符")
+    app_log.info(f"[{request_id}] AI分析成功")
+    app_log.info(f"[{request_id}] 岗位推荐成功")
+    app_log.info(f"[{request_id}] 完整分析流程完成，耗时: {TIMINGS}")
+
+
+def request_after(request_id, filename):
+    """新写法：参数延迟格式化，低于级别的日志直接返回"""
+    app_log.info("🔍 [%s] 开始完整分析流程", request_id)
+    app_log.debug("[%s] 检查文件上传...", request_id)
+    app_log.info("[%s] 接收到文件: %s", request_id, filename)
+    app_log.info("[%s] 文件大小: %s bytes", request_id, len(TEXT) * 3)
+    app_log.info("[%s] 开始解析简历...", request_id)
+    parser_log.info("📄 开始解析上传的简历数据流")
+    parser_log.debug("📖 读取Word文档（引擎: %s）...", 'stream')
+    parser_log.info("📏 提取文本长度: %s 字符", len(TEXT))
+    if parser_log.isEnabledFor(logging.DEBUG):
+        parser_log.debug("📝 文本前200字符: %s...", TEXT[:200])
+    parser_log.info("✅ 简历解析完成")
+    app_log.info("[%s] 简历解析成功", request_id)
+    app_log.debug("[%s] 解析结果: %s", request_id, ['raw_text', 'text_length', 'paragraph_spans', 'sections'])
+    app_log.info("[%s] 开始AI分析和岗位推荐（并发）...", request_id)
+    for _ in range(2):
+        analyzer_log.info("🤖 开始AI分析简历...")
+        analyzer_log.debug("📏 输入内容长度: %s 字符", len(TEXT))
+        analyzer_log.info("🌐 调用AI API...")
+        analyzer_log.info("✅ API调用成功")
+        analyzer_log.debug("📥 响应长度: %s 字符", len(TEXT) // 2)
+    app_log.info("[%s] AI分析成功", request_id)
+    app_log.info("[%s] 岗位推荐成功", request_id)
+    app_log.info("[%s] 完整分析流程完成，耗时: %s", request_id, TIMINGS)
+
+
+def reset_logging():
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    for logger in (app_log, parser_log, analyzer_log):
+        logger.setLevel(logging.NOTSET)
+
+
+def run(request, count):
+    start = time.perf_counter()
+    for i in range(count):
+        request(f'{i:08x}', f'简历{i}.docx')
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='请求日志开销对比')
+    arg_parser.add_argument('--requests', type=int, default=5000, help='模拟请求数')
+    arg_parser.add_argument('--level', default='INFO', help='新配置的日志级别')
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir, open(os.devnull, 'w', encoding='utf-8') as console:
+        # 旧配置：与原 app.py 的 basicConfig 相同（控制台输出重定向到空设备）
+        logging.basicConfig(level=logging.DEBUG, format=LOG_FORMAT, handlers=[
+            logging.StreamHandler(console),
+            logging.FileHandler(os.path.join(tmp_dir, 'before.log'), encoding='utf-8')
+        ])
+        before_us = run(request_before, args.requests)
+        reset_logging()
+
+        # 队列容量足够容纳全部日志，避免压测时因丢弃而低估写入量
+        queue_size = args.requests * 40
+        listener = setup_logging(os.path.join(tmp_dir, 'after.log'), level=args.level, stream=console,
+                                 queue_size=queue_size)
+        after_us = run(request_after, args.requests)
+        drain_start = time.perf_counter()
+        listener.stop()
+        drain_ms = (time.perf_counter() - drain_start) * 1000
+        reset_logging()
+
+        listener = setup_logging(os.path.join(tmp_dir, 'debug.log'), level='DEBUG', stream=console,
+                                 queue_size=queue_size)
+        debug_us = run(request_after, args.requests)
+        listener.stop()
+        reset_logging()
+
+        lines = {name: sum(1 for _ in open(os.path.join(tmp_dir, f'{name}.log'), encoding='utf-8'))
+                 for name in ('before', 'after', 'debug')}
+
+    print(f"[模拟] {args.requests} 个请求")
+    print("=" * 60)
+    print(f"[旧配置] 每请求 {before_us:.1f}µs（DEBUG, 同步写入, {lines['before'] / args.requests:.0f} 行/请求）")
+    print(f"[异步+{args.level.upper()}] 每请求 {after_us:.1f}µs（{lines['after'] / args.requests:.0f} 行/请求, "
+          f"后台写完剩余日志 {drain_ms:.0f}ms）")
+    print(f"[异步+DEBUG采样] 每请求 {debug_us:.1f}µs（{lines['debug'] / args.requests:.1f} 行/请求）")
+    print("=" * 60)
+    print(f"[对比] 请求线程上的日志开销降低 {before_us / after_us:.1f}x（{args.level.upper()}），"
+          f"{before_us / debug_us:.1f}x（DEBUG采样）")
+
+
+if __name__ == "__main__":
+    main()
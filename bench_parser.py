@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+简历解析引擎性能对比：python-docx 对象模型 vs 流式 XML 解析
+
+用法:
+    python bench_parser.py [简历目录或.docx文件 ...] [--repeat N]
+不指定文件时会在临时目录生成一组合成简历作为测试语料。
+"""
+import sys
+import os
+import time
+import tempfile
+import tracemalloc
+import argparse
+import codecs
+
+# 设置编码
+if sys.stdout.encoding != 'utf-8':
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'ignore')
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from resume_parser import ResumeParser, ENGINES
+
+
+def build_corpus(target_dir, count=20, sections=40):
+    """生成合成简历语料（段落多、样式多的大文档）"""
+    from docx import Document
+
+    paths = []
+    for i in range(count):
+        doc = Document()
+        doc.add_heading(f'候选人{i} 个人简历', 0)
+        doc.add_paragraph(f'电话：138{i:08d}  邮箱：candidate{i}@example.com')
+        for s in range(sections):
+            doc.add_heading(f'工作经历 {s}', level=1)
+            for line in range(5):
+                p = doc.add_paragraph()
+                p.add_run(f'2020.{line + 1}-2021.{line + 1} ').bold = True
+                p.add_run(f'某科技有限公司 第{s}段经历 负责后端服务开发与优化，').italic = True
+                p.add_run('使用Python、Flask、MySQL，日活用户超过100万。')
+            doc.add_paragraph('技能：Python / Java / 机器学习', style='List Bullet')
+        path = os.path.join(target_dir, f'synthetic_{i}.docx')
+        doc.save(path)
+        paths.append(path)
+    return paths
+
+
+def collect_files(inputs):
+    """收集待测试的.docx文件"""
+    files = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for name in sorted(os.listdir(item)):
+                if name.lower().endswith('.docx'):
+                    files.append(os.path.join(item, name))
+        elif item.lower().endswith('.docx'):
+            files.append(item)
+    return files
+
+
+def run_engine(engine, files, repeat):
+    """运行指定引擎，返回(总耗时, 峰值内存, 结果列表)"""
+    parser = ResumeParser(engine=engine)
+    results = [parser.parse_resume(path) for path in files]  # 预热
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for path in files:
+            parser.parse_resume(path)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    for path in files:
+        parser.parse_resume(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak, results
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='简历解析引擎性能对比')
+    arg_parser.add_argument('inputs', nargs='*', help='简历目录或.docx文件')
+    arg_parser.add_argument('--repeat', type=int, default=5, help='每个文件重复解析次数')
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        files = collect_files(args.inputs) if args.inputs else build_corpus(tmp_dir)
+        if not files:
+            print("[错误] 没有找到.docx文件")
+            return
+
+        total_bytes = sum(os.path.getsize(path) for path in files)
+        print(f"[语料] {len(files)} 个文件, 共 {total_bytes / 1024:.1f} KB, 重复 {args.repeat} 次")
+        print("=" * 60)
+
+        stats = {}
+        for engine in ENGINES:
+            elapsed, peak, results = run_engine(engine, files, args.repeat)
+            stats[engine] = (elapsed, results)
+            per_file = elapsed / (len(files) * args.repeat) * 1000
+            print(f"[{engine:>6}] 总耗时 {elapsed:.3f}s, 每文件 {per_file:.2f}ms, 峰值内存 {peak / 1024:.1f} KB")
+
+        base_time, base_results = stats['docx']
+        stream_time, stream_results = stats['stream']
+        print("=" * 60)
+        print(f"[加速] stream 相对 docx: {base_time / stream_time:.2f}x")
+
+        mismatches = [path for path, a, b in zip(files, base_results, stream_results) if a != b]
+        if mismatches:
+            # stream引擎额外提取表格、文本框和页眉页脚，含这些内容的文件输出不同属于预期
+            print(f"[差异] {len(mismatches)} 个文件输出不一致（stream额外包含表格/文本框/页眉页脚）:")
+            for path in mismatches:
+                print(f"  {path}")
+        else:
+            print("[一致] 两种引擎的解析结果完全一致")
+
+
+if __name__ == "__main__":
+    main()
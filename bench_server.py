@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+服务器模式压测对比：Flask开发服务器（python app.py）vs gunicorn多进程（gunicorn.conf.py）
+
+用法:
+    python bench_server.py [--path /health] [--clients N] [--duration 秒] [--workers N] [--threads N]
+分别在独立端口启动两种服务器，用多个keep-alive客户端并发请求同一接口，统计每秒请求数和延迟分位数。
+默认压测 /health（不调用AI服务）；需要gunicorn（仅Linux/macOS）。
+"""
+import sys
+import os
+import time
+import signal
+import argparse
+import threading
+import subprocess
+import http.client
+import codecs
+
+# 设置编码
+if sys.stdout.encoding != 'utf-8':
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'ignore')
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend')
+
+
+def start_server(command, port, extra_env):
+    env = dict(os.environ, BACKEND_HOST='127.0.0.1', BACKEND_PORT=str(port), LLM_WARMUP='false', **extra_env)
+    # 新建进程组，结束时连同重载子进程/工作进程一起终止
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env, start_new_session=True,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"服务器启动失败: {' '.join(command)}")
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/health')
+            if conn.getresponse().status == 200:
+                conn.close()
+                return process
+        except OSError:
+            time.sleep(0.5)
+    stop_server(process)
+    raise RuntimeError(f"服务器启动超时: {' '.join(command)}")
+
+
+def stop_server(process):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=60)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        os.killpg(process.pid, signal.SIGKILL)
+
+
+def load_test(port, path, clients, duration):
+    """每个客户端复用一个连接循环请求，返回 (请求数, 错误数, 延迟列表)"""
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def client():
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        local = []
+        local_errors = 0
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            try:
+                conn.request('GET', path)
+                response = conn.getresponse()
+                response.read()
+                if response.status != 200:
+                    local_errors += 1
+            except (OSError, http.client.HTTPException):
+                local_errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                continue
+            local.append(time.perf_counter() - start)
+        conn.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(latencies), errors[0], sorted(latencies)
+
+
+def percentile(values, q):
+    return values[min(int(len(values) * q), len(values) - 1)] * 1000 if values else 0.0
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='服务器模式压测对比')
+    arg_parser.add_argument('--path', default='/health', help='压测的接口路径')
+    arg_parser.add_argument('--clients', type=int, default=32, help='并发客户端数')
+    arg_parser.add_argument('--duration', type=float, default=10, help='每种模式压测秒数')
+    arg_parser.add_argument('--workers', type=int, default=4, help='gunicorn工作进程数')
+    arg_parser.add_argument('--threads', type=int, default=8, help='gunicorn每进程线程数')
+    args = arg_parser.parse_args()
+
+    modes = [
+        ('开发服务器', [sys.executable, 'app.py'], 5101, {'FLASK_DEBUG': 'true'}),
+        (f'gunicorn {args.workers}x{args.threads}', [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app:app'],
+         5102, {'SERVER_WORKERS': str(args.workers), 'SERVER_THREADS': str(args.threads)}),
+    ]
+    print(f"[压测] GET {args.path}, {args.clients} 个并发客户端, 每种模式 {args.duration:.0f}s")
+    print("=" * 60)
+
+    results = {}
+    for label, command, port, extra_env in modes:
+        process = start_server(command, port, extra_env)
+        try:
+            load_test(port, args.path, args.clients, min(args.duration, 2))  # 预热
+            count, errors, latencies = load_test(port, args.path, args.clients, args.duration)
+        finally:
+            stop_server(process)
+        rps = count / args.duration
+        results[label] = rps
+        print(f"[{label}] {rps:.0f} 请求/s, p50 {percentile(latencies, 0.5):.1f}ms, "
+              f"p99 {percentile(latencies, 0.99):.1f}ms, 错误 {errors}")
+
+    print("=" * 60)
+    dev_rps, prod_rps = results.values()
+    if dev_rps:
+        print(f"[对比] gunicorn 吞吐量为开发服务器的 {prod_rps / dev_rps:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+测试公共夹具：在临时目录中导入后端应用
+
+backend/app.py 导入时会创建上传/临时/缓存目录、配置日志文件、启动并恢复后台任务队列，
+LLM_WARMUP=true 时还会向各AI服务商发出请求。这里先设置环境变量（优先于config.env）
+并切换工作目录，使这些副作用都落在临时目录中，且不产生网络请求。
+"""
+import sys
+import os
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+ISOLATED_ENV = {
+    'LOG_FILE': '',
+    'LLM_WARMUP': 'false',
+    'LLM_PROVIDERS': '',
+    'LLM_HEDGE': 'false',
+    'GROK_API_KEY': 'sk-test',
+    'PARSER_PROCESSES': '0',
+    'JOB_WORKERS': '1',
+    'NEAR_DUPLICATE_MODE': 'off',
+    'FLASK_DEBUG': 'false',
+}
+
+
+@pytest.fixture(scope='session')
+def backend_app(tmp_path_factory):
+    """导入后的 backend/app.py 模块（缺少后端依赖时跳过）"""
+    for module in ('flask', 'docx', 'openai', 'httpx', 'dotenv'):
+        pytest.importorskip(module)
+    if 'app' in sys.modules:
+        return sys.modules['app']
+
+    sandbox = tmp_path_factory.mktemp('backend')
+    workdir = sandbox / 'backend'
+    workdir.mkdir()
+    with pytest.MonkeyPatch.context() as patch:
+        for name, value in {**ISOLATED_ENV, 'CACHE_DIR': str(sandbox / 'cache')}.items():
+            patch.setenv(name, value)
+        # 上传和临时目录为 ../uploads、../temp（相对工作目录）
+        patch.chdir(workdir)
+        import app
+    return app
@@ -2,6 +2,7 @@ import gradio as gr
 import requests
 import json
 import os
+import time
 import tempfile
 import logging
 import traceback
@@ -44,11 +45,11 @@ class ResumeAnalyzerFrontend:
             logger.debug("🔄 准备文件上传...")
             files = {'file': (file.name, open(file.name, 'rb'), 'application/vnd.openxmlformats-officedocument.wordprocessingml.document')}
 
-            # 调用后端全分析接口
-            logger.info(f"🌐 发送请求到: {self.backend_url}/full_analysis")
+            # 提交后台分析任务并轮询结果（避免长时间占用HTTP连接导致超时）
+            logger.info(f"🌐 提交任务到: {self.backend_url}/jobs")
             start_time = datetime.now()
 
-            response = requests.post(f"{self.backend_url}/full_analysis", files=files, timeout=120)
+            status_code, result, error_detail = self._run_analysis_job(files)
 
             end_time = datetime.now()
             duration = (end_time - start_time).total_seconds()
@@ -58,12 +59,12 @@ class ResumeAnalyzerFrontend:
             files['file'][1].close()
             logger.debug("✅ 文件句柄已关闭")
 
-            logger.info(f"📡 后端响应状态码: {response.status_code}")
+            logger.info(f"📡 后端响应状态码: {status_code}")
 
-            if response.status_code == 200:
-                logger.debug("📥 解析响应JSON...")
-                result = response.json()
+            if status_code == 200:
                 logger.debug(f"📋 响应字段: {list(result.keys())}")
+                if result.get('timings'):
+                    logger.info(f"⏱️ 后端阶段耗时: {result['timings']}")
 
                 if result.get('success'):
                     logger.info("✅ 分析成功，开始格式化结果")
@@ -96,13 +97,9 @@ class ResumeAnalyzerFrontend:
                     return f"分析失败: {error_msg}", "", ""
 
             else:
-                logger.error(f"❌ HTTP请求失败: {response.status_code}")
-                try:
-                    error_detail = response.text
-                    logger.error(f"❌ 错误详情: {error_detail}")
-                except:
-                    pass
-                return f"请求失败: HTTP {response.status_code}", "", ""
+                logger.error(f"❌ HTTP请求失败: {status_code}")
+                logger.error(f"❌ 错误详情: {error_detail}")
+                return f"请求失败: HTTP {status_code}", "", ""
 
         except requests.exceptions.Timeout:
             logger.error("⏰ 请求超时")
@@ -115,6 +112,26 @@ class ResumeAnalyzerFrontend:
             logger.error(f"📋 异常详情: {traceback.format_exc()}")
             return f"分析过程出错: {str(e)}", "", ""
 
+    def _run_analysis_job(self, files, poll_interval: float = 2.0,
+                          max_wait: float = 900.0) -> Tuple[int, Optional[dict], str]:
+        """提交后台分析任务并轮询，返回(状态码, 分析结果, 错误详情)"""
+        response = requests.post(f"{self.backend_url}/jobs", files=files, timeout=60)
+        if response.status_code != 202:
+            return response.status_code, None, response.text
+
+        job_id = response.json()['job_id']
+        logger.info(f"🧾 任务已提交: {job_id}")
+        deadline = time.monotonic() + max_wait
+        while time.monotonic() < deadline:
+            time.sleep(poll_interval)
+            job = requests.get(f"{self.backend_url}/jobs/{job_id}", timeout=10).json()
+            logger.debug(f"⏳ 任务进度: {job.get('status')} {job.get('stages')}")
+            if job.get('status') == 'done':
+                return 200, job['result'], ''
+            if job.get('status') == 'failed':
+                return 200, {'success': False, 'error': job.get('error')}, ''
+        raise requests.exceptions.Timeout(f"任务 {job_id} 超过{max_wait:.0f}秒未完成")
+
     def _format_parsed_data(self, parsed_data: dict) -> str:
         """格式化解析的简历数据"""
         if not parsed_data:
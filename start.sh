@@ -5,7 +5,12 @@ echo
 
 echo "[1/2] 启动后端服务..."
 cd backend
-python app.py &
+SERVER_MODE=$(grep -E '^SERVER_MODE=' ../config.env | cut -d= -f2)
+if [ "$SERVER_MODE" = "production" ]; then
+    gunicorn -c gunicorn.conf.py app:app &
+else
+    python app.py &
+fi
 BACKEND_PID=$!
 
 echo "等待后端服务启动..."
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+测试接口准入控制：并发上限、等待队列和排队超时
+用法: python -m pytest -q test_admission.py
+"""
+import sys
+import os
+import time
+import threading
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from admission import AdmissionLimiter, Overloaded
+
+
+def _wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("等待超时")
+        time.sleep(0.01)
+
+
+def test_admission_rejects_beyond_queue():
+    limiter = AdmissionLimiter('test', max_in_flight=1, max_queue=0)
+    limiter.acquire()
+    with pytest.raises(Overloaded) as excinfo:
+        limiter.acquire()
+    assert excinfo.value.retry_after >= 1
+    limiter.release(0.1)
+    limiter.acquire()
+    assert limiter.stats()['rejected'] == 1
+
+
+def test_admission_queued_request_admitted_after_release():
+    limiter = AdmissionLimiter('test', max_in_flight=1, max_queue=1, max_wait=5)
+    limiter.acquire()
+    admitted = threading.Event()
+
+    def waiter():
+        limiter.acquire()
+        admitted.set()
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    _wait_until(lambda: limiter.stats()['waiting'] == 1)
+    assert not admitted.is_set()
+    limiter.release(0.1)
+    thread.join(5)
+    assert admitted.is_set()
+    assert limiter.stats()['in_flight'] == 1
+
+
+def test_admission_queue_timeout():
+    limiter = AdmissionLimiter('test', max_in_flight=1, max_queue=1, max_wait=0.05)
+    limiter.acquire()
+    with pytest.raises(Overloaded):
+        limiter.acquire()
+    stats = limiter.stats()
+    assert stats['timed_out'] == 1 and stats['waiting'] == 0
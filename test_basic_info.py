@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+测试基本信息提取：各类电话格式、邮箱与其他字段重叠时的优先级
+用法: python -m pytest -q test_basic_info.py
+"""
+import sys
+import os
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from basic_info import extract_entities, summarize
+
+
+def _values(text, kind):
+    return [item['value'] for item in extract_entities(text)[kind]]
+
+
+@pytest.mark.parametrize('phone', [
+    '0755-12345678', '0755-8888-9999', '010 8888 9999', '(0755) 8888-9999', '(010)12345678', '400-123-4567',
+])
+def test_landline_formats(phone):
+    assert _values(f'座机：{phone}，工作日可联系', 'landline') == [phone]
+
+
+@pytest.mark.parametrize('phone', ['13812345678', '138-1234-5678', '+86 138 1234 5678', '8613812345678'])
+def test_mobile_formats(phone):
+    assert _values(f'电话：{phone}', 'mobile') == [phone]
+
+
+def test_digits_inside_longer_numbers_are_not_phones():
+    entities = extract_entities('订单号 2013812345678901，金额 99.99')
+    assert not entities['mobile'] and not entities['landline'] and not entities['date']
+
+
+def test_email_takes_precedence_over_phone_in_local_part():
+    entities = extract_entities('邮箱：13812345678@qq.com 手机：139-0000-1111')
+    assert _values('邮箱：13812345678@qq.com', 'email') == ['13812345678@qq.com']
+    assert [item['value'] for item in entities['mobile']] == ['139-0000-1111']
+
+
+def test_url_containing_email_is_one_url():
+    text = '主页 https://mail.example.com/?to=a@b.com'
+    assert _values(text, 'url') == ['https://mail.example.com/?to=a@b.com']
+    assert _values(text, 'email') == []
+
+
+def test_offsets_and_summary():
+    text = '张三 个人简历\n姓名：张三  所在城市：深圳\n邮箱: Zhang.San+cv@example.com.cn  GitHub: github.com/zhangsan\n2019年3月 至 2021年5月 某公司'
+    entities = extract_entities(text)
+    for items in entities.values():
+        for item in items:
+            assert text[item['start']:item['end']] == item['value']
+    assert _values(text, 'date') == ['2019年3月 至 2021年5月']
+    assert summarize(entities) == {'邮箱': 'Zhang.San+cv@example.com.cn', '可能的姓名': '张三', '所在地': '深圳',
+                                   '主页': 'github.com/zhangsan'}
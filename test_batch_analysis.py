@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+测试批量分析中单份简历的结果汇总（不调用AI服务）
+用法: python -m pytest -q test_batch_analysis.py（backend_app 夹具见 conftest.py，在临时目录中导入应用）
+"""
+import threading
+
+import pytest
+
+
+def _fake_payload(analysis_error=None, recommendation_error=None):
+    def fake(filename, parsed_data, mode, use_cache, request_id, timings, compact=False):
+        return {
+            'success': True,
+            'filename': filename,
+            'errors': {'analysis_error': analysis_error, 'recommendation_error': recommendation_error}
+        }
+    return fake
+
+
+@pytest.mark.parametrize('analysis_error, recommendation_error, expected', [
+    (None, None, True),
+    ('分析失败: timeout', None, False),
+    (None, '岗位推荐失败: timeout', False),
+])
+def test_batch_item_success_reflects_ai_errors(backend_app, monkeypatch, analysis_error, recommendation_error, expected):
+    """AI分析或推荐失败时，批量结果的success不能被payload自带的success覆盖"""
+    monkeypatch.setattr(backend_app, '_analysis_payload', _fake_payload(analysis_error, recommendation_error))
+    parsed = {'success': True, 'data': {'raw_text': '张三'}}
+    result = backend_app._batch_item(0, '简历.docx', parsed, 'full', True, threading.BoundedSemaphore(1))
+    assert result['success'] is expected
+    assert result['index'] == 0
+
+
+def test_batch_item_parse_failure(backend_app):
+    parsed = {'success': False, 'error': '解析简历失败: 文件损坏'}
+    result = backend_app._batch_item(3, '坏文件.docx', parsed, 'full', True, threading.BoundedSemaphore(1))
+    assert result == {'index': 3, 'filename': '坏文件.docx', 'success': False, 'stage': 'parse',
+                      'error': '解析简历失败: 文件损坏'}
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+测试批量上传的简历收集：压缩包的数量/解压大小上限和按需读取
+用法: python -m pytest -q test_batch_upload.py
+"""
+import sys
+import os
+import io
+import zipfile
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from batch_upload import BatchTooLarge, collect_batch_files
+
+
+class _Upload:
+    """模拟werkzeug的FileStorage"""
+
+    def __init__(self, filename, data):
+        self.filename = filename
+        self.stream = io.BytesIO(data)
+
+    def read(self):
+        return self.stream.read()
+
+
+def _zip(entries):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, data in entries:
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def _collect(files, max_file_size=1024, max_files=10, max_total_bytes=4096):
+    return collect_batch_files(files, lambda name: name.endswith('.docx'), max_file_size=max_file_size,
+                               max_files=max_files, max_total_bytes=max_total_bytes)
+
+
+def test_collects_zip_entries_lazily():
+    archive = _zip([('简历/张三.docx', b'a' * 10), ('__MACOSX/._张三.docx', b'x'), ('说明.txt', b'x'),
+                    ('李四.docx', b'b' * 2000)])
+    entries = _collect([_Upload('batch.zip', archive), _Upload('王五.docx', b'c')])
+    assert [entry.filename for entry in entries] == ['张三.docx', '李四.docx', '王五.docx']
+    assert entries[0].read() == b'a' * 10
+    # 超过单个文件上限的条目不解压
+    assert entries[1].read() is None
+    assert entries[2].read() == b'c'
+
+
+def test_rejects_archive_exceeding_total_decompressed_size():
+    # 高压缩比的条目：压缩后很小，解压后超过总大小上限
+    archive = _zip([(f'{i}.docx', b'\0' * 1000) for i in range(5)])
+    assert len(archive) < 4096
+    with pytest.raises(BatchTooLarge):
+        _collect([_Upload('bomb.zip', archive)])
+
+
+def test_rejects_too_many_entries():
+    archive = _zip([(f'{i}.docx', b'a') for i in range(11)])
+    with pytest.raises(BatchTooLarge):
+        _collect([_Upload('batch.zip', archive)])
+    with pytest.raises(BatchTooLarge):
+        _collect([_Upload(f'{i}.docx', b'a') for i in range(11)])
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+测试后台任务队列：执行、失败记录、队列上限，以及多进程认领和租约回收
+用法: python -m pytest -q test_job_queue.py
+"""
+import sys
+import os
+import time
+import threading
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from job_queue import STATUS_DONE, STATUS_FAILED, STATUS_QUEUED, STATUS_RUNNING, JobQueue, JobStore, QueueFull
+
+
+def _wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("等待超时")
+        time.sleep(0.01)
+
+
+def _create_job(store):
+    return store.create('简历.docx', '/tmp/none.docx', {'mode': 'full'}, ['parse', 'analysis'])
+
+
+def test_job_queue_runs_and_records_result(tmp_path):
+    store = JobStore(str(tmp_path / 'jobs.sqlite3'))
+
+    def handler(job, progress):
+        progress('parse', 'done')
+        return {'filename': job['filename']}
+
+    queue = JobQueue(store, handler, workers=1)
+    job_id = _create_job(store)
+    queue.submit(job_id)
+    queue.shutdown(wait=True)
+
+    job = store.get(job_id)
+    assert job['status'] == STATUS_DONE
+    assert job['result'] == {'filename': '简历.docx'}
+    assert job['stages']['parse'] == 'done'
+    assert queue.depth() == 0
+
+
+def test_job_queue_records_failure(tmp_path):
+    store = JobStore(str(tmp_path / 'jobs.sqlite3'))
+
+    def handler(job, progress):
+        raise RuntimeError('解析失败')
+
+    queue = JobQueue(store, handler, workers=1)
+    job_id = _create_job(store)
+    queue.submit(job_id)
+    queue.shutdown(wait=True)
+
+    job = store.get(job_id)
+    assert job['status'] == STATUS_FAILED and job['error'] == '解析失败'
+
+
+def test_job_queue_rejects_when_full(tmp_path):
+    store = JobStore(str(tmp_path / 'jobs.sqlite3'))
+    release = threading.Event()
+    queue = JobQueue(store, lambda job, progress: release.wait(5), workers=1, max_pending=1)
+    queue.submit(_create_job(store))
+    with pytest.raises(QueueFull):
+        queue.submit(_create_job(store))
+    # 重启恢复不受等待上限约束
+    queue.submit(_create_job(store), force=True)
+    release.set()
+    queue.shutdown(wait=True)
+
+
+def test_claim_unfinished_is_exclusive_across_processes(tmp_path):
+    db_path = str(tmp_path / 'jobs.sqlite3')
+    store = JobStore(db_path)
+    job_ids = [_create_job(store) for _ in range(3)]
+    store.update(job_ids[1], status=STATUS_RUNNING)
+    store.update(job_ids[2], status=STATUS_DONE)
+
+    # 两个工作进程各自打开同一个数据库，每个任务只能被认领一次
+    other = JobStore(db_path)
+    time.sleep(0.01)
+    started_at = time.time()
+    claimed = store.claim_unfinished(started_at) + other.claim_unfinished(started_at)
+    assert sorted(claimed) == sorted(job_ids[:2])
+    assert store.get(job_ids[1])['status'] == STATUS_QUEUED
+
+
+def test_job_queue_reclaims_jobs_with_expired_lease(tmp_path):
+    store = JobStore(str(tmp_path / 'jobs.sqlite3'))
+    # 崩溃的工作进程留下的运行中任务：之后再也没有续期
+    orphan = _create_job(store)
+    store.update(orphan, status=STATUS_RUNNING)
+    store._db.execute("UPDATE jobs SET updated_at = ? WHERE id = ?", (time.time() - 10, orphan))
+    store._db.commit()
+
+    queue = JobQueue(store, lambda job, progress: {'ok': True}, workers=1, lease=0.2)
+    queue.recover(started_at=0)
+    _wait_until(lambda: store.get(orphan)['status'] == STATUS_DONE)
+    queue.shutdown(wait=True)
+
+
+def test_job_queue_heartbeat_keeps_running_job_leased(tmp_path):
+    db_path = str(tmp_path / 'jobs.sqlite3')
+    store = JobStore(db_path)
+    release = threading.Event()
+    runs = []
+
+    def handler(job, progress):
+        runs.append(job['id'])
+        release.wait(5)
+        return {'ok': True}
+
+    owner = JobQueue(store, handler, workers=1, lease=0.2)
+    other = JobQueue(JobStore(db_path), handler, workers=1, lease=0.2)
+    other.recover(started_at=0)
+    job_id = _create_job(store)
+    owner.submit(job_id)
+    # 运行时间超过多个租约周期，持续续期的任务不会被其他进程认领
+    time.sleep(0.6)
+    release.set()
+    owner.shutdown(wait=True)
+    other.shutdown(wait=True)
+    assert runs == [job_id]
+    assert store.get(job_id)['status'] == STATUS_DONE
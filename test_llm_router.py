@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+测试多服务商路由的对冲和延迟排序（使用模拟的上游客户端，不发出网络请求）
+用法: python -m pytest -q test_llm_router.py
+"""
+import sys
+import os
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+pytest.importorskip('openai')
+pytest.importorskip('httpx')
+
+from llm_router import Provider, ProviderRouter
+from llm_scheduler import LLMScheduler
+
+
+def _fake_provider(name, delay):
+    """上游固定延迟delay秒返回的服务商"""
+    provider = Provider(name, 'sk-test')
+
+    async def create(**kwargs):
+        await asyncio.sleep(delay)
+        return SimpleNamespace(provider=name, usage=None)
+
+    provider.async_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    return provider
+
+
+def test_hedge_loser_gets_latency_sample_and_is_demoted():
+    slow = _fake_provider('xai', 2.0)
+    fast = _fake_provider('deepseek', 0.01)
+    router = ProviderRouter([slow, fast], hedge=True, hedge_min_delay=0.05)
+
+    response = router.complete([{'role': 'user', 'content': '你好'}], {'max_tokens': 10})
+    assert response.provider == 'deepseek'
+    # 被取消的慢服务商记录了至少等待时长的删失样本，不再因"未测量"排在首位
+    assert slow.cancelled == 1 and slow.ewma_ms >= 50
+    assert router.ranked()[0] is fast
+    assert router.stats()['hedge_wins'] == 1
+
+
+def test_hedge_and_failover_requests_are_charged_to_scheduler():
+    scheduler = LLMScheduler(requests_per_minute=60, tokens_per_minute=10 ** 6)
+    slow = _fake_provider('xai', 2.0)
+    fast = _fake_provider('deepseek', 0.01)
+    router = ProviderRouter([slow, fast], hedge=True, hedge_min_delay=0.05, scheduler=scheduler)
+
+    with scheduler.slot(10):
+        router.complete([{'role': 'user', 'content': '你好'}], {'max_tokens': 10})
+    stats = scheduler.stats()
+    # 首个请求占用调用方的名额，对冲请求额外记账，结束后名额全部归还
+    assert stats['admitted'] == 1 and stats['extra_calls'] == 1 and stats['in_flight'] == 0
+    assert scheduler._request_bucket.tokens < 59
+
+
+def test_stream_first_chunk_latency_is_tracked_separately():
+    provider = Provider('deepseek', 'sk-test')
+    provider.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+        create=lambda **kwargs: iter(['你', '好'])
+    )))
+    router = ProviderRouter([provider])
+
+    assert list(router.stream([{'role': 'user', 'content': '你好'}], {'max_tokens': 10})) == ['你', '好']
+    assert provider.ttfb_ewma_ms is not None and len(provider.ttfb_latencies) == 1
+    # 首块延迟不计入完整响应的延迟排序和对冲阈值
+    assert provider.ewma_ms is None and not provider.latencies
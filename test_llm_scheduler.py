@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+测试AI调用调度器：优先级队列和排队超时
+用法: python -m pytest -q test_llm_scheduler.py
+"""
+import sys
+import os
+import time
+import threading
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from llm_scheduler import PRIORITY_BATCH, LLMScheduler, SchedulerTimeout, request_priority
+
+
+def _wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("等待超时")
+        time.sleep(0.01)
+
+
+def test_scheduler_prefers_interactive_requests():
+    scheduler = LLMScheduler(requests_per_minute=1000, tokens_per_minute=10 ** 7, max_concurrency=1, max_wait=5)
+    order = []
+
+    def call(name, priority=None):
+        def run():
+            if priority is None:
+                with scheduler.slot(10):
+                    order.append(name)
+            else:
+                with request_priority(priority), scheduler.slot(10):
+                    order.append(name)
+        return threading.Thread(target=run)
+
+    with scheduler.slot(10):
+        batch = call('batch', PRIORITY_BATCH)
+        batch.start()
+        _wait_until(lambda: scheduler.stats()['queue_depth'] == 1)
+        interactive = call('interactive')
+        interactive.start()
+        _wait_until(lambda: scheduler.stats()['queue_depth'] == 2)
+    batch.join(5)
+    interactive.join(5)
+    assert order == ['interactive', 'batch']
+
+
+def test_scheduler_timeout_leaves_queue_clean():
+    scheduler = LLMScheduler(max_concurrency=1, max_wait=0.05)
+    with scheduler.slot(10):
+        with pytest.raises(SchedulerTimeout):
+            with scheduler.slot(10):
+                pass
+    stats = scheduler.stats()
+    assert stats['timeouts'] == 1 and stats['queue_depth'] == 0 and stats['in_flight'] == 0
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+测试日志配置：无效的日志级别回退，fork出的子进程不阻塞在继承的日志队列上
+用法: python -m pytest -q test_log_config.py
+"""
+import io
+import sys
+import os
+import logging
+import textwrap
+import subprocess
+import multiprocessing
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from log_config import setup_logging
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='需要fork')
+def test_forked_workers_do_not_block_on_inherited_log_queue():
+    """日志后台线程启动后才fork的进程池：子进程大量写WARNING时不能阻塞在继承的队列上"""
+    script = textwrap.dedent('''
+        import sys, logging, multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        sys.path.insert(0, sys.argv[1])
+        from log_config import reset_logging_after_fork, setup_logging
+
+        def work(i):
+            for j in range(50):
+                logging.getLogger('worker').warning('worker %s %s', i, j)
+            return i
+
+        setup_logging(log_file=None, queue_size=1)
+        context = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(2, mp_context=context, initializer=reset_logging_after_fork) as pool:
+            print(sum(pool.map(work, range(4))))
+    ''')
+    backend = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend')
+    result = subprocess.run([sys.executable, '-c', script, backend], capture_output=True, text=True, timeout=30)
+    assert result.stdout.strip() == '6'
+    assert result.stderr.count('WARNING - worker') == 200
+
+
+def test_invalid_log_level_falls_back_to_info():
+    """LOG_LEVEL/LOG_LEVELS配置错误时不能在导入阶段抛出异常"""
+    stream = io.StringIO()
+    listener = setup_logging(log_file=None, level='VERBOSE', module_levels='resume_parser=LOUD,werkzeug=warning',
+                             stream=stream)
+    try:
+        assert logging.getLogger().level == logging.INFO
+        assert logging.getLogger('werkzeug').level == logging.WARNING
+        assert logging.getLogger('resume_parser').level == logging.NOTSET
+    finally:
+        listener.stop()
+        logging.getLogger().handlers.clear()
+        logging.getLogger().setLevel(logging.WARNING)
+        logging.getLogger('werkzeug').setLevel(logging.NOTSET)
+    assert 'LOG_LEVEL=VERBOSE' in stream.getvalue() and 'resume_parser' in stream.getvalue()
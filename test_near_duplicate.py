@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+测试近似重复简历：SimHash索引的查找，以及 reuse 模式下复用已有分析结果（不调用AI服务）
+用法: python -m pytest -q test_near_duplicate.py（backend_app 夹具见 conftest.py，在临时目录中导入应用）
+"""
+import sys
+import os
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from near_duplicate import NearDuplicateIndex, simhash
+
+RESUME = (
+    "张三\n手机: 13800138000\n邮箱: zhangsan@example.com\n"
+    "教育背景\n2015-2019 北京大学 计算机科学与技术 本科\n"
+    "工作经历\n2019-2023 某科技公司 后端开发工程师\n"
+    "负责订单系统的设计与开发，使用Python和MySQL，日均处理百万级请求\n"
+    "技能: Python, Go, Redis, Kafka"
+)
+# 只改了职位名称的同一份简历
+NEAR_RESUME = RESUME.replace('后端开发工程师', '后端开发工程师（高级）')
+OTHER_RESUME = (
+    "李四\n电话: 13700137000\n教育背景\n上海交通大学 机械工程 硕士\n"
+    "工作经历\n某汽车公司 结构设计工程师，负责底盘零部件的有限元分析与轻量化设计\n技能: CATIA, ANSYS"
+)
+
+
+def test_index_finds_near_duplicates_only(tmp_path):
+    index = NearDuplicateIndex(str(tmp_path / 'near.sqlite3'))
+    index.add(simhash(RESUME), 'first', {'analysis': '分析'})
+
+    match = index.find(simhash(NEAR_RESUME))
+    assert match is not None and match['key'] == 'first'
+    assert index.payload('first') == {'analysis': '分析'}
+    assert index.find(simhash(OTHER_RESUME)) is None
+
+
+class _CountingAnalyzer:
+    """记录调用次数的模拟分析器，分析结果中带上简历首行以便区分"""
+
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def analyze_resume(self, parsed_data, use_cache=True):
+        with self._lock:
+            self.calls += 1
+        return {'success': True, 'analysis': f"分析: {parsed_data['raw_text'].splitlines()[0]}"}
+
+    def generate_job_recommendations(self, parsed_data, use_cache=True):
+        return {'success': True, 'recommendations': f"推荐: {parsed_data['raw_text'].splitlines()[0]}"}
+
+
+def _parsed(text):
+    return {'raw_text': text, 'paragraphs': text.splitlines()}
+
+
+def test_reuse_mode_returns_cached_analysis_for_near_duplicate(backend_app, monkeypatch, tmp_path):
+    analyzer = _CountingAnalyzer()
+    monkeypatch.setattr(backend_app, 'analyzer', analyzer)
+    monkeypatch.setattr(backend_app, 'NEAR_DUPLICATE_MODE', 'reuse')
+    monkeypatch.setattr(backend_app, 'near_duplicates', NearDuplicateIndex(str(tmp_path / 'near.sqlite3')))
+
+    def analyze(text):
+        return backend_app._analysis_payload('简历.docx', _parsed(text), 'separate', True, 'test', {})
+
+    first = analyze(RESUME)
+    assert first['near_duplicate'] is None and analyzer.calls == 1
+
+    # 近似重复：直接返回第一份简历的分析结果，不再调用AI服务
+    near = analyze(NEAR_RESUME)
+    assert analyzer.calls == 1
+    assert near['near_duplicate']['parse_id'] == first['parse_id'] and near['near_duplicate']['reused'] is True
+    assert near['parse_id'] != first['parse_id']
+    assert (near['analysis'], near['recommendations']) == (first['analysis'], first['recommendations'])
+
+    # 内容不同的简历重新分析
+    other = analyze(OTHER_RESUME)
+    assert analyzer.calls == 2
+    assert other['near_duplicate'] is None
+    assert other['analysis'] == '分析: 李四'
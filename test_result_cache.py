@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+测试结果缓存：内存和磁盘两级存储，磁盘层出错时按未命中处理
+用法: python -m pytest -q test_result_cache.py
+"""
+import sys
+import os
+import sqlite3
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from result_cache import ResultCache
+
+
+def test_result_cache_persists_to_disk(tmp_path):
+    ResultCache('parse', str(tmp_path)).put('key', {'raw_text': '张三'})
+    cache = ResultCache('parse', str(tmp_path))
+    assert cache.get('key') == {'raw_text': '张三'}
+    assert cache.stats()['disk_hits'] == 1
+
+
+def test_result_cache_disk_errors_are_misses(tmp_path):
+    cache = ResultCache('parse', str(tmp_path))
+    cache.put('key', {'raw_text': '张三'})
+    cache._db.close()
+    # 磁盘层不可用时读写都不抛出：已在内存中的条目仍可命中，其余按未命中处理
+    assert cache.get('key') == {'raw_text': '张三'}
+    assert cache.get('other') is None
+    cache.put('other', {'raw_text': '李四'})
+    assert cache.get('other') == {'raw_text': '李四'}
+    assert cache.stats()['disk_errors'] >= 2
+
+
+def test_result_cache_survives_locked_database(tmp_path):
+    cache = ResultCache('parse', str(tmp_path))
+    cache._db.execute("PRAGMA busy_timeout = 50")
+    locker = sqlite3.connect(str(tmp_path / 'parse.sqlite3'))
+    locker.execute("BEGIN EXCLUSIVE")
+    try:
+        cache.put('key', {'raw_text': '张三'})
+    finally:
+        locker.rollback()
+        locker.close()
+    assert cache.get('key') == {'raw_text': '张三'}
+    assert cache.stats()['disk_errors'] == 1
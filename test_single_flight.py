@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+测试请求合并：并发的相同请求共享一次计算
+用法: python -m pytest -q test_single_flight.py
+"""
+import sys
+import os
+import time
+import threading
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from single_flight import SingleFlight
+
+
+def _wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("等待超时")
+        time.sleep(0.01)
+
+
+def test_single_flight_shares_one_call():
+    flight = SingleFlight('test')
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return {'score': 90}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do('resume', compute))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    _wait_until(lambda: flight.stats()['coalesced'] == 4)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert all(value == {'score': 90} for value, _ in results)
+    assert flight.stats()['in_flight'] == 0
+
+
+def test_single_flight_propagates_errors_and_forgets_key():
+    flight = SingleFlight('test')
+
+    def fail():
+        raise ValueError('上游错误')
+
+    with pytest.raises(ValueError):
+        flight.do('resume', fail)
+    # 失败的调用不会被缓存，下一次重新执行
+    assert flight.do('resume', lambda: 'ok') == ('ok', False)
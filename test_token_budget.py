@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+测试AI输入的token预算：截断保留尽量多的内容且不超出预算
+用法: python -m pytest -q test_token_budget.py
+"""
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from token_budget import TRUNCATION_MARKER, TokenBudget, estimate_tokens, truncate_to_tokens
+
+
+def test_text_within_budget_is_unchanged():
+    text = '张三\n技能: Python'
+    assert truncate_to_tokens(text, 100) is text
+
+
+def test_keeps_leading_lines_within_budget():
+    text = '\n'.join(['负责后端开发'] * 100)
+    fitted = truncate_to_tokens(text, 50)
+    assert fitted.endswith(TRUNCATION_MARKER)
+    lines = fitted[:-len(TRUNCATION_MARKER)].split('\n')
+    assert all(line == '负责后端开发' for line in lines[:-1])
+    assert '负责后端开发'.startswith(lines[-1])
+    assert estimate_tokens(fitted) <= 50
+
+
+def test_overlong_line_is_cut_by_characters():
+    """单行超出剩余预算时按字符截取，而不是连同之后的内容整行丢弃"""
+    text = '张三\n' + '负责后端开发' * 2000 + '\n技能: Python'
+    fitted, tokens = TokenBudget(6000).fit(text)
+    assert fitted.startswith('张三\n负责后端开发负责后端开发')
+    assert fitted.endswith(TRUNCATION_MARKER)
+    assert 5900 <= tokens <= 6000